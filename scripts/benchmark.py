@@ -0,0 +1,289 @@
+# ETL loader / feature build / split 저장·로드 / 모델 학습 단계별 소요 시간 측정
+# 결과는 reports/benchmarks/<timestamp>-<n_anime>.json 에 저장 → --compare로 이전 실행과 비교
+#   python scripts/generate_synthetic_data.py --n-anime 100k
+#   python scripts/benchmark.py --raw-dir data/synthetic/100000 --compare reports/benchmarks/<prev>.json
+# ETL loader는 임시 디렉터리의 embedded scratch DB에 적재 (.env의 DB는 건드리지 않음 / --db-name: 별도 MySQL DB)
+from __future__ import annotations
+
+import warnings
+warnings.filterwarnings('ignore')
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import numpy as np
+import pandas as pd
+
+import db
+import embedded_db
+import etl_pipeline
+import make_dataset
+import raw_data
+import run_pipeline
+import train_models
+from etl_pipeline import clean_genre
+from features import compute_prior_features
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+RESULTS_DIR = PROJECT_ROOT / "reports" / "benchmarks"
+RAW_FILES = ["anime", "anime_genres", "anime_companies", "anime_characters", "anime_voice_actors", "entities"]
+
+
+# -----------------------------
+# Timing
+# -----------------------------
+class Bench:
+    def __init__(self, trace_memory: bool = False):
+        self.results = []
+        self.trace_memory = trace_memory
+
+    @contextlib.contextmanager
+    def time(self, name: str, rows: int | None = None, quiet: bool = True):
+        # quiet: 측정 대상 함수의 print 출력은 버림
+        out = io.StringIO()
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        record = {"name": name, "rows": rows}
+        try:
+            with contextlib.redirect_stdout(out) if quiet else contextlib.nullcontext():
+                yield record
+        finally:
+            record["seconds"] = round(time.perf_counter() - start, 4)
+            if self.trace_memory:
+                record["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+                tracemalloc.stop()
+            if record.get("rows"):
+                record["rows_per_sec"] = round(record["rows"] / max(record["seconds"], 1e-9), 1)
+            self.results.append(record)
+            extra = f" | {record['rows']:,} rows, {record['rows_per_sec']:,.0f} rows/s" if record.get("rows") else ""
+            print(f"{name:<28} {record['seconds']:9.3f}s{extra}")
+
+
+# -----------------------------
+# Stages
+# -----------------------------
+def bench_raw_reads(bench: Bench) -> None:
+    # 최초 실행: CSV 파싱 + Parquet 캐시 기록 / 이후 loader는 캐시를 읽음
+    for name in RAW_FILES:
+        cached = raw_data.USE_CACHE and raw_data._cache_paths(name, False)[0].exists()
+        with bench.time(f"read_raw:{name}") as r:
+            r["rows"] = len(raw_data.read_raw(name))
+            r["parquet_cache"] = bool(cached)
+    raw_data.clear_memo()
+
+
+def use_scratch_db(workdir: Path, db_name: str | None) -> str:
+    # ETL loader는 테이블을 다시 만들고 index를 지우므로 .env의 DB가 아닌 scratch DB로 전환
+    #   기본: workdir 아래 embedded DB (DuckDB, 없으면 SQLite) / db_name: 같은 MySQL 서버의 별도 DB
+    if db_name is None:
+        db.BACKEND = embedded_db.resolve_engine(db.BACKEND if db.EMBEDDED else "embedded")
+        db.EMBEDDED = True
+        db.DB_PATH = workdir / f"bench.{db.BACKEND}"
+        return f"{db.BACKEND} (temp dir)"
+
+    if db_name == db.DB["database"]:
+        raise SystemExit(f"--db-name {db_name} is the configured DB_NAME: the benchmark drops indexes and "
+                         "loads synthetic rows, so use a separate scratch database.")
+    db.BACKEND, db.EMBEDDED = "mysql", False
+    db.DB["database"] = db_name
+    return f"mysql:{db_name}"
+
+
+def bench_etl(bench: Bench) -> bool:
+    # scratch DB에 schema를 만든 뒤 ETL_STEPS를 의존성 순서대로 1개씩 실행 (병렬 실행 없이 loader별 시간)
+    try:
+        with bench.time("etl:schema"):
+            run_pipeline.run_sql_files(*run_pipeline.SCHEMA_SQL)()
+        conn = etl_pipeline.connect_db()
+    except Exception as e:
+        print(f"ETL loaders skipped (database unavailable: {e})")
+        return False
+
+    cur = conn.cursor()
+    try:
+        if etl_pipeline.defer_indexes():  # main()과 같이 적재 전에 secondary index 삭제 → "indexes" step에서 재생성
+            with bench.time("etl:drop_indexes"):
+                etl_pipeline.drop_indexes(cur)
+                conn.commit()
+        for step in etl_pipeline.ETL_STEPS:
+            with bench.time(f"etl:{step.name}") as r:
+                rows = step.func(cur) or {}
+                conn.commit()
+                r["rows"] = int(sum(rows.values()))
+    finally:
+        cur.close()
+        conn.close()
+        raw_data.clear_memo()
+    return True
+
+
+def feature_frame_from_raw() -> pd.DataFrame:
+    # DB 없이 feature_anime과 같은 형태를 pandas로 구성 (sql/05_build_features.sql의 집계와 동일한 정의)
+    anime = raw_data.read_raw("anime").drop_duplicates("anime_id")
+    genres = raw_data.read_raw("anime_genres").dropna()
+    comp = raw_data.read_raw("anime_companies").dropna()
+    chars = raw_data.read_raw("anime_characters").dropna(subset = ["anime_id", "character_id"])
+    va = raw_data.read_raw("anime_voice_actors").dropna(subset = ["character_id", "person_id"])
+
+    genres = genres.assign(genre = genres["genre"].map(clean_genre)).drop_duplicates()
+    va = va.merge(chars[["character_id", "anime_id"]].drop_duplicates(), on = "character_id")
+
+    def nunique(df, col, mask = None):
+        df = df if mask is None else df[mask]
+        return df.groupby("anime_id")[col].nunique()
+
+    counts = pd.DataFrame({
+        "genre_count": nunique(genres, "genre"),
+        "studio_count": nunique(comp, "company_id", comp["role"] == "Studio"),
+        "producer_count": nunique(comp, "company_id", comp["role"] == "Producer"),
+        "voice_actor_count": nunique(va, "person_id"),
+        "japanese_va_count": nunique(va, "person_id", va["language"] == "Japanese"),
+    })
+
+    df = anime[["anime_id", "title", "score", "members", "type", "episodes", "start_date", "popularity"]].copy()
+    df["type"] = df["type"].astype(object)
+    df["episodes"] = pd.to_numeric(df["episodes"], errors = "coerce").fillna(0).astype(int)
+    df = df.merge(counts, left_on = "anime_id", right_index = True, how = "left")
+    df[counts.columns] = df[counts.columns].fillna(0).astype(int)
+
+    studios = comp.loc[comp["role"] == "Studio", ["anime_id", "company_id"]]
+    prior = compute_prior_features(anime, studios, va[["anime_id", "person_id"]])
+    return df.merge(prior, on = "anime_id", how = "left")
+
+
+def bench_dataset(bench: Bench, from_db: bool, workdir: Path):
+    with bench.time("load_feature_anime" if from_db else "feature_frame_from_raw") as r:
+        df = make_dataset.load_feature_anime() if from_db else feature_frame_from_raw()
+        r["rows"] = len(df)
+
+    with bench.time("build_model_frame", rows = len(df)):
+        X, y = make_dataset.build_model_frame(df)
+    del df
+
+    if from_db: # 모델 컬럼만 배치 fetch → 미리 할당한 배열 (DATASET_LOADER=arrays, --memory로 peak 비교)
+        with bench.time("load_model_arrays", rows = len(X)):
+            X, y = make_dataset.load_model_arrays()
+
+    make_dataset.PROCESSED_DIR = workdir
+    train_models.DATA_DIR = workdir
+    with bench.time("save_splits", rows = len(X)):
+        make_dataset.save_splits(X, y, export_csv = False)
+    with bench.time("save_splits (csv)", rows = len(X)):
+        make_dataset.save_splits(X, y, export_csv = True)
+
+    with bench.time("load_data (npy memmap)", rows = len(X)):
+        data = train_models.load_data()
+        np.asarray(data[0]).sum()  # memmap 실제 읽기까지 포함
+    return data
+
+
+def bench_models(bench: Bench, data, rf_estimators: int, workdir: Path) -> None:
+    X_train, X_test, y_train, y_test = data
+    train_models.REPORTS_DIR = workdir
+    n = len(X_train)
+
+    with bench.time("train:ols (closed form)", rows = n):
+        train_models.run_ols(X_train, X_test, y_train, y_test, summary = False)
+    with bench.time("train:ols (statsmodels)", rows = n):
+        train_models.run_ols(X_train, X_test, y_train, y_test, summary = True)
+    with bench.time("train:ridge", rows = n):
+        train_models.run_ridge(X_train, X_test, y_train, y_test)
+    with bench.time("train:rf", rows = n):
+        train_models.run_rf(X_train, X_test, y_train, y_test, params = {"n_estimators": rf_estimators})
+
+
+# -----------------------------
+# Results
+# -----------------------------
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd = PROJECT_ROOT,
+                              capture_output = True, text = True, check = True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(current: list, previous_path: Path, memory: bool) -> None:
+    previous = json.loads(previous_path.read_text(encoding = "utf-8"))
+    prev = {r["name"]: r for r in previous["results"]}
+    print(f"\n=== vs {previous_path.name} ===")
+    if previous.get("memory") != memory:
+        print("(memory tracing differs between runs: timings are not directly comparable)")
+    for r in current:
+        p = prev.get(r["name"])
+        if not p or not p["seconds"]:
+            continue
+        ratio = r["seconds"] / p["seconds"]
+        flag = "  ← slower" if ratio > 1.2 else ""
+        print(f"{r['name']:<28} {p['seconds']:9.3f}s → {r['seconds']:9.3f}s  ({ratio:5.2f}x){flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Benchmark ETL loaders, dataset build and model training.")
+    parser.add_argument("--raw-dir", type = Path, required = True, help = "directory with raw CSVs (e.g. data/synthetic/100000)")
+    parser.add_argument("--skip-etl", action = "store_true", help = "do not run ETL loaders against the database")
+    parser.add_argument("--db-name", default = None,
+                        help = "run ETL loaders against this MySQL database on the configured server "
+                               "(default: embedded scratch DB in a temp dir; must differ from DB_NAME)")
+    parser.add_argument("--rf-estimators", type = int, default = 100)
+    parser.add_argument("--memory", action = "store_true", help = "record peak Python allocations (tracemalloc, slower)")
+    parser.add_argument("--compare", type = Path, default = None, help = "previous result JSON")
+    parser.add_argument("--out", type = Path, default = None)
+    args = parser.parse_args()
+
+    raw_data.RAW_DIR = args.raw_dir.resolve()
+    raw_data.CACHE_DIR = raw_data.RAW_DIR / ".cache"
+    n_anime = sum(1 for _ in open(raw_data.raw_path("anime"), encoding = "utf-8")) - 1
+    bench = Bench(trace_memory = args.memory)
+
+    with tempfile.TemporaryDirectory(prefix = "bench_") as tmp:
+        workdir = Path(tmp)
+        scratch_db = None if args.skip_etl else use_scratch_db(workdir, args.db_name)
+        try:
+            bench_raw_reads(bench)
+            etl_ran = False if args.skip_etl else bench_etl(bench)
+            data = bench_dataset(bench, from_db = etl_ran, workdir = workdir)
+            bench_models(bench, data, args.rf_estimators, workdir)
+        finally:
+            db.close_pool()  # 임시 디렉터리 삭제 전에 scratch DB 파일을 닫음
+
+    result = {
+        "created_at": datetime.now().isoformat(timespec = "seconds"),
+        "git_commit": git_commit(),
+        "raw_dir": str(args.raw_dir),
+        "n_anime": n_anime,
+        "etl": etl_ran,
+        "scratch_db": scratch_db,
+        "env": {k: v for k, v in sorted(os.environ.items()) if k.startswith(("ETL_", "DB_PREPARED", "DB_BACKEND", "RAW_CACHE", "DATASET_"))},
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "cpu_count": os.cpu_count(), "libraries": train_models.library_versions()},
+        "rf_estimators": args.rf_estimators,
+        "memory": args.memory,
+        "results": bench.results,
+    }
+
+    RESULTS_DIR.mkdir(parents = True, exist_ok = True)
+    out = args.out or RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{n_anime}.json"
+    out.write_text(json.dumps(result, indent = 2), encoding = "utf-8")
+    print(f"\nSaved: {out}")
+
+    if args.compare:
+        compare(bench.results, args.compare, args.memory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# 분석 / feature 쿼리의 실행 계획(EXPLAIN)이 sql/03_indexes.sql의 index를 사용하는지 확인
+# 기대와 다르면 exit 1 → index / 쿼리 변경 시 회귀 확인용 (데이터 적재 후 실행: 빈 테이블은 계획이 달라짐)
+#   python scripts/check_query_plans.py [--show]
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import db
+from features import FEATURE_SELECT_SQL
+from run_pipeline import SQL_DIR, split_sql
+
+
+@dataclass
+class PlanCheck:
+    name: str
+    sql: str
+    table: str                # EXPLAIN 결과의 table 이름(alias)
+    index: str | None         # 사용해야 하는 index (None이면 full table scan만 아니면 통과)
+    covering: bool = False    # index만으로 처리 (MySQL "Using index" / SQLite "COVERING INDEX")
+    backends: Tuple[str, ...] = ("mysql", "sqlite")
+
+
+@dataclass
+class TableAccess:
+    key: str | None
+    covering: bool
+    full_scan: bool
+    detail: str
+
+
+def analysis_queries() -> List[str]:
+    return split_sql((SQL_DIR / "06_analysis_queries.sql").read_text(encoding = "utf-8"))
+
+
+def plan_checks() -> List[PlanCheck]:
+    q = analysis_queries()
+    feature_all = FEATURE_SELECT_SQL.format(filter = "", a_filter = "")
+    feature_some = FEATURE_SELECT_SQL.format(filter = "WHERE anime_id IN (1, 2, 3)",
+                                             a_filter = "WHERE a.anime_id IN (1, 2, 3)")
+    return [
+        PlanCheck("06 (1) type summary", q[0], "anime_dim", "idx_anime_type_score_members", covering = True),
+        PlanCheck("06 (3) studio count", q[2], "ac", "idx_anime_company_role_company", covering = True),
+        # SQLite의 anime_company는 index와 같은 3개 컬럼의 rowid 테이블이라 table scan과 비용이 같음 → MySQL만 확인
+        PlanCheck("06 (4) studio avg score", q[3], "ac", "idx_anime_company_role_company", covering = True,
+                  backends = ("mysql",)),
+        PlanCheck("feature_anime rebuild: VA", feature_all, "anime_voice_actor",
+                  "idx_anime_va_anime_lang_person", covering = True),
+        PlanCheck("feature_anime refresh: VA", feature_some, "anime_voice_actor",
+                  "idx_anime_va_anime_lang_person", covering = True),
+        PlanCheck("prior_features studios", "SELECT DISTINCT anime_id, company_id FROM anime_company "
+                  "WHERE role = 'Studio'", "anime_company", "idx_anime_company_role_company", covering = True),
+        PlanCheck("VA join: character lookup", "SELECT anime_id FROM anime_character WHERE character_id = 1",
+                  "anime_character", None),
+    ]
+
+
+# -----------------------------
+# EXPLAIN → table별 접근 방식
+# -----------------------------
+def explain_mysql(cur, sql: str) -> Dict[str, TableAccess]:
+    cur.execute(f"EXPLAIN {sql}")
+    cols = [d[0].lower() for d in cur.description]
+    out = {}
+    for row in cur.fetchall():
+        r = dict(zip(cols, row))
+        extra = r.get("extra") or ""
+        out[r["table"]] = TableAccess(
+            key = r["key"],
+            covering = bool(re.search(r"Using index(?! condition)", extra)),
+            full_scan = r["type"] == "ALL",
+            detail = f"type={r['type']} key={r['key']} extra={extra}",
+        )
+    return out
+
+
+_RE_SQLITE_PLAN = re.compile(r"^(SCAN|SEARCH) (\w+)(?: USING (COVERING )?INDEX (\w+)| USING (?:INTEGER )?PRIMARY KEY)?")
+
+
+def explain_sqlite(cur, sql: str) -> Dict[str, TableAccess]:
+    cur.execute(f"EXPLAIN QUERY PLAN {sql}")
+    out = {}
+    for *_, detail in cur.fetchall():
+        m = _RE_SQLITE_PLAN.match(detail)
+        if not m:
+            continue
+        op, table, covering, key = m.groups()
+        out[table] = TableAccess(
+            key = key,
+            covering = bool(covering),
+            full_scan = op == "SCAN" and key is None,
+            detail = detail,
+        )
+    return out
+
+
+def evaluate(check: PlanCheck, plan: Dict[str, TableAccess]) -> str | None: # 실패 사유 (통과면 None)
+    access = plan.get(check.table)
+    if access is None:
+        return f"table {check.table} not in plan"
+    if check.index and (access.key or "").lower() != check.index.lower():
+        return f"expected index {check.index}, got {access.key}"
+    if check.covering and not access.covering:
+        return "index is not covering (table rows are read)"
+    if check.index is None and access.full_scan:
+        return "full table scan"
+    return None
+
+
+def analyze_tables(cur) -> None: # 최신 통계로 계획 확인
+    if db.BACKEND == "sqlite":
+        cur.execute("ANALYZE;")
+        return
+    for table in ("anime_dim", "anime_company", "company", "anime_voice_actor", "anime_character"):
+        cur.execute(f"ANALYZE TABLE {table};")
+        cur.fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Assert that analysis / feature queries use the expected indexes.")
+    parser.add_argument("--show", action = "store_true", help = "print the full plan of every query")
+    args = parser.parse_args()
+
+    if db.BACKEND == "duckdb":
+        print("DuckDB backend does not use secondary indexes (nothing to check).")
+        return
+
+    explain = explain_sqlite if db.BACKEND == "sqlite" else explain_mysql
+    conn = db.connect_db()
+    cur = conn.cursor()
+    failures = 0
+    try:
+        analyze_tables(cur)
+        for check in plan_checks():
+            if db.BACKEND not in check.backends:
+                print(f"SKIP {check.name:<28} (not checked on {db.BACKEND})")
+                continue
+            plan = explain(cur, check.sql)
+            reason = evaluate(check, plan)
+            failures += reason is not None
+            access = plan.get(check.table)
+            print(f"{'OK  ' if reason is None else 'FAIL'} {check.name:<28} "
+                  f"{access.detail if access else '-'}{'' if reason is None else f'  ← {reason}'}")
+            if args.show:
+                for table, a in plan.items():
+                    print(f"       {table:<20} {a.detail}")
+    finally:
+        cur.close()
+        conn.close()
+
+    print(f"\n{failures} check(s) failed" if failures else "\nall plans use the expected indexes")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+# 벤치마크용 MAL 형태 합성 raw CSV 생성 (data/raw/와 같은 파일명·컬럼)
+# anime chunk 단위로 생성해 파일에 이어 쓰므로 10M anime도 메모리에 한 번에 올리지 않음
+#   python scripts/generate_synthetic_data.py --n-anime 100k --out data/synthetic/100k
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# -----------------------------
+# Distributions (MAL top 10,000 기준으로 맞춤)
+# -----------------------------
+# 평균 fan-out: 장르 ~2.8, 스튜디오 ~1.1, 제작사 ~3.5, 캐릭터 ~8 (79,654 / 9,999), 캐릭터당 성우 ~2 (155,938 / 79,654)
+TYPES = ["TV", "Movie", "OVA", "ONA", "Special", "TV Special", "Music"]
+TYPE_P = [0.45, 0.17, 0.12, 0.11, 0.09, 0.03, 0.03]
+
+GENRES = ["Action", "Adventure", "Comedy", "Drama", "Fantasy", "Romance", "Sci-Fi", "Slice of Life",
+          "Mystery", "Supernatural", "Sports", "Horror", "Suspense", "Award Winning", "Ecchi",
+          "Avant Garde", "Boys Love", "Girls Love", "Gourmet", "Hentai", "Erotica"]
+GENRE_P = np.array([16, 10, 15, 9, 10, 7, 7, 5, 3, 5, 3, 2, 2, 1, 2, 1, 1, 1, 1, 0.5, 0.5])
+GENRE_P = GENRE_P / GENRE_P.sum()
+GENRE_DUP_RATE = 0.02  # "Action Action" 형태의 원본 오류 재현
+
+LANGUAGES = ["Japanese", "English", "Korean", "German", "French", "Spanish", "Portuguese (BR)", "Italian"]
+LANG_RATE = [0.95, 0.45, 0.08, 0.10, 0.10, 0.12, 0.08, 0.06]  # 캐릭터별 해당 언어 성우가 있을 확률
+
+# 엔티티 pool 크기 (anime 수 대비) / id 구간은 타입별로 겹치지 않게 분리
+STUDIO_RATIO, PRODUCER_RATIO, PERSON_RATIO = 0.02, 0.08, 0.25
+SHARED_CHARACTER_RATE = 0.05  # 속편 등에서 다른 anime의 캐릭터를 재사용
+ZIPF_A = 1.1
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+class ZipfPool:
+    # 인기 편중(소수 스튜디오/성우가 대부분 작품 담당)을 재현하는 id 표본기
+    def __init__(self, ids: np.ndarray, a: float = ZIPF_A):
+        w = 1.0 / np.arange(1, len(ids) + 1) ** a
+        self.ids = ids
+        self.cdf = np.cumsum(w) / w.sum()
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        return self.ids[np.minimum(np.searchsorted(self.cdf, rng.random(n)), len(self.ids) - 1)]
+
+
+def fan_out(rng: np.random.Generator, n: int, mean: float, dispersion: float, lo: int, hi: int) -> np.ndarray:
+    # 음이항분포 (분산 > 평균, 긴 꼬리) → [lo, hi]로 자름
+    p = dispersion / (dispersion + mean)
+    return np.clip(rng.negative_binomial(dispersion, p, n), lo, hi)
+
+
+def append_csv(df: pd.DataFrame, path: Path, first: bool) -> None:
+    df.to_csv(path, mode = "w" if first else "a", header = first, index = False)
+
+
+# -----------------------------
+# Chunk generators
+# -----------------------------
+def gen_anime(rng, ids: np.ndarray, n_total: int) -> pd.DataFrame:
+    n = len(ids)
+    score = np.round(np.clip(rng.normal(6.9, 0.8, n), 1.5, 9.3), 2)
+    score_na = rng.random(n) < 0.03
+    # members: score와 양의 상관 + lognormal 꼬리
+    log_members = 4.0 + 1.1 * (score - 5) + rng.normal(0, 1.3, n)
+    members = np.exp(log_members).astype(np.int64) + 50
+
+    # rank / popularity: 전체 순위 대신 분포상 위치로 근사 (chunk 단위 생성이므로)
+    rank = 1 + (n_total * stats.norm.sf(score, 6.9, 0.8)).astype(np.int64)
+    popularity = 1 + (n_total * stats.norm.sf(log_members, 6.09, 1.57)).astype(np.int64)
+
+    start = pd.Timestamp("1960-01-01") + pd.to_timedelta(rng.integers(0, 23_700, n), unit = "D")
+    length = pd.to_timedelta(rng.integers(0, 400, n), unit = "D")
+    types = rng.choice(TYPES, n, p = TYPE_P)
+    episodes = np.where(types == "Movie", 1, fan_out(rng, n, 14, 1.5, 1, 2000)).astype(object)
+    episodes[rng.random(n) < 0.03] = "Unknown"
+
+    return pd.DataFrame({
+        "anime_id": ids,
+        "title": [f"Synthetic Anime {i}" for i in ids],
+        "score": np.where(score_na, np.nan, score),
+        "rank": np.where(score_na, 0, rank),
+        "popularity": popularity,
+        "members": members,
+        "synopsis": "Synthetic synopsis.",
+        "start_date": start.strftime("%Y-%m-%d"),
+        "end_date": np.where(rng.random(n) < 0.1, "", (start + length).strftime("%Y-%m-%d")),
+        "type": types,
+        "episodes": episodes,
+        "image_url": [f"https://example.com/anime/{i}.jpg" for i in ids],
+    })
+
+
+def gen_genres(rng, ids: np.ndarray) -> pd.DataFrame:
+    k = fan_out(rng, len(ids), 2.8, 4.0, 1, 8)
+    genre = rng.choice(GENRES, k.sum(), p = GENRE_P).astype(object)
+    dup = rng.random(len(genre)) < GENRE_DUP_RATE
+    genre[dup] = [f"{g} {g}" for g in genre[dup]]
+    return pd.DataFrame({"anime_id": np.repeat(ids, k), "genre": genre})
+
+
+def gen_companies(rng, ids: np.ndarray, studios: ZipfPool, producers: ZipfPool) -> pd.DataFrame:
+    ks = np.where(rng.random(len(ids)) < 0.9, 1, 2)
+    kp = fan_out(rng, len(ids), 3.5, 2.0, 0, 15)
+    return pd.DataFrame({
+        "anime_id": np.concatenate([np.repeat(ids, ks), np.repeat(ids, kp)]),
+        "company_id": np.concatenate([studios.sample(rng, ks.sum()), producers.sample(rng, kp.sum())]),
+        "role": np.repeat(["Studio", "Producer"], [ks.sum(), kp.sum()]),
+    })
+
+
+def gen_characters(rng, ids: np.ndarray, next_char_id: int) -> tuple[pd.DataFrame, np.ndarray]:
+    k = fan_out(rng, len(ids), 8.0, 1.2, 0, 120)
+    n = int(k.sum())
+    char_ids = np.arange(next_char_id, next_char_id + n)
+
+    # 일부 슬롯은 같은 chunk의 기존 캐릭터로 채움 (새 entity 없음)
+    shared = rng.random(n) < SHARED_CHARACTER_RATE
+    if n:
+        char_ids = char_ids.copy()
+        char_ids[shared] = rng.choice(char_ids[~shared], shared.sum()) if (~shared).any() else char_ids[shared]
+
+    # 작품별 첫 1~3명은 Main
+    pos = np.arange(n) - np.repeat(np.cumsum(k) - k, k)
+    role = np.where(pos < np.repeat(rng.integers(1, 4, len(ids)), k), "Main", "Supporting")
+
+    df = pd.DataFrame({"anime_id": np.repeat(ids, k), "character_id": char_ids, "role": role})
+    return df, np.unique(char_ids[~shared])
+
+
+def gen_voice_actors(rng, new_chars: np.ndarray, persons: dict) -> pd.DataFrame:
+    frames = []
+    for lang, rate in zip(LANGUAGES, LANG_RATE):
+        chars = new_chars[rng.random(len(new_chars)) < rate]
+        frames.append(pd.DataFrame({"character_id": chars,
+                                    "person_id": persons[lang].sample(rng, len(chars)),
+                                    "language": lang}))
+    return pd.concat(frames, ignore_index = True).sort_values("character_id", kind = "stable")
+
+
+def gen_entities(ids: np.ndarray, entity_type: str, label: str) -> pd.DataFrame:
+    return pd.DataFrame({
+        "entity_id": ids,
+        "entity_type": entity_type,
+        "name": [f"{label} {i}" for i in ids],
+        "image_url": "",
+    })
+
+
+# -----------------------------
+# Main
+# -----------------------------
+def generate(n_anime: int, out: Path, seed: int = 42, chunk: int = 200_000) -> dict:
+    out.mkdir(parents = True, exist_ok = True)
+    rng = np.random.default_rng(seed)
+    paths = {name: out / f"{name}.csv" for name in
+             ("anime", "anime_genres", "anime_companies", "anime_characters", "anime_voice_actors", "entities")}
+
+    # entity id 구간: company 1.. / person 10^8.. / character 2·10^8..
+    n_studio = max(20, int(n_anime * STUDIO_RATIO))
+    n_producer = max(50, int(n_anime * PRODUCER_RATIO))
+    n_person = max(200, int(n_anime * PERSON_RATIO))
+    studio_ids = np.arange(1, n_studio + 1)
+    producer_ids = np.arange(n_studio + 1, n_studio + n_producer + 1)
+    person_ids = np.arange(100_000_000, 100_000_000 + n_person)
+
+    # 언어별 성우 pool (일본어 성우가 가장 많음)
+    persons, start = {}, 0
+    for lang, share in zip(LANGUAGES, [0.45, 0.2, 0.06, 0.07, 0.07, 0.08, 0.04, 0.03]):
+        size = max(10, int(n_person * share))
+        persons[lang] = ZipfPool(person_ids[start : start + size] if start + size <= n_person else person_ids[-size:])
+        start += size
+    studios, producers = ZipfPool(studio_ids), ZipfPool(producer_ids)
+
+    first = True
+    append_csv(pd.concat([gen_entities(studio_ids, "studio", "Studio"),
+                          gen_entities(producer_ids, "producer", "Producer"),
+                          gen_entities(person_ids, "voice_actor", "Person")]), paths["entities"], True)
+
+    counts = dict.fromkeys(paths, 0)
+    next_char_id = 200_000_000
+    for lo in range(1, n_anime + 1, chunk):
+        ids = np.arange(lo, min(lo + chunk, n_anime + 1))
+        chars, new_chars = gen_characters(rng, ids, next_char_id)
+        next_char_id = int(chars["character_id"].max()) + 1 if len(chars) else next_char_id
+
+        frames = {
+            "anime": gen_anime(rng, ids, n_anime),
+            "anime_genres": gen_genres(rng, ids),
+            "anime_companies": gen_companies(rng, ids, studios, producers),
+            "anime_characters": chars,
+            "anime_voice_actors": gen_voice_actors(rng, new_chars, persons),
+            "entities": gen_entities(new_chars, "character", "Character"),
+        }
+        for name, df in frames.items():
+            append_csv(df, paths[name], first and name != "entities")
+            counts[name] += len(df)
+        first = False
+        print(f"  anime {ids[-1]:,}/{n_anime:,}")
+
+    counts["entities"] += n_studio + n_producer + n_person
+    return counts
+
+
+def parse_scale(s: str) -> int:
+    s = s.lower().replace("_", "")
+    mult = {"k": 1_000, "m": 1_000_000}.get(s[-1], 1)
+    return int(float(s[:-1] if s[-1] in "km" else s) * mult)
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Generate MAL-shaped synthetic raw CSVs.")
+    parser.add_argument("--n-anime", type = parse_scale, default = 10_000, help = "e.g. 10k, 1m, 10m")
+    parser.add_argument("--out", type = Path, default = None, help = "default: data/synthetic/<n-anime>")
+    parser.add_argument("--seed", type = int, default = 42)
+    parser.add_argument("--chunk", type = int, default = 200_000, help = "anime per generated chunk")
+    args = parser.parse_args()
+
+    out = args.out or PROJECT_ROOT / "data" / "synthetic" / str(args.n_anime)
+    t0 = time.perf_counter()
+    counts = generate(args.n_anime, out, seed = args.seed, chunk = args.chunk)
+
+    print(f"\nWrote {out} in {time.perf_counter() - t0:.1f}s")
+    for name, n in counts.items():
+        print(f"- {name}.csv: {n:,} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,22 @@
-import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from raw_data import raw_path, read_raw
 
 FILES = [
-    "data/raw/anime.csv",
-    "data/raw/anime_genres.csv",
-    "data/raw/anime_companies.csv",
-    "data/raw/anime_voice_actors.csv",
-    "data/raw/entities.csv",
+    "anime",
+    "anime_genres",
+    "anime_companies",
+    "anime_voice_actors",
+    "entities",
 ]
 
-def inspect(path: str, n: int = 3) -> None:
-    df = pd.read_csv(path)
+def inspect(name: str, n: int = 3) -> None:
+    df = read_raw(name, all_columns = True)  # 전체 컬럼 / 캐시가 유효하면 CSV 파싱 생략
     print("=" * 80)
-    print(path)
+    print(raw_path(name))
     print("- columns:", list(df.columns))
     print("- shape:", df.shape)
     print("- dtypes:\n", df.dtypes)
@@ -1,5 +1,6 @@
 USE anime_project;
 
+DROP TABLE IF EXISTS anime_prior_features;
 DROP TABLE IF EXISTS anime_voice_actor;
 DROP TABLE IF EXISTS anime_character;
 DROP TABLE IF EXISTS anime_company;
@@ -88,4 +89,16 @@ CREATE TABLE anime_voice_actor (
   FOREIGN KEY (anime_id) REFERENCES anime_dim(anime_id),
   FOREIGN KEY (character_id) REFERENCES character_entity(character_id),
   FOREIGN KEY (person_id) REFERENCES voice_actor(person_id)
-) ENGINE=InnoDB;
\ No newline at end of file
+) ENGINE=InnoDB;
+
+-- studio / 성우 prior 집계 (작품 시점 이전 작품만 사용, src/features.py compute_prior_features)
+-- ETL의 prior_features step이 전체 재계산 후 값이 바뀐 anime_id만 upsert한다.
+CREATE TABLE anime_prior_features (
+  anime_id                  INT PRIMARY KEY,
+  studio_prior_works        INT NOT NULL DEFAULT 0,
+  studio_prior_score        DOUBLE,
+  studio_prior_log_members  DOUBLE,
+  va_prior_works            DOUBLE NOT NULL DEFAULT 0,
+  va_prior_log_members      DOUBLE,
+  FOREIGN KEY (anime_id) REFERENCES anime_dim(anime_id)
+) ENGINE=InnoDB;
@@ -0,0 +1,17 @@
+USE anime_project;
+
+-- 분석 쿼리(06_analysis_queries.sql) / feature 집계(05_build_features.sql, src/features.py)용 보조 index
+-- 조회에 필요한 컬럼을 모두 포함(covering)하여 테이블 본문(clustered index)을 읽지 않도록 한다.
+-- ETL 전체 적재 시 etl_pipeline.py가 적재 전에 삭제하고 적재 후 다시 만든다. (ETL_DEFER_INDEXES)
+-- 실행 계획 확인: python scripts/check_query_plans.py
+
+-- 06 (1) 타입별 평균 평점/인기: GROUP BY type + AVG(score), AVG(members)
+CREATE INDEX idx_anime_type_score_members ON anime_dim (type, score, members);
+
+-- 06 (3)(4) Studio별 작품 수 / 평균 평점: role = 'Studio' 조건 → company_id 그룹 → anime_id로 anime_dim JOIN
+-- (PK (anime_id, company_id, role)는 role이 마지막이라 조건에 쓸 수 없음)
+CREATE INDEX idx_anime_company_role_company ON anime_company (role, company_id, anime_id);
+
+-- feature_anime 성우 집계: anime_id별 COUNT(DISTINCT person_id) + language = 'Japanese' 조건
+-- (PK (anime_id, character_id, person_id, language)보다 좁고 language로 먼저 나뉨)
+CREATE INDEX idx_anime_va_anime_lang_person ON anime_voice_actor (anime_id, language, person_id);
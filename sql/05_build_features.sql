@@ -1,8 +1,42 @@
 USE anime_project;
 
+-- feature_anime: view → materialized table
+-- 장르/제작사/성우를 한 번에 JOIN하면 (장르 × 제작사 × 성우)만큼 행이 불어나므로
+-- 각 카운트는 테이블별로 먼저 GROUP BY 한 뒤 anime_dim에 1:1로 붙인다.
+-- ETL(etl_pipeline.py)은 변경된 anime_id만 부분 갱신하며, 이 스크립트는 전체 재생성용이다.
+-- studio / 성우 prior 집계 컬럼은 anime_prior_features(01_schema_extended.sql, ETL prior_features step)에서 가져온다.
+
 DROP VIEW IF EXISTS feature_anime;
+DROP TABLE IF EXISTS feature_anime;
+
+CREATE TABLE feature_anime (
+  anime_id           INT PRIMARY KEY,
+  title              VARCHAR(255) NOT NULL,
+  score              DECIMAL(4,2),
+  members            INT,
+  type               VARCHAR(50),
+  episodes           INT,
+  start_date         DATE,
+  popularity         INT,
+  genre_count        INT NOT NULL DEFAULT 0,
+  company_count      INT NOT NULL DEFAULT 0,
+  studio_count       INT NOT NULL DEFAULT 0,
+  producer_count     INT NOT NULL DEFAULT 0,
+  voice_actor_count  INT NOT NULL DEFAULT 0,
+  japanese_va_count  INT NOT NULL DEFAULT 0,
+  studio_prior_works        INT NOT NULL DEFAULT 0,
+  studio_prior_score        DOUBLE,
+  studio_prior_log_members  DOUBLE,
+  va_prior_works            DOUBLE NOT NULL DEFAULT 0,
+  va_prior_log_members      DOUBLE
+) ENGINE=InnoDB;
 
-CREATE VIEW feature_anime AS
+INSERT INTO feature_anime
+(anime_id, title, score, members, type, episodes, start_date, popularity,
+ genre_count, company_count, studio_count, producer_count,
+ voice_actor_count, japanese_va_count,
+ studio_prior_works, studio_prior_score, studio_prior_log_members,
+ va_prior_works, va_prior_log_members)
 SELECT
     a.anime_id,
     a.title,
@@ -12,14 +46,38 @@ SELECT
     a.episodes,
     a.start_date,
     a.popularity,
-    COUNT(DISTINCT ag.genre_id) AS genre_count,
-    COUNT(DISTINCT ac.company_id) AS company_count,
-    COUNT(DISTINCT CASE WHEN ac.role = 'Studio' THEN ac.company_id END) AS studio_count,
-    COUNT(DISTINCT CASE WHEN ac.role = 'Producer' THEN ac.company_id END) AS producer_count,
-    COUNT(DISTINCT ava.person_id) AS voice_actor_count,
-    COUNT(DISTINCT CASE WHEN ava.language = 'Japanese' THEN ava.person_id END) AS japanese_va_count
+    COALESCE(g.genre_count, 0) AS genre_count,
+    COALESCE(c.company_count, 0) AS company_count,
+    COALESCE(c.studio_count, 0) AS studio_count,
+    COALESCE(c.producer_count, 0) AS producer_count,
+    COALESCE(v.voice_actor_count, 0) AS voice_actor_count,
+    COALESCE(v.japanese_va_count, 0) AS japanese_va_count,
+    COALESCE(p.studio_prior_works, 0) AS studio_prior_works,
+    p.studio_prior_score,
+    p.studio_prior_log_members,
+    COALESCE(p.va_prior_works, 0) AS va_prior_works,
+    p.va_prior_log_members
 FROM anime_dim a
-LEFT JOIN anime_genre_map ag ON a.anime_id = ag.anime_id
-LEFT JOIN anime_company ac ON a.anime_id = ac.anime_id
-LEFT JOIN anime_voice_actor ava ON a.anime_id = ava.anime_id
-GROUP BY a.anime_id, a.title, a.score, a.members, a.type, a.episodes, a.start_date, a.popularity;
\ No newline at end of file
+LEFT JOIN (
+    SELECT anime_id, COUNT(DISTINCT genre_id) AS genre_count
+    FROM anime_genre_map
+    GROUP BY anime_id
+) g ON a.anime_id = g.anime_id
+LEFT JOIN (
+    SELECT
+        anime_id,
+        COUNT(DISTINCT company_id) AS company_count,
+        COUNT(DISTINCT CASE WHEN role = 'Studio' THEN company_id END) AS studio_count,
+        COUNT(DISTINCT CASE WHEN role = 'Producer' THEN company_id END) AS producer_count
+    FROM anime_company
+    GROUP BY anime_id
+) c ON a.anime_id = c.anime_id
+LEFT JOIN (
+    SELECT
+        anime_id,
+        COUNT(DISTINCT person_id) AS voice_actor_count,
+        COUNT(DISTINCT CASE WHEN language = 'Japanese' THEN person_id END) AS japanese_va_count
+    FROM anime_voice_actor
+    GROUP BY anime_id
+) v ON a.anime_id = v.anime_id
+LEFT JOIN anime_prior_features p ON a.anime_id = p.anime_id;
@@ -0,0 +1,39 @@
+USE anime_project;
+
+-- 06_analysis_queries.sql용 사전 집계(summary) 테이블
+-- 합산 가능한 측정값(건수 / 합계)만 저장 → 평균과 상위 차원 roll-up은 합계를 다시 더한 뒤 나누어 계산
+-- scored_*: score가 있는 작품만 (06의 score IS NOT NULL 조건)
+-- ETL의 summary step(src/summary.py)이 feature_anime 갱신 후 전체를 다시 집계한다.
+
+DROP TABLE IF EXISTS summary_anime_cube;
+DROP TABLE IF EXISTS summary_studio_cube;
+
+-- 작품 단위: type × 방영 연도 × 장르 수 × 성우 수 구간
+CREATE TABLE summary_anime_cube (
+  type                VARCHAR(50),
+  start_year          INT,
+  genre_count         INT NOT NULL,
+  va_bucket           VARCHAR(10) NOT NULL,
+  anime_cnt           INT NOT NULL,
+  members_cnt         INT NOT NULL,
+  members_sum         BIGINT NOT NULL,
+  scored_cnt          INT NOT NULL,
+  score_sum           DECIMAL(14,2) NOT NULL,
+  scored_members_cnt  INT NOT NULL,
+  scored_members_sum  BIGINT NOT NULL
+) ENGINE=InnoDB;
+
+-- Studio 단위: studio × type × 방영 연도 (anime_company의 role = 'Studio' 행)
+CREATE TABLE summary_studio_cube (
+  company_id          INT NOT NULL,
+  studio_name         VARCHAR(255),
+  type                VARCHAR(50),
+  start_year          INT,
+  anime_cnt           INT NOT NULL,
+  members_cnt         INT NOT NULL,
+  members_sum         BIGINT NOT NULL,
+  scored_cnt          INT NOT NULL,
+  score_sum           DECIMAL(14,2) NOT NULL,
+  scored_members_cnt  INT NOT NULL,
+  scored_members_sum  BIGINT NOT NULL
+) ENGINE=InnoDB;
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import warnings
+warnings.filterwarnings('ignore')
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from linear_models import penalty
+from train_models import DEFAULT_RF_PARAMS, REPORTS_DIR, load_data
+
+
+# -------------------------
+# Config
+# -------------------------
+N_BOOT_LINEAR = int(os.getenv("BOOTSTRAP_N_OLS", "2000"))
+N_BOOT_RF = int(os.getenv("BOOTSTRAP_N_RF", "50"))
+BOOT_JOBS = int(os.getenv("BOOTSTRAP_JOBS", "0"))  # RF replicate 프로세스 수 (0: 전체 코어)
+LINEAR_BATCH = 250     # 한 번에 쌓아서 푸는 replicate 수 (메모리: batch × p², 행 수와 무관)
+CI_LEVEL = 0.95
+SEED = 42
+
+
+# -------------------------
+# Linear (OLS / Ridge): replicate를 쌓아 한 번에 solve
+# -------------------------
+def bootstrap_linear(X_train, y_train, X_test, y_test, n_boot: int = N_BOOT_LINEAR,
+                     alpha: float = 0.0, seed: int = SEED, batch: int = LINEAR_BATCH) -> tuple[np.ndarray, np.ndarray]:
+    # 재표본은 multinomial 가중치 w (행별 추출 횟수)로 표현 → Gram 행렬 G_b = (Z * w_b)ᵀ Z
+    # replicate마다 가중치 1개(n)만 만들고 batch 단위로 batched solve → 메모리는 n × (p+1) 수준 (n × p², B × n 행렬 없음)
+    # test 지표는 ZtᵀZt / Ztᵀyt로 계산 → test 예측 행렬(n_test × B)도 만들지 않음
+    # 반환: coefs (n_ok × (p+1)), metrics (n_ok × 2: test R2, RMSE) / Gram 행렬이 특이한 replicate는 제외
+    Z = np.column_stack([np.ones(len(X_train)), np.asarray(X_train, dtype = np.float64)])
+    y = np.asarray(y_train, dtype = np.float64)
+    Zt = np.column_stack([np.ones(len(X_test)), np.asarray(X_test, dtype = np.float64)])
+    yt = np.asarray(y_test, dtype = np.float64)
+
+    n, k = Z.shape
+    P = penalty(k - 1, alpha)
+    yt_c = yt - yt.mean()
+    tss = (yt_c ** 2).sum()
+    Gt, bt = Zt.T @ Zt, Zt.T @ yt_c
+
+    rng = np.random.default_rng(seed)
+    pvals = np.full(n, 1.0 / n)
+    coefs = np.empty((n_boot, k))
+    ok = np.ones(n_boot, dtype = bool)
+
+    for start in range(0, n_boot, batch):
+        B = min(batch, n_boot - start)
+        G = np.empty((B, k, k))
+        b = np.empty((B, k))
+        for i in range(B):
+            Zw = Z * rng.multinomial(n, pvals).astype(np.float64)[:, None]
+            G[i] = Zw.T @ Z + P
+            b[i] = Zw.T @ y
+
+        try:
+            coefs[start : start + B] = np.linalg.solve(G, b[:, :, None])[:, :, 0]
+        except np.linalg.LinAlgError:
+            # 일부 replicate가 특이 (예: 희소한 type 더미가 재표본에 한 번도 안 뽑힘) → 해당 replicate만 제외
+            for i in range(B):
+                try:
+                    coefs[start + i] = np.linalg.solve(G[i], b[i])
+                except np.linalg.LinAlgError:
+                    ok[start + i] = False
+
+    dropped = int((~ok).sum())
+    if dropped:
+        print(f"Linear bootstrap: dropped {dropped} of {n_boot} replicates (singular Gram matrix)")
+    coefs = coefs[ok]
+
+    # Zt θ - yt = Zt θc - yt_c (θc: 절편에서 ȳ를 뺀 계수) → sse = θcᵀ Gt θc - 2 θcᵀ bt + tss
+    theta_c = coefs.copy()
+    theta_c[:, 0] -= yt.mean()
+    sse = np.einsum("bi,ij,bj->b", theta_c, Gt, theta_c) - 2 * theta_c @ bt + tss
+    sse = np.maximum(sse, 0.0)  # 반올림 오차로 음수 방지
+    metrics = np.column_stack([1 - sse / tss, np.sqrt(sse / len(yt))])
+    return coefs, metrics
+
+
+# -------------------------
+# RandomForest: replicate별 process 병렬 / SeedSequence로 결정적 seed
+# -------------------------
+_DATA: dict = {}
+
+
+def _init_worker(X_train, y_train, X_test, y_test, params):
+    # worker마다 데이터를 한 번만 받아 둠 (task마다 pickle하지 않음)
+    _DATA.update(X_train = X_train, y_train = y_train, X_test = X_test, y_test = y_test, params = params)
+
+
+def _rf_replicate(seed_seq: np.random.SeedSequence) -> tuple[float, float, np.ndarray]:
+    X, y = _DATA["X_train"], _DATA["y_train"]
+    Xt, yt = _DATA["X_test"], _DATA["y_test"]
+
+    rng = np.random.default_rng(seed_seq)
+    idx = rng.integers(0, len(X), size = len(X))
+    rf_seed = int(seed_seq.generate_state(1)[0])
+
+    model = RandomForestRegressor(**_DATA["params"], random_state = rf_seed, n_jobs = 1)
+    model.fit(X[idx], y[idx])
+    pred = model.predict(Xt)
+
+    sse = float(((pred - yt) ** 2).sum())
+    r2 = 1 - sse / float(((yt - yt.mean()) ** 2).sum())
+    return r2, float(np.sqrt(sse / len(yt))), model.feature_importances_
+
+
+def bootstrap_rf(X_train, y_train, X_test, y_test, params: dict | None = None,
+                 n_boot: int = N_BOOT_RF, seed: int = SEED, n_jobs: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+    # 반환: metrics (n_boot × 2), importances (n_boot × p) / worker 수와 무관하게 같은 결과
+    params = {**DEFAULT_RF_PARAMS, **(params or {})}
+    arrays = [np.asarray(a, dtype = np.float64) for a in (X_train, y_train, X_test, y_test)]
+    seeds = np.random.SeedSequence(seed).spawn(n_boot)
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers = n_jobs, initializer = _init_worker, initargs = (*arrays, params)) as ex:
+        results = list(ex.map(_rf_replicate, seeds))
+
+    metrics = np.array([(r2, rmse) for r2, rmse, _ in results])
+    importances = np.vstack([imp for _, _, imp in results])
+    return metrics, importances
+
+
+# -------------------------
+# Summaries
+# -------------------------
+def summarize(samples: np.ndarray, names, level: float = CI_LEVEL, index_name: str = "feature") -> pd.DataFrame:
+    lo, hi = (1 - level) / 2, 1 - (1 - level) / 2
+    return pd.DataFrame({
+        "mean": samples.mean(axis = 0),
+        "std": samples.std(axis = 0, ddof = 1),
+        f"ci_{lo:.3f}": np.quantile(samples, lo, axis = 0),
+        f"ci_{hi:.3f}": np.quantile(samples, hi, axis = 0),
+    }, index = pd.Index(list(names), name = index_name))
+
+
+def load_tuned_rf_params() -> dict:
+    # train_models가 저장한 튜닝 결과가 있으면 같은 RF 설정으로 재표본
+    path = REPORTS_DIR / "tuning.json"
+    if path.exists():
+        return json.loads(path.read_text(encoding = "utf-8"))["rf"]["params"]
+    return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Bootstrap confidence intervals for OLS / RF.")
+    parser.add_argument("--n-boot-ols", type = int, default = N_BOOT_LINEAR)
+    parser.add_argument("--n-boot-rf", type = int, default = N_BOOT_RF)
+    parser.add_argument("--jobs", type = int, default = BOOT_JOBS or None, help = "RF worker processes (default: all cores)")
+    parser.add_argument("--seed", type = int, default = SEED)
+    args = parser.parse_args()
+
+    X_train, X_test, y_train, y_test = load_data()
+    cols = ["const"] + list(X_train.columns)
+    rf_params = load_tuned_rf_params()
+
+    t0 = time.perf_counter()
+    coefs, lin_metrics = bootstrap_linear(X_train, y_train, X_test, y_test, n_boot = args.n_boot_ols, seed = args.seed)
+    t1 = time.perf_counter()
+    print(f"OLS bootstrap: {len(coefs)} replicates in {t1 - t0:.2f}s")
+
+    rf_metrics, importances = bootstrap_rf(X_train, y_train, X_test, y_test, params = rf_params,
+                                           n_boot = args.n_boot_rf, seed = args.seed, n_jobs = args.jobs)
+    t2 = time.perf_counter()
+    print(f"RF bootstrap: {args.n_boot_rf} replicates in {t2 - t1:.2f}s")
+
+    coef_ci = summarize(coefs, cols)
+    metric_ci = pd.concat({
+        "ols": summarize(lin_metrics, ["test_r2", "test_rmse"], index_name = "metric"),
+        "rf": summarize(rf_metrics, ["test_r2", "test_rmse"], index_name = "metric"),
+    }, names = ["model"])
+    importance_ci = summarize(importances, X_train.columns).sort_values("mean", ascending = False)
+
+    coef_ci.to_csv(REPORTS_DIR / "bootstrap_ols_coefficients.csv")
+    metric_ci.to_csv(REPORTS_DIR / "bootstrap_metrics.csv")
+    importance_ci.to_csv(REPORTS_DIR / "bootstrap_rf_importance.csv")
+
+    print("\n=== OLS coefficients (95% CI) ===")
+    print(coef_ci)
+    print("\n=== Test metrics (95% CI) ===")
+    print(metric_ci)
+
+    print("\nSaved:")
+    print("- reports/bootstrap_ols_coefficients.csv")
+    print("- reports/bootstrap_metrics.csv")
+    print("- reports/bootstrap_rf_importance.csv")
+
+
+if __name__ == "__main__":
+    main()
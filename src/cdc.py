@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from typing import Tuple
+
+import pandas as pd
+
+
+# -----------------------------
+# Row hash (change data capture)
+# -----------------------------
+# etl_row_hash: 테이블별 마지막으로 적재한 정제 행의 hash
+# → 다음 실행에서는 hash가 새로 생기거나 바뀐 행만 upsert
+ROW_HASH_DDL = """
+CREATE TABLE IF NOT EXISTS etl_row_hash (
+  table_name  VARCHAR(64) NOT NULL,
+  row_key     BIGINT NOT NULL,
+  row_hash    BIGINT UNSIGNED NOT NULL,
+  updated_at  TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (table_name, row_key)
+) ENGINE=InnoDB;
+""".strip()
+
+HASH_CHUNK_SIZE = 5000
+
+
+def row_hashes(df: pd.DataFrame) -> pd.Series:
+    # 정제된 tuple 기준 64bit hash / dtype 차이(Int64 vs float 등)에 흔들리지 않도록 문자열로 통일
+    # 결측(NaN / None / pd.NA / NaT)은 읽은 경로와 무관하게 같은 값("None")으로 맞춘 뒤 문자열화
+    norm = df.astype(object).where(df.notna(), None)
+    return pd.util.hash_pandas_object(norm.astype(str), index = False)
+
+
+def load_stored_hashes(cur, table: str) -> pd.DataFrame:
+    cur.execute(ROW_HASH_DDL)
+
+    # 대상 테이블이 비어 있으면(스키마 재생성 등) 저장된 hash는 무효 → 전체 적재
+    cur.execute(f"SELECT 1 FROM {table} LIMIT 1;")
+    if not cur.fetchall():
+        cur.execute("DELETE FROM etl_row_hash WHERE table_name = %s;", (table,))
+        return pd.DataFrame({"row_key": pd.Series(dtype = "int64"), "row_hash": pd.Series(dtype = "uint64")})
+
+    cur.execute("SELECT row_key, row_hash FROM etl_row_hash WHERE table_name = %s;", (table,))
+    stored = pd.DataFrame(cur.fetchall(), columns = ["row_key", "row_hash"])
+    return stored.astype({"row_key": "int64", "row_hash": "uint64"})
+
+
+def diff_rows(cur, df: pd.DataFrame, table: str, key: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    # 반환: (적재할 신규/변경 행, 저장할 hash 행)
+    current = pd.DataFrame({
+        "row_key": df[key].astype("int64").to_numpy(),
+        "row_hash": row_hashes(df).to_numpy(),
+    })
+    stored = load_stored_hashes(cur, table)
+
+    merged = current.merge(stored, on = "row_key", how = "outer", suffixes = ("", "_old"), indicator = True)
+    is_new = (merged["_merge"] == "left_only").to_numpy()
+    is_deleted = (merged["_merge"] == "right_only").to_numpy()
+    both = (merged["_merge"] == "both").to_numpy()
+    is_changed = both & (merged["row_hash"].to_numpy() != merged["row_hash_old"].to_numpy())
+
+    send_keys = merged.loc[is_new | is_changed, "row_key"]
+    mask = df[key].astype("int64").isin(send_keys).to_numpy()
+
+    print(f"{table}: {int(is_new.sum())} new, {int(is_changed.sum())} changed, "
+          f"{int(both.sum() - is_changed.sum())} unchanged, "
+          f"{int(is_deleted.sum())} deleted from source (kept in DB)")
+
+    return df[mask], current[mask]
+
+
+def save_hashes(cur, table: str, hashes: pd.DataFrame) -> int:
+    # 적재와 같은 트랜잭션에서 hash 갱신 → commit 실패 시 함께 롤백
+    if hashes.empty:
+        return 0
+    sql = """
+    INSERT INTO etl_row_hash (table_name, row_key, row_hash)
+    VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+      row_hash = VALUES(row_hash);
+    """.strip()
+    rows = [(table, int(k), int(h)) for k, h in hashes.itertuples(index = False, name = None)]
+    for i in range(0, len(rows), HASH_CHUNK_SIZE):
+        cur.executemany(sql, rows[i : i + HASH_CHUNK_SIZE])
+    return len(rows)
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import mysql.connector
+import mysql.connector.pooling
+from mysql.connector.errors import PoolError
+from dotenv import load_dotenv
+
+import embedded_db
+
+load_dotenv()
+
+
+# -----------------------------
+# Database Config (Environment Variables Only)
+# -----------------------------
+DB = {
+    "host": os.getenv("DB_HOST"),
+    "user": os.getenv("DB_USER"),
+    "password": os.getenv("DB_PASSWORD"),
+    "database": os.getenv("DB_NAME"),
+    "port": int(os.getenv("DB_PORT", "3306")),
+}
+
+# DB_BACKEND=duckdb / sqlite / embedded(DuckDB, 없으면 SQLite) 이면 MySQL 서버 없이 파일 DB(DB_PATH) 사용
+BACKEND = embedded_db.resolve_engine(os.getenv("DB_BACKEND", "mysql").lower())
+EMBEDDED = BACKEND in ("duckdb", "sqlite")
+DB_PATH = Path(os.getenv("DB_PATH") or Path(__file__).resolve().parents[1] / "data" / f"anime_project.{BACKEND}")
+
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # pool이 비었을 때 대기 시간(초)
+
+# 반복 실행되는 INSERT를 server-side prepared statement로 실행
+# (기본 cursor의 executemany는 multi-row INSERT로 묶어 보내므로 대량 적재는 기본값이 더 빠름)
+PREPARED = os.getenv("DB_PREPARED", "0") == "1"
+
+_pool = None
+_pool_lock = threading.Lock()
+
+_stats: Dict[str, List[float]] = {}  # statement → [호출 수, 누적 시간, 최대 시간]
+_stats_lock = threading.Lock()
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def validate_db_config(): # 환경변수 설정 검사
+    if EMBEDDED:
+        return
+    missing = [k for k, v in DB.items() if v is None and k != "port"]
+    if missing:
+        raise ValueError(f"Missing DB environment variables: {missing}\n"
+                          "Set DB_HOST, DB_USER, DB_PASSWORD, DB_NAME before running.")
+
+
+def init_pool(size: int | None = None, **extra):
+    # 프로세스당 pool 1개 / 최초 호출 시 설정이 적용됨 (allow_local_infile 등은 extra로 전달)
+    global _pool
+    with _pool_lock:
+        if _pool is None and EMBEDDED:
+            _pool = embedded_db.EmbeddedDatabase(DB_PATH, BACKEND)
+        if _pool is None:
+            validate_db_config()
+            size = max(1, min(size or POOL_SIZE, 32))  # mysql.connector pool 최대 32
+            _pool = mysql.connector.pooling.MySQLConnectionPool(
+                pool_name = "anime_project", pool_size = size, **DB, **extra)
+        return _pool
+
+
+def close_pool() -> None:
+    # embedded DB는 파일을 닫음 (MySQL pool은 반환된 connection을 프로세스 종료 시 정리)
+    global _pool
+    with _pool_lock:
+        if isinstance(_pool, embedded_db.EmbeddedDatabase):
+            _pool.close()
+        _pool = None
+
+
+def _record(statement: str, seconds: float) -> None:
+    key = " ".join(statement.split())[:80]
+    with _stats_lock:
+        s = _stats.setdefault(key, [0, 0.0, 0.0])
+        s[0] += 1
+        s[1] += seconds
+        s[2] = max(s[2], seconds)
+
+
+class TimedCursor: # execute / executemany 소요 시간을 statement별로 집계
+    def __init__(self, cursor, connection):
+        self._cursor = cursor
+        self._connection = connection
+        self._prepared = None
+
+    def execute(self, operation, params = None, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            if params is None:
+                return self._cursor.execute(operation, *args, **kwargs)
+            return self._cursor.execute(operation, params, *args, **kwargs)
+        finally:
+            _record(operation, time.perf_counter() - start)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, seq_params, *args, **kwargs)
+        finally:
+            _record(operation, time.perf_counter() - start)
+
+    def prepared(self) -> "TimedCursor": # 같은 connection의 prepared cursor (재사용)
+        if self._prepared is None:
+            self._prepared = TimedCursor(self._connection.cursor(prepared = True), self._connection)
+        return self._prepared
+
+    def close(self):
+        if self._prepared is not None:
+            self._prepared.close()
+            self._prepared = None
+        return self._cursor.close()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class TimedConnection: # pooled connection 래퍼 / cursor()가 TimedCursor를 반환
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self, *args, **kwargs) -> TimedCursor:
+        return TimedCursor(self._connection.cursor(*args, **kwargs), self._connection)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+def get_connection(timeout: float = POOL_TIMEOUT) -> TimedConnection:
+    # pool에서 connection을 꺼내고 ping으로 상태 확인 (끊긴 경우 재연결)
+    # close() 하면 실제로 끊지 않고 pool로 반환됨
+    pool = init_pool()
+    if EMBEDDED:
+        return TimedConnection(pool.connect())
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            conn = pool.get_connection()
+            break
+        except PoolError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.05)
+
+    conn.ping(reconnect = True, attempts = 3, delay = 1)
+    return TimedConnection(conn)
+
+
+@contextmanager
+def connection():
+    conn = get_connection()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def connect_db(**extra): # pool을 거치지 않는 단일 연결
+    if EMBEDDED:
+        return TimedConnection(init_pool().connect())
+    validate_db_config()
+    return TimedConnection(mysql.connector.connect(**DB, **extra))
+
+
+# -----------------------------
+# Query timing
+# -----------------------------
+def query_stats() -> List[Tuple[str, int, float, float]]:
+    # (statement, calls, total_sec, max_sec) / 누적 시간 내림차순
+    with _stats_lock:
+        rows = [(k, int(v[0]), v[1], v[2]) for k, v in _stats.items()]
+    return sorted(rows, key = lambda r: r[2], reverse = True)
+
+
+def reset_query_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+def format_query_stats(top: int = 10) -> str:
+    lines = [f"{'calls':>7} {'total s':>9} {'max s':>8}  statement"]
+    for stmt, calls, total, mx in query_stats()[:top]:
+        lines.append(f"{calls:>7} {total:>9.3f} {mx:>8.3f}  {stmt}")
+    return "\n".join(lines)
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import warnings
+warnings.filterwarnings('ignore')
+
+import json
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from linear_models import gram, solve_gram
+from train_models import REPORTS_DIR, load_data
+
+
+# -------------------------
+# Config
+# -------------------------
+VIF_THRESHOLD = 10.0   # README의 변수 정리 기준
+TOP_INFLUENCE = 20
+
+
+# -------------------------
+# Multicollinearity
+# -------------------------
+def vif_table(X: pd.DataFrame) -> pd.DataFrame:
+    # VIF_j = [R⁻¹]_jj (R: feature 상관행렬) → 보조회귀 p번 대신 역행렬 1번
+    # 절편 포함 보조회귀(statsmodels variance_inflation_factor + add_constant)와 같은 값
+    Xa = np.asarray(X, dtype = np.float64)
+    std = Xa.std(axis = 0)
+    ok = std > 0
+
+    R = np.corrcoef(Xa[:, ok], rowvar = False)
+    vif = np.full(Xa.shape[1], np.nan)
+    try:
+        vif[ok] = np.diag(np.linalg.inv(R))
+    except np.linalg.LinAlgError:
+        vif[ok] = np.inf  # 완전 공선성
+
+    out = pd.DataFrame({"feature": list(X.columns), "vif": vif})
+    out["r2_on_others"] = 1 - 1 / out["vif"]
+    out["flag"] = np.where(out["vif"] >= VIF_THRESHOLD, f"VIF >= {VIF_THRESHOLD:g}", "")
+    return out.sort_values("vif", ascending = False).reset_index(drop = True)
+
+
+def condition_numbers(X: pd.DataFrame) -> dict:
+    # raw: 절편 포함 설계행렬 (statsmodels summary의 Cond. No.)
+    # scaled: 열을 단위 길이로 정규화 (Belsley condition index, 30 이상이면 공선성 의심)
+    Z = np.column_stack([np.ones(len(X)), np.asarray(X, dtype = np.float64)])
+    s_raw = np.linalg.svd(Z, compute_uv = False)
+
+    norms = np.linalg.norm(Z, axis = 0)
+    s_scaled = np.linalg.svd(Z / np.where(norms > 0, norms, 1), compute_uv = False)
+
+    return {
+        "raw": float(s_raw[0] / s_raw[-1]),
+        "scaled": float(s_scaled[0] / s_scaled[-1]),
+        "condition_indices": [round(float(s_scaled[0] / s), 3) for s in s_scaled],
+    }
+
+
+# -------------------------
+# Residual diagnostics (OLS)
+# -------------------------
+def _lm_test(e2: np.ndarray, design: np.ndarray) -> dict:
+    # 잔차² 를 설계행렬에 회귀 → LM = n R² ~ χ²(rank - 1) (Koenker studentized 형태)
+    n = len(e2)
+    coef, _, rank, _ = np.linalg.lstsq(design, e2, rcond = None)
+    fitted = design @ coef
+    r2 = 1 - ((e2 - fitted) ** 2).sum() / ((e2 - e2.mean()) ** 2).sum()
+    lm = float(n * r2)
+    df = int(rank) - 1
+    return {"lm": lm, "df": df, "p_value": float(stats.chi2.sf(lm, df))}
+
+
+def white_design(X: np.ndarray) -> np.ndarray:
+    # 절편 + X + 모든 제곱·교차항 (upper triangle) / 더미 제곱 등 중복 열은 lstsq rank로 처리
+    n, p = X.shape
+    iu, ju = np.triu_indices(p)
+    return np.column_stack([np.ones(n), X, X[:, iu] * X[:, ju]])
+
+
+def influence(X: np.ndarray, resid: np.ndarray, A_inv: np.ndarray, sigma2: float) -> pd.DataFrame:
+    # leverage h_i = z_iᵀ (ZᵀZ)⁻¹ z_i 를 행렬곱 한 번으로 (hat 행렬 n×n 생성 없음)
+    Z = np.column_stack([np.ones(len(X)), X])
+    k = Z.shape[1]
+    h = np.einsum("ij,jk,ik->i", Z, A_inv, Z)
+
+    r = resid / np.sqrt(sigma2 * (1 - h))        # 내적 studentized residual
+    cooks = r ** 2 / k * h / (1 - h)
+    return pd.DataFrame({"leverage": h, "studentized_resid": r, "cooks_d": cooks})
+
+
+def residual_diagnostics(X_train: pd.DataFrame, y_train) -> tuple[dict, pd.DataFrame]:
+    Xa = np.asarray(X_train, dtype = np.float64)
+    ya = np.asarray(y_train, dtype = np.float64)
+    n = len(Xa)
+
+    theta, A_inv = solve_gram(*gram(Xa, ya))
+    resid = ya - (Xa @ theta[1:] + theta[0])
+    sigma2 = float(resid @ resid) / (n - Xa.shape[1] - 1)
+
+    e2 = resid ** 2
+    bp = _lm_test(e2, np.column_stack([np.ones(n), Xa]))
+    white = _lm_test(e2, white_design(Xa))
+
+    infl = influence(Xa, resid, A_inv, sigma2)
+    k = Xa.shape[1] + 1
+    summary = {
+        "breusch_pagan": bp,
+        "white": white,
+        "jarque_bera": dict(zip(["stat", "p_value"], map(float, stats.jarque_bera(resid)))),
+        "durbin_watson": float((np.diff(resid) ** 2).sum() / e2.sum()),
+        "influence": {
+            "high_leverage (h > 2k/n)": int((infl["leverage"] > 2 * k / n).sum()),
+            "large_resid (|r| > 3)": int((infl["studentized_resid"].abs() > 3).sum()),
+            "influential (cooks_d > 4/n)": int((infl["cooks_d"] > 4 / n).sum()),
+            "max_cooks_d": float(infl["cooks_d"].max()),
+        },
+    }
+    return summary, infl
+
+
+# -------------------------
+# Report
+# -------------------------
+def format_report(vif: pd.DataFrame, cond: dict, resid: dict, n: int, seconds: float) -> str:
+    lines = [f"=== Multicollinearity (train, n = {n:,}) ===",
+             vif.to_string(index = False, float_format = lambda v: f"{v:.3f}"),
+             "",
+             f"Condition number (raw, with const): {cond['raw']:.1f}",
+             f"Condition number (scaled):          {cond['scaled']:.1f}",
+             "",
+             "=== Residual diagnostics (OLS) ==="]
+    for name in ("breusch_pagan", "white"):
+        t = resid[name]
+        lines.append(f"{name:<14} LM = {t['lm']:.2f}, df = {t['df']}, p = {t['p_value']:.4g}")
+    jb = resid["jarque_bera"]
+    lines.append(f"{'jarque_bera':<14} JB = {jb['stat']:.2f}, p = {jb['p_value']:.4g}")
+    lines.append(f"{'durbin_watson':<14} {resid['durbin_watson']:.3f}")
+    lines.append("")
+    lines.append("=== Influence ===")
+    lines += [f"{k}: {v:.4g}" if isinstance(v, float) else f"{k}: {v}" for k, v in resid["influence"].items()]
+    lines.append("")
+    lines.append(f"computed in {seconds:.2f}s")
+    return "\n".join(lines)
+
+
+def main():
+    X_train, X_test, y_train, y_test = load_data()
+
+    t0 = time.perf_counter()
+    vif = vif_table(X_train)
+    cond = condition_numbers(X_train)
+    resid, infl = residual_diagnostics(X_train, y_train)
+    seconds = time.perf_counter() - t0
+
+    report = format_report(vif, cond, resid, len(X_train), seconds)
+    print(report)
+
+    vif.to_csv(REPORTS_DIR / "vif.csv", index = False)
+    (REPORTS_DIR / "diagnostics.txt").write_text(report + "\n", encoding = "utf-8")
+    (REPORTS_DIR / "diagnostics.json").write_text(
+        json.dumps({"condition_number": cond, **resid}, indent = 2), encoding = "utf-8")
+
+    top = infl.assign(row = np.arange(len(infl))).nlargest(TOP_INFLUENCE, "cooks_d")
+    top.to_csv(REPORTS_DIR / "influence_top.csv", index = False)
+
+    print("\nSaved:")
+    print("- reports/vif.csv")
+    print("- reports/diagnostics.txt")
+    print("- reports/diagnostics.json")
+    print("- reports/influence_top.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:  # DuckDB가 없으면 SQLite 사용
+    duckdb = None
+
+
+# -----------------------------
+# Embedded backend (DuckDB / SQLite)
+# -----------------------------
+# MySQL 서버 없이 파일 하나로 schema / ETL / feature_anime 생성을 실행
+# 코드와 sql/ 스크립트는 MySQL 문법 그대로 두고, cursor가 실행 직전에 dialect를 변환한다.
+#   INSERT IGNORE            → INSERT OR IGNORE
+#   ON DUPLICATE KEY UPDATE  → ON CONFLICT (<PK>) DO UPDATE SET ..., VALUES(x) → excluded.x
+#   %s                       → ?
+#   YEAR(x)                  → CAST(strftime('%Y', x) AS INTEGER)   (SQLite)
+#   ENGINE=InnoDB, USE, FOREIGN KEY, AUTO_INCREMENT 등 MySQL 전용 DDL 정리 (DuckDB는 CREATE INDEX도 생략)
+# FOREIGN KEY는 적용하지 않음 (ETL은 entity master보다 관계 테이블을 먼저 적재하며,
+# DuckDB는 FK가 걸린 부모 행의 upsert를 허용하지 않음)
+INT64_MAX = 2**63 - 1
+
+
+def resolve_engine(name: str) -> str:
+    # "embedded": DuckDB 우선, 설치되지 않았으면 SQLite
+    if name == "embedded":
+        return "duckdb" if duckdb is not None else "sqlite"
+    if name == "duckdb" and duckdb is None:
+        raise ImportError("DB_BACKEND=duckdb requires the duckdb package (pip install duckdb) "
+                          "or use DB_BACKEND=sqlite / embedded.")
+    return name
+
+
+# -----------------------------
+# Dialect translation
+# -----------------------------
+_RE_COMMENT = re.compile(r"--[^\n]*")
+_RE_INSERT_IGNORE = re.compile(r"\bINSERT\s+IGNORE\s+INTO\b", re.I)
+_RE_ON_DUP = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.I)
+_RE_VALUES_REF = re.compile(r"\bVALUES\s*\(\s*(\w+)\s*\)", re.I)
+_RE_ENGINE = re.compile(r"\)\s*(ENGINE\s*=\s*\w+|DEFAULT\s+CHARSET\s*=\s*\w+|\s)*;?\s*$", re.I)
+_RE_FK = re.compile(r",\s*FOREIGN\s+KEY\s*\([^)]*\)\s*REFERENCES\s+\w+\s*\([^)]*\)", re.I)
+_RE_INLINE_KEY = re.compile(r",\s*(?:KEY|INDEX)\s+\w+\s*\([^)]*\)", re.I)
+_RE_UNIQUE_KEY = re.compile(r"\bUNIQUE\s+(?:KEY|INDEX)\s+\w+\s*\(", re.I)
+_RE_ON_UPDATE_TS = re.compile(r"\s+ON\s+UPDATE\s+CURRENT_TIMESTAMP", re.I)
+_RE_AUTO_INC = re.compile(r"\b(\w+)\s+INT(?:EGER)?\s+AUTO_INCREMENT\s+PRIMARY\s+KEY", re.I)
+_RE_CREATE_TABLE = re.compile(r"^\s*CREATE\s+(?:TEMPORARY\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)", re.I)
+_RE_DROP_INDEX = re.compile(r"^\s*DROP\s+INDEX\s+(\w+)\s+ON\s+\w+\s*;?\s*$", re.I)
+_RE_YEAR = re.compile(r"\bYEAR\s*\(([^()]*)\)", re.I)
+_RE_DROP_TEMP = re.compile(r"\bDROP\s+TEMPORARY\s+TABLE\b", re.I)
+_RE_DROP_VIEW = re.compile(r"^\s*DROP\s+VIEW\s+IF\s+EXISTS\s+(\w+)\s*;?\s*$", re.I)
+_RE_CREATE_INDEX = re.compile(r"^\s*CREATE\s+INDEX\b", re.I)
+_RE_DDL = re.compile(r"^\s*(CREATE|DROP|ALTER)\s", re.I)
+_RE_TEMPORARY = re.compile(r"^\s*(CREATE|DROP)\s+TEMPORARY\s", re.I)
+_RE_DELETE = re.compile(r"^\s*DELETE\s+FROM\s+(\w+)", re.I)
+_RE_USE = re.compile(r"^\s*USE\s+\w+\s*;?\s*$", re.I)
+_RE_INSERT_TABLE = re.compile(r"^\s*INSERT\s+(?:OR\s+IGNORE\s+)?INTO\s+(\w+)", re.I)
+_RE_INSERT_VALUES = re.compile(
+    r"^\s*INSERT\s+(OR\s+IGNORE\s+)?INTO\s+(\w+)\s*\(([^)]*)\)\s*VALUES\s*\(\s*\?(?:\s*,\s*\?)*\s*\)(.*)$",
+    re.I | re.S)
+
+
+def translate(sql: str, engine: str) -> str:
+    # MySQL 문 1개 → DuckDB / SQLite 문 (빈 문자열이면 실행하지 않음)
+    sql = _RE_COMMENT.sub("", sql).strip()
+    if not sql or _RE_USE.match(sql):
+        return ""
+    if engine == "duckdb" and (_RE_CREATE_INDEX.match(sql) or _RE_DROP_INDEX.match(sql)):
+        # DuckDB는 secondary index가 걸린 컬럼을 ON CONFLICT DO UPDATE로 갱신할 수 없음
+        # (columnar scan + zonemap으로 충분하므로 일반 index는 만들지 않음)
+        return ""
+
+    sql = _RE_INSERT_IGNORE.sub("INSERT OR IGNORE INTO", sql)
+    if _RE_ON_DUP.search(sql):
+        head, tail = _RE_ON_DUP.split(sql, maxsplit = 1)
+        sql = head + "ON CONFLICT DO UPDATE SET" + _RE_VALUES_REF.sub(r"excluded.\1", tail)
+    sql = _RE_DROP_TEMP.sub("DROP TABLE", sql)
+    sql = _RE_DROP_INDEX.sub(r"DROP INDEX IF EXISTS \1", sql)  # DROP INDEX name ON table → index 이름만
+    sql = sql.replace("%s", "?")
+    if engine == "sqlite":  # SQLite에는 YEAR()가 없음 (DATE는 'YYYY-MM-DD' 문자열로 저장됨)
+        sql = _RE_YEAR.sub(r"CAST(strftime('%Y', \1) AS INTEGER)", sql)
+
+    if _RE_CREATE_TABLE.match(sql):
+        sql = _RE_FK.sub("", sql)
+        sql = _RE_INLINE_KEY.sub("", sql)          # 테이블 안의 일반 KEY idx (...) 는 생략
+        sql = _RE_UNIQUE_KEY.sub("UNIQUE (", sql)  # UNIQUE KEY name (...) → UNIQUE (...)
+        sql = _RE_ON_UPDATE_TS.sub("", sql)
+        sql = _RE_ENGINE.sub(")", sql)
+        sql = sql.replace("BIGINT UNSIGNED", "UBIGINT" if engine == "duckdb" else "INTEGER")
+        if engine == "sqlite":
+            sql = _RE_AUTO_INC.sub(r"\1 INTEGER PRIMARY KEY", sql)
+
+    return sql.rstrip().rstrip(";")
+
+
+def implicit_indexes(sql: str) -> List[str]:
+    # SQLite: InnoDB가 FOREIGN KEY / KEY idx (...) 로 만들던 index를 CREATE INDEX로 분리
+    # (FK 컬럼 lookup이 full scan이 되지 않도록 / PK 앞부분과 같으면 생략 / DuckDB는 hash join을 쓰므로 생략)
+    m = _RE_CREATE_TABLE.match(sql)
+    if not m:
+        return []
+    table, out = m.group(1), []
+    pk = re.search(r"PRIMARY\s+KEY\s*\(([^)]*)\)", sql, re.I) or re.search(r"(\w+)\s+\w+(?:\(\d+\))?\s+PRIMARY\s+KEY", sql, re.I)
+    pk_cols = [c.strip() for c in pk.group(1).split(",")] if pk else []
+    for cols in re.findall(r"(?:FOREIGN\s+KEY|[,(]\s*(?:KEY|INDEX)\s+\w+)\s*\(([^)]*)\)", sql, re.I):
+        cols = [c.strip() for c in cols.split(",")]
+        if cols == pk_cols[:len(cols)]:
+            continue
+        out.append(f"CREATE INDEX IF NOT EXISTS idx_{table}_{'_'.join(cols)} ON {table} ({', '.join(cols)})")
+    return list(dict.fromkeys(out))
+
+
+def auto_increment_sequences(sql: str) -> Tuple[str, List[str]]:
+    # DuckDB: AUTO_INCREMENT 컬럼 → sequence DEFAULT (CREATE SEQUENCE 문을 함께 반환)
+    m = _RE_CREATE_TABLE.match(sql)
+    if not m:
+        return sql, []
+    table, seqs = m.group(1), []
+
+    def repl(col):
+        seq = f"seq_{table}_{col.group(1)}"
+        seqs.append(f"CREATE SEQUENCE IF NOT EXISTS {seq}")
+        return f"{col.group(1)} INTEGER PRIMARY KEY DEFAULT nextval('{seq}')"
+
+    return _RE_AUTO_INC.sub(repl, sql), seqs
+
+
+# -----------------------------
+# Connection / Cursor (mysql.connector와 같은 사용법)
+# -----------------------------
+class EmbeddedCursor:
+    def __init__(self, conn: "EmbeddedConnection"):
+        self._conn = conn
+        # DuckDB의 cursor()는 별도 connection(별도 transaction)이므로 connection 객체를 직접 사용
+        self._cur = conn._raw if conn.engine == "duckdb" else conn._raw.cursor()
+        self.rowcount = -1
+
+    # --- execute ---
+    def execute(self, operation: str, params: Sequence | None = None):
+        sql = translate(operation, self._conn.engine)
+        self.rowcount = -1
+        if not sql or self._skip_drop_view(sql):
+            return self
+
+        ddl = bool(_RE_DDL.match(sql))
+        if ddl:
+            self._conn._db.clear_cache()
+        if self._conn.engine == "duckdb":
+            sql, seqs = auto_increment_sequences(sql)
+            if ddl and not _RE_TEMPORARY.search(operation):
+                # MySQL처럼 DDL 전에 implicit commit 후 autocommit으로 실행
+                # (여러 thread의 CREATE TABLE IF NOT EXISTS가 catalog write-write conflict를 내지 않도록 lock으로 직렬화)
+                self._conn.commit()
+                with self._conn._db._lock:
+                    for stmt in seqs + [sql]:
+                        self._cur.execute(stmt)
+                return self
+            self._commit_before_reinsert(sql)
+            self._conn._begin()
+            for stmt in seqs:
+                self._cur.execute(stmt)
+
+        sql = self._conflict_target(sql)
+        params = self._adapt(params) if params is not None else None
+        if params is None:
+            self._cur.execute(sql)
+        else:
+            self._cur.execute(sql, params)
+        self._set_rowcount(sql)
+        if self._conn.engine == "sqlite":
+            for stmt in implicit_indexes(_RE_COMMENT.sub("", operation)):
+                self._cur.execute(stmt)
+        return self
+
+    def executemany(self, operation: str, seq_params: Sequence[Sequence]):
+        sql = translate(operation, self._conn.engine)
+        rows = list(seq_params)
+        self.rowcount = -1
+        if not rows:
+            self.rowcount = 0
+            return self
+        if self._conn.engine == "duckdb":
+            self._commit_before_reinsert(sql)
+        self._conn._begin()
+        sql = self._conflict_target(sql)
+
+        m = _RE_INSERT_VALUES.match(sql)
+        if self._conn.engine == "duckdb" and m:
+            # DuckDB executemany는 행마다 statement를 실행하므로 DataFrame을 등록해 INSERT ... SELECT 한 번으로 적재
+            return self._insert_frame(m, rows)
+
+        if self._conn.engine == "sqlite":
+            rows = [self._adapt(r) for r in rows]
+        self._cur.executemany(sql, rows)
+        self.rowcount = self._cur.rowcount if self._conn.engine == "sqlite" else len(rows)
+        return self
+
+    def _insert_frame(self, m: re.Match, rows: List[Sequence]):
+        ignore, table, col_list, tail = m.group(1), m.group(2), m.group(3), m.group(4)
+        cols = [c.strip() for c in col_list.split(",")]
+        df = pd.DataFrame(rows, columns = cols, dtype = object)
+
+        # 같은 batch 안의 중복 key는 DuckDB에서 오류 → MySQL처럼 IGNORE는 첫 행, UPDATE는 마지막 행 사용
+        pk = [c for c in self._conn.primary_key(table) if c in cols]
+        if pk:
+            df = df.drop_duplicates(subset = pk, keep = "first" if ignore else "last")
+
+        name = f"_rows_{id(self)}"
+        self._cur.register(name, df)
+        try:
+            verb = "INSERT OR IGNORE INTO" if ignore else "INSERT INTO"
+            self._cur.execute(f"{verb} {table} ({', '.join(cols)}) SELECT * FROM {name} {tail}")
+            self._set_rowcount("INSERT")
+        finally:
+            self._cur.unregister(name)
+        return self
+
+    # --- helpers ---
+    def _commit_before_reinsert(self, sql: str) -> None:
+        # DuckDB 0.10: 같은 transaction에서 DELETE한 key를 다시 INSERT하면 PK 위반 (ON CONFLICT로 우회하면 행이 사라짐)
+        # → DELETE가 있었던 테이블에 INSERT하기 전에 commit (DuckDB에서는 DELETE/INSERT 쌍이 하나의 transaction이 아님)
+        m = _RE_DELETE.match(sql)
+        if m:
+            self._conn._deleted.add(m.group(1))
+            return
+        m = _RE_INSERT_TABLE.match(sql)
+        if m and m.group(1) in self._conn._deleted:
+            self._conn.commit()
+
+    def _conflict_target(self, sql: str) -> str:
+        # UNIQUE 제약이 여러 개인 테이블은 DuckDB가 conflict target을 요구 → PK를 명시
+        m = _RE_INSERT_TABLE.match(sql)
+        if not m or "ON CONFLICT DO UPDATE" not in sql:
+            return sql
+        pk = self._conn.primary_key(m.group(1))
+        return sql.replace("ON CONFLICT DO UPDATE", f"ON CONFLICT ({', '.join(pk)}) DO UPDATE") if pk else sql
+
+    def _skip_drop_view(self, sql: str) -> bool:
+        # 05_build_features.sql의 DROP VIEW IF EXISTS: feature_anime이 이미 table이면 건너뜀 (DuckDB/SQLite는 타입이 다르면 오류)
+        m = _RE_DROP_VIEW.match(sql)
+        return bool(m) and self._conn.object_type(m.group(1)) == "table"
+
+    def _adapt(self, params: Sequence) -> Tuple:
+        # SQLite INTEGER는 signed 64bit → BIGINT UNSIGNED 값(row hash)은 2의 보수로 저장 (읽을 때 uint64로 복원)
+        if self._conn.engine != "sqlite":
+            return tuple(params)
+        return tuple(v - 2**64 if type(v) is int and v > INT64_MAX else v for v in params)
+
+    def _set_rowcount(self, sql: str) -> None:
+        verb = sql.lstrip().split(None, 1)[0].upper()
+        if self._conn.engine == "sqlite":
+            self.rowcount = self._cur.rowcount
+        elif verb in ("INSERT", "UPDATE", "DELETE"):
+            # DuckDB: DML 결과로 변경 행 수 1행이 반환됨
+            row = self._cur.fetchone()
+            self.rowcount = int(row[0]) if row else -1
+
+    # --- fetch ---
+    @property
+    def description(self):
+        return self._cur.description
+
+    def fetchone(self):
+        return self._cur.fetchone()
+
+    def fetchmany(self, size: int = 1):
+        return self._cur.fetchmany(size)
+
+    def fetchall(self):
+        return self._cur.fetchall()
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self):
+        if self._conn.engine == "sqlite":
+            self._cur.close()
+
+
+class EmbeddedConnection:
+    # MySQL처럼 첫 문장에서 transaction을 시작하고 commit/rollback으로 끝냄
+    def __init__(self, database: "EmbeddedDatabase", raw):
+        self._db = database
+        self._raw = raw
+        self.engine = database.engine
+        self._in_tx = False
+        self._deleted = set()  # 현재 transaction에서 DELETE한 테이블 (DuckDB)
+
+    def cursor(self, *args, **kwargs) -> EmbeddedCursor:  # prepared=True 등 MySQL 옵션은 무시
+        return EmbeddedCursor(self)
+
+    def _begin(self) -> None:
+        if self.engine == "duckdb" and not self._in_tx:
+            self._raw.execute("BEGIN TRANSACTION")
+            self._in_tx = True
+
+    def commit(self) -> None:
+        if self.engine == "sqlite":
+            self._raw.commit()
+        elif self._in_tx:
+            self._raw.execute("COMMIT")
+            self._in_tx = False
+        self._deleted.clear()
+
+    def rollback(self) -> None:
+        if self.engine == "sqlite":
+            self._raw.rollback()
+        elif self._in_tx:
+            self._raw.execute("ROLLBACK")
+            self._in_tx = False
+        self._deleted.clear()
+
+    def ping(self, *args, **kwargs) -> None:
+        pass
+
+    def close(self) -> None:
+        self.rollback()  # commit하지 않은 변경은 MySQL과 같이 버림
+        self._raw.close()
+
+    def _query(self, sql: str, params: Tuple) -> List[Tuple]:
+        # catalog 조회도 같은 connection에서 실행 (commit 전 DDL이 보이도록)
+        return self._raw.execute(sql, params).fetchall()
+
+    def primary_key(self, table: str) -> List[str]:
+        cache = self._db.pk_cache
+        if table not in cache:
+            if self.engine == "duckdb":
+                rows = self._query("SELECT constraint_column_names FROM duckdb_constraints() "
+                                   "WHERE table_name = ? AND constraint_type = 'PRIMARY KEY';", (table,))
+                cache[table] = list(rows[0][0]) if rows else []
+            else:
+                rows = self._query("SELECT name, pk FROM pragma_table_info(?) WHERE pk > 0;", (table,))
+                cache[table] = [name for name, _ in sorted(rows, key = lambda r: r[1])]
+        return cache[table]
+
+    def object_type(self, name: str) -> str | None:
+        if self.engine == "duckdb":
+            rows = self._query("SELECT table_type FROM information_schema.tables WHERE table_name = ?;", (name,))
+            return None if not rows else ("view" if rows[0][0] == "VIEW" else "table")
+        rows = self._query("SELECT type FROM sqlite_master WHERE name = ?;", (name,))
+        return rows[0][0] if rows else None
+
+
+class EmbeddedDatabase:
+    # DuckDB: 프로세스당 database 1개 + thread별 cursor(독립 connection)
+    # SQLite: 호출마다 새 connection (쓰기는 파일 lock으로 직렬화)
+    def __init__(self, path: Path, engine: str):
+        self.path = Path(path)
+        self.engine = engine
+        self.path.parent.mkdir(parents = True, exist_ok = True)
+        self._lock = threading.Lock()
+        self.pk_cache: Dict[str, List[str]] = {}
+        self._root = duckdb.connect(str(self.path)) if engine == "duckdb" else None
+
+    def connect(self) -> EmbeddedConnection:
+        if self.engine == "duckdb":
+            with self._lock:
+                raw = self._root.cursor()
+        else:
+            raw = sqlite3.connect(str(self.path), timeout = 600, check_same_thread = False)
+        return EmbeddedConnection(self, raw)
+
+    def clear_cache(self) -> None:  # DDL 실행 후 PK 정보 갱신
+        self.pk_cache.clear()
+
+    def close(self) -> None:
+        # DuckDB 파일 lock 해제 → 같은 DB_PATH를 여는 다른 프로세스(run_pipeline의 다음 stage)가 사용 가능
+        with self._lock:
+            if self._root is not None:
+                self._root.close()
+                self._root = None
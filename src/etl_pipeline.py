@@ -3,62 +3,84 @@ from __future__ import annotations
 import warnings
 warnings.filterwarnings('ignore')
 
+import csv
 import os
 import re
+import tempfile
+import time
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
-import mysql.connector
-from dotenv import load_dotenv
 
-load_dotenv()
+import db
+from cdc import diff_rows, save_hashes
+from etl_scheduler import Step, format_report, run_dag
+from indexes import create_indexes, drop_indexes
+from features import (PRIOR_COLUMNS, compute_prior_features, fetch_prior_inputs,
+                      rebuild_feature_anime, refresh_feature_anime)
+from raw_data import clear_memo, iter_raw, raw_exists, read_raw
+from summary import refresh_summaries
 
 
 # -----------------------------
-# Project Paths
+# ETL Config (DB 접속 설정은 db.py)
 # -----------------------------
-PROJECT_ROOT = Path(__file__).resolve().parents[1]
-RAW_DIR = PROJECT_ROOT / "data" / "raw"
+CHUNK_SIZE = int(os.getenv("ETL_CHUNK_SIZE", "5000"))
 
+# 적재 방식: executemany(기본) / bulk(LOAD DATA LOCAL INFILE → staging → INSERT ... SELECT)
+LOAD_MODE = os.getenv("ETL_LOAD_MODE", "executemany").lower()
 
-# -----------------------------
-# Database Config (Environment Variables Only)
-# -----------------------------
-DB = {
-    "host": os.getenv("DB_HOST"),
-    "user": os.getenv("DB_USER"),
-    "password": os.getenv("DB_PASSWORD"),
-    "database": os.getenv("DB_NAME"),
-    "port": int(os.getenv("DB_PORT", "3306")),
-}
+# 스트리밍 모드: 관계 테이블 CSV를 READ_CHUNK_ROWS 단위로 읽고 chunk마다 정제/적재
+# (파일 전체와 tuple 리스트를 동시에 들고 있지 않으므로 파일 크기와 무관하게 메모리 상한 유지)
+STREAM = os.getenv("ETL_STREAM", "0") == "1"
+READ_CHUNK_ROWS = int(os.getenv("ETL_READ_CHUNK_ROWS", "200000"))
+# chunk 간 중복 제거용 key 수 상한 (초과 시 초기화 후 DB PK / INSERT IGNORE에 맡김)
+DEDUPE_MAX_KEYS = int(os.getenv("ETL_DEDUPE_MAX_KEYS", "2000000"))
 
-CHUNK_SIZE = int(os.getenv("ETL_CHUNK_SIZE", "5000"))
+# anime_voice_actor의 anime_id 매핑 방식: sql(DB 내 JOIN, 기본) / pandas(기존 방식)
+VA_JOIN = os.getenv("ETL_VA_JOIN", "sql").lower()
+
+# 증분 모드: anime_dim / entities / company는 정제 행 hash가 새로 생기거나 바뀐 행만 upsert
+INCREMENTAL = os.getenv("ETL_INCREMENTAL", "0") == "1"
+
+# 동시에 실행할 load step 수 (= connection pool 크기) / 1이면 순차 실행
+PARALLELISM = int(os.getenv("ETL_PARALLELISM", "3"))
+
+# feature_anime 갱신 방식: incremental(변경된 anime_id만) / full(전체 재생성)
+FEATURE_REFRESH = os.getenv("ETL_FEATURE_REFRESH", "incremental").lower()
+
+# 적재 전 secondary index(sql/01, sql/03의 CREATE INDEX)를 삭제하고 적재 후 한 번에 재생성
+# auto: 증분 모드가 아닐 때(전체 적재)만 / 1: 항상 / 0: 사용 안 함
+DEFER_INDEXES = os.getenv("ETL_DEFER_INDEXES", "auto").lower()
+
+# 이번 실행에서 적재/갱신된 anime_id (feature_anime 부분 갱신 대상)
+TOUCHED_ANIME_IDS: set[int] = set()
 
 
 # -----------------------------
 # Helpers
 # -----------------------------
-def validate_db_config(): # 환경변수 설정 검사
-    missing = [k for k, v in DB.items() if v is None and k != "port"]
-    if missing:
-        raise ValueError(f"Missing DB environment variables: {missing}\n"
-                          "Set DB_HOST, DB_USER, DB_PASSWORD, DB_NAME before running.")
+def connection_options() -> dict:
+    # LOAD DATA LOCAL INFILE은 클라이언트 측 허용 필요 (서버 local_infile=ON 도 필요)
+    return {"allow_local_infile": True} if LOAD_MODE == "bulk" and not db.EMBEDDED else {}
 
 
-def connect_db(): # MySQL 연결 생성
-    validate_db_config()
-    return mysql.connector.connect(**DB)
+def connect_db(): # 단일 MySQL 연결 생성 (pool 미사용)
+    return db.connect_db(**connection_options())
 
 
-def df_to_tuples(df: pd.DataFrame) -> List[Tuple]: # MySQL insert용 tuple 변환 / NaN을 None 변환
-    df = df.where(pd.notnull(df), None)
+def df_to_tuples(df: pd.DataFrame) -> List[Tuple]: # MySQL insert용 tuple 변환 / NaN, pd.NA를 None 변환
+    df = df.astype(object).where(pd.notnull(df), None)  # Int64 / category 컬럼도 파이썬 기본 타입으로
     return [tuple(r) for r in df.itertuples(index = False, name = None)]
 
 
 def executemany_in_chunks(cur, sql: str, rows: List[Tuple], chunk_size: int = CHUNK_SIZE) -> int:
     if not rows:
         return 0
+    if db.PREPARED and hasattr(cur, "prepared"): # DB_PREPARED=1: 같은 INSERT를 prepared statement로 반복 실행
+        cur = cur.prepared()
     total = 0
     for i in range(0, len(rows), chunk_size): # 대량 insert 시, 메모리/버퍼 문제 방지를 위해 나누어 실행
         batch = rows[i : i + chunk_size]
@@ -67,6 +89,114 @@ def executemany_in_chunks(cur, sql: str, rows: List[Tuple], chunk_size: int = CH
     return total
 
 
+def _escape_infile_value(v: str) -> str: # LOAD DATA 기본 ESCAPED BY '\\' 규칙에 맞춰 이스케이프
+    return (v.replace("\\", "\\\\")
+             .replace("\t", "\\t")
+             .replace("\n", "\\n")
+             .replace("\r", "\\r"))
+
+
+def write_infile(df: pd.DataFrame, path: Path) -> None: # tab 구분 파일로 저장 / NULL은 \N
+    out = df.copy()
+    for col in out.columns:
+        if out[col].dtype == object or isinstance(out[col].dtype, pd.CategoricalDtype):
+            mask = out[col].notna()
+            out[col] = out[col].astype(object)
+            out.loc[mask, col] = out.loc[mask, col].astype(str).map(_escape_infile_value)
+    out.to_csv(path, sep = "\t", header = False, index = False, na_rep = "\\N",
+               lineterminator = "\n", quoting = csv.QUOTE_NONE, escapechar = None)
+
+
+def bulk_load_frame(cur, df: pd.DataFrame, table: str,
+                    update_cols: Sequence[str] = (), ignore: bool = False) -> int:
+    # 임시 파일 → staging(TEMPORARY TABLE) → target으로 set-based merge 1회
+    if df.empty:
+        return 0
+
+    cols = list(df.columns)
+    col_list = ", ".join(cols)
+    staging = f"stg_{table}"
+
+    cur.execute(f"DROP TEMPORARY TABLE IF EXISTS {staging};")
+    cur.execute(f"CREATE TEMPORARY TABLE {staging} LIKE {table};")
+
+    with tempfile.TemporaryDirectory(prefix = "etl_") as tmp:
+        path = Path(tmp) / f"{table}.tsv"
+        write_infile(df, path)
+        # 파일 내 PK 중복: upsert는 마지막 행 우선(REPLACE), insert-ignore는 첫 행 우선(IGNORE)
+        dup = "IGNORE" if ignore else "REPLACE"
+        cur.execute(
+            f"LOAD DATA LOCAL INFILE %s {dup} INTO TABLE {staging} "
+            "CHARACTER SET utf8mb4 "
+            "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+            f"LINES TERMINATED BY '\\n' ({col_list});",
+            (path.as_posix(),),
+        )
+
+    if ignore:
+        cur.execute(f"INSERT IGNORE INTO {table} ({col_list}) SELECT {col_list} FROM {staging};")
+    else:
+        updates = ",\n  ".join(f"{c} = VALUES({c})" for c in update_cols)
+        cur.execute(f"INSERT INTO {table} ({col_list}) SELECT {col_list} FROM {staging}\n"
+                    f"ON DUPLICATE KEY UPDATE\n  {updates};")
+
+    cur.execute(f"DROP TEMPORARY TABLE IF EXISTS {staging};")
+    return len(df)
+
+
+def write_frame(cur, df: pd.DataFrame, sql: str, table: str, update_cols: Sequence[str] = (),
+                ignore: bool = False, chunk_size: int = CHUNK_SIZE) -> int:
+    # LOAD_MODE에 따라 적재 경로 선택 / 두 경로 모두 적재 시도 행 수를 반환
+    # LOAD DATA LOCAL INFILE은 MySQL 전용 (embedded backend는 executemany가 DataFrame 단위로 적재)
+    if LOAD_MODE == "bulk" and not db.EMBEDDED:
+        return bulk_load_frame(cur, df, table, update_cols = update_cols, ignore = ignore)
+    rows = df_to_tuples(df)
+    return executemany_in_chunks(cur, sql, rows, chunk_size = chunk_size)
+
+
+class BoundedKeySet: # chunk 간 중복 행 제거 (행 hash를 최대 max_keys개까지만 보관)
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._seen = np.empty(0, dtype = np.uint64)
+
+    def keep_new(self, df: pd.DataFrame) -> pd.DataFrame:
+        if df.empty:
+            return df
+        h = pd.util.hash_pandas_object(df, index = False).to_numpy()
+        new = ~np.isin(h, self._seen)
+        if len(self._seen) + int(new.sum()) > self.max_keys:
+            self._seen = np.empty(0, dtype = np.uint64)  # 상한 초과: 이후 중복은 DB PK가 걸러냄
+        self._seen = np.union1d(self._seen, h[new])
+        return df[new]
+
+
+def mark_touched(anime_ids) -> None:
+    TOUCHED_ANIME_IDS.update(int(a) for a in pd.Series(anime_ids).unique())
+
+
+def new_relation_rows(cur, df: pd.DataFrame, table: str, key_cols: Sequence[str],
+                      batch_size: int = 1000) -> pd.DataFrame:
+    # ETL_INCREMENTAL: DB에 이미 있는 관계 행(INSERT IGNORE로 무시될 행) 제외
+    # → 관계 행이 실제로 추가되는 anime_id만 feature_anime 갱신 대상으로 표시
+    if df.empty:
+        return df
+    ids = [int(a) for a in df["anime_id"].unique()]
+    rows = []
+    for i in range(0, len(ids), batch_size):
+        batch = ids[i : i + batch_size]
+        placeholders = ", ".join(["%s"] * len(batch))
+        cur.execute(f"SELECT {', '.join(key_cols)} FROM {table} WHERE anime_id IN ({placeholders});", batch)
+        rows.extend(cur.fetchall())
+    if not rows:
+        return df
+
+    existing = pd.DataFrame(rows, columns = list(key_cols)).astype(df[list(key_cols)].dtypes.to_dict())
+    merged = df[list(key_cols)].merge(existing.drop_duplicates(), on = list(key_cols), how = "left", indicator = True)
+    new = df[(merged["_merge"] == "left_only").to_numpy()]
+    print(f"{table}: {len(new)} new of {len(df)} rows")
+    return new
+
+
 def clean_genre(g: str) -> str | None: # 장르 문자열 정제
     if g is None:
         return None
@@ -83,7 +213,7 @@ def clean_genre(g: str) -> str | None: # 장르 문자열 정제
 # Load Steps
 # -----------------------------
 def load_anime_dim(cur) -> int: # anime 기본 정보 테이블 생성
-    df = pd.read_csv(RAW_DIR / "anime.csv")
+    df = read_raw("anime")
 
     # align schema
     df = df.rename(columns={"rank": "mal_rank"})
@@ -118,40 +248,61 @@ def load_anime_dim(cur) -> int: # anime 기본 정보 테이블 생성
       image_url = VALUES(image_url);
     """.strip()
 
-    rows = df_to_tuples(df)
-    return executemany_in_chunks(cur, sql, rows, chunk_size = 2000)
+    if INCREMENTAL:
+        df, hashes = diff_rows(cur, df, "anime_dim", "anime_id")
+
+    update_cols = [c for c in cols if c != "anime_id"]
+    cnt = write_frame(cur, df, sql, "anime_dim", update_cols = update_cols, chunk_size = 2000)
+    if INCREMENTAL:
+        save_hashes(cur, "anime_dim", hashes)
+    mark_touched(df["anime_id"])
+    return cnt
 
 
 def load_genres(cur) -> Tuple[int, int]:
-    df = pd.read_csv(RAW_DIR / "anime_genres.csv")
-    df["genre"] = df["genre"].map(clean_genre)
-    df = df.dropna(subset =["genre"]).drop_duplicates()
+    df = read_raw("anime_genres")
+    df = df.dropna(subset = ["anime_id"])
+
+    # 고유 장르 문자열만 정제 (행 수가 아닌 고유 장르 수에 비례) → 정제 결과를 다시 factorize
+    # raw_codes: 행 → 원본 장르 / clean_codes: 원본 장르 → 정제 장르 (결측/빈 문자열은 -1)
+    raw_codes, raw_uniques = pd.factorize(df["genre"])
+    cleaned = pd.Series(raw_uniques, dtype = object).map(clean_genre)
+    clean_codes, genres = pd.factorize(cleaned)
+    if len(genres) == 0: # 행이 없거나 모든 장르가 결측/빈 문자열 → 아래 코드 배열 indexing이 불가
+        print("anime_genres: no valid genres")
+        return 0, 0
+
+    row_codes = np.where(raw_codes >= 0, clean_codes[raw_codes], -1)
 
     # genre_dim
-    genres = sorted(df["genre"].unique().tolist())
     sql_genre_dim = "INSERT IGNORE INTO genre_dim (genre_name) VALUES (%s);"
-    genre_rows = [(g,) for g in genres]
-    genre_dim_cnt = executemany_in_chunks(cur, sql_genre_dim, genre_rows, chunk_size = 2000)
+    genre_frame = pd.DataFrame({"genre_name": sorted(genres.tolist())})
+    genre_dim_cnt = write_frame(cur, genre_frame, sql_genre_dim, "genre_dim", ignore = True, chunk_size = 2000)
 
-    # map genre_name -> genre_id
+    # map genre_name -> genre_id (정제 장르 코드 순서의 정수 배열)
     cur.execute("SELECT genre_id, genre_name FROM genre_dim;")
     genre_map = {name: gid for (gid, name) in cur.fetchall()}
-
-    # anime_genre_map
-    rows = []
-    for anime_id, genre in df[["anime_id", "genre"]].itertuples(index = False, name = None):
-        gid = genre_map.get(genre)
-        if gid is not None:
-            rows.append((int(anime_id), int(gid)))
+    code_to_id = pd.Series(genres, dtype = object).map(genre_map).fillna(-1).to_numpy(dtype = np.int64)
+
+    # anime_genre_map: 정수 배열로 바로 구성
+    genre_ids = np.where(row_codes >= 0, code_to_id[row_codes], -1)
+    valid = genre_ids >= 0
+    map_frame = pd.DataFrame({
+        "anime_id": df["anime_id"].to_numpy(dtype = np.int64)[valid],
+        "genre_id": genre_ids[valid],
+    }).drop_duplicates()
+    if INCREMENTAL:
+        map_frame = new_relation_rows(cur, map_frame, "anime_genre_map", ["anime_id", "genre_id"])
 
     sql_map = "INSERT IGNORE INTO anime_genre_map (anime_id, genre_id) VALUES (%s, %s);"
-    map_cnt = executemany_in_chunks(cur, sql_map, rows, chunk_size = 5000)
+    map_cnt = write_frame(cur, map_frame, sql_map, "anime_genre_map", ignore = True, chunk_size = 5000)
+    mark_touched(map_frame["anime_id"])
 
     return genre_dim_cnt, map_cnt
 
 
 def load_entities(cur) -> int:
-    df = pd.read_csv(RAW_DIR / "entities.csv")
+    df = read_raw("entities")
 
     df["name"] = df["name"].astype(str).str.strip()
     df["entity_type"] = df["entity_type"].astype(str).str.strip()
@@ -171,13 +322,18 @@ def load_entities(cur) -> int:
       image_url = VALUES(image_url);
     """.strip()
 
-    rows = df_to_tuples(df)
-    return executemany_in_chunks(cur, sql, rows, chunk_size = 5000)
+    if INCREMENTAL:
+        df, hashes = diff_rows(cur, df, "entities", "entity_id")
+
+    cnt = write_frame(cur, df, sql, "entities",
+                      update_cols = ["entity_type", "name", "image_url"], chunk_size = 5000)
+    if INCREMENTAL:
+        save_hashes(cur, "entities", hashes)
+    return cnt
 
 
 def load_companies(cur) -> Tuple[int, int]:
-    entities = pd.read_csv(RAW_DIR / "entities.csv")
-    comp = pd.read_csv(RAW_DIR / "anime_companies.csv")
+    entities = read_raw("entities")
 
     company_entities = entities[entities["entity_type"].isin(["studio", "producer"])].copy()
     company_entities = company_entities[["entity_id", "entity_type", "name", "image_url"]].drop_duplicates()
@@ -191,29 +347,61 @@ def load_companies(cur) -> Tuple[int, int]:
       image_url = VALUES(image_url);
     """.strip()
 
-    company_rows = df_to_tuples(company_entities)
-    company_cnt = executemany_in_chunks(cur, sql_company, company_rows, chunk_size = 5000)
+    company_entities = company_entities.rename(columns = {"entity_id": "company_id"})
+    if INCREMENTAL:
+        company_entities, hashes = diff_rows(cur, company_entities, "company", "company_id")
+
+    company_cnt = write_frame(cur, company_entities, sql_company, "company",
+                              update_cols = ["entity_type", "name", "image_url"], chunk_size = 5000)
+    if INCREMENTAL:
+        save_hashes(cur, "company", hashes)
+
+    if STREAM:
+        seen = BoundedKeySet(DEDUPE_MAX_KEYS)
+        map_cnt = 0
+        for chunk in iter_raw("anime_companies", READ_CHUNK_ROWS):
+            map_cnt += _write_anime_company(cur, seen.keep_new(_clean_anime_company(chunk)))
+        return company_cnt, map_cnt
+
+    comp = _clean_anime_company(read_raw("anime_companies"))
+    map_cnt = _write_anime_company(cur, comp)
 
+    return company_cnt, map_cnt
+
+
+def _clean_anime_company(comp: pd.DataFrame) -> pd.DataFrame:
     comp = comp.dropna(subset = ["anime_id", "company_id", "role"]).drop_duplicates().copy()
     comp = comp.astype({"anime_id": int, "company_id": int})
+    return comp[["anime_id", "company_id", "role"]]
+
 
+def _write_anime_company(cur, comp: pd.DataFrame) -> int:
     sql_map = """
     INSERT IGNORE INTO anime_company (anime_id, company_id, role)
     VALUES (%s, %s, %s);
     """.strip()
 
-    map_rows = df_to_tuples(comp[["anime_id", "company_id", "role"]])
-    map_cnt = executemany_in_chunks(cur, sql_map, map_rows, chunk_size = 5000)
-
-    return company_cnt, map_cnt
+    if INCREMENTAL:
+        comp = new_relation_rows(cur, comp, "anime_company", ["anime_id", "company_id", "role"])
+    map_cnt = write_frame(cur, comp, sql_map, "anime_company", ignore = True, chunk_size = 5000)
+    mark_touched(comp["anime_id"])
+    return map_cnt
 
 
 def load_anime_character(cur) -> int:
-    path = RAW_DIR / "anime_characters.csv"
-    if not path.exists():
+    if not raw_exists("anime_characters"):
         return 0
 
-    df = pd.read_csv(path)
+    if STREAM:
+        seen = BoundedKeySet(DEDUPE_MAX_KEYS)
+        return sum(_write_anime_character(cur, seen.keep_new(_clean_anime_character(chunk)))
+                   for chunk in iter_raw("anime_characters", READ_CHUNK_ROWS))
+
+    df = _clean_anime_character(read_raw("anime_characters"))
+    return _write_anime_character(cur, df)
+
+
+def _clean_anime_character(df: pd.DataFrame) -> pd.DataFrame:
     df = df.dropna(subset = ["anime_id", "character_id"]).drop_duplicates().copy()
     df["anime_id"] = df["anime_id"].astype(int)
     df["character_id"] = df["character_id"].astype(int)
@@ -221,19 +409,122 @@ def load_anime_character(cur) -> int:
     if "role" not in df.columns:
         df["role"] = None
 
-    df = df[["anime_id", "character_id", "role"]]
+    return df[["anime_id", "character_id", "role"]]
+
 
+def _write_anime_character(cur, df: pd.DataFrame) -> int:
     sql = """
     INSERT IGNORE INTO anime_character (anime_id, character_id, role)
     VALUES (%s, %s, %s);
     """.strip()
 
-    rows = df_to_tuples(df)
-    return executemany_in_chunks(cur, sql, rows, chunk_size = 5000)
+    return write_frame(cur, df, sql, "anime_character", ignore = True, chunk_size = 5000)
 
 
 def load_anime_voice_actor(cur) -> int:
-    df = pd.read_csv(RAW_DIR / "anime_voice_actors.csv")
+    if VA_JOIN == "sql":
+        return load_anime_voice_actor_sql(cur)
+
+    if STREAM:
+        # chunk마다 해당 character_id의 anime_id 매핑만 조회 → anime_character 전체를 올리지 않음
+        seen = BoundedKeySet(DEDUPE_MAX_KEYS)
+        total = 0
+        for chunk in iter_raw("anime_voice_actors", READ_CHUNK_ROWS):
+            df = seen.keep_new(_clean_voice_actor(chunk))
+            map_df = fetch_character_anime_map(cur, df["character_id"].unique())
+            total += _write_voice_actor(cur, df, map_df)
+        return total
+
+    df = _clean_voice_actor(read_raw("anime_voice_actors"))
+
+    # character_id -> anime_id mapping from anime_character
+    cur.execute("SELECT character_id, anime_id FROM anime_character;")
+    map_df = pd.DataFrame(cur.fetchall(), columns=["character_id", "anime_id"])
+    if map_df.empty:
+        return 0
+
+    return _write_voice_actor(cur, df, map_df)
+
+
+def load_anime_voice_actor_sql(cur) -> int:
+    # raw (character_id, person_id, language)만 staging에 올리고 anime_id 매핑은 DB에서 JOIN
+    # → anime_character 전체를 파이썬으로 가져오지 않음
+    cur.execute("DROP TEMPORARY TABLE IF EXISTS stg_voice_actor_raw;")
+    cur.execute("""
+    CREATE TEMPORARY TABLE stg_voice_actor_raw (
+      character_id INT NOT NULL,
+      person_id    INT NOT NULL,
+      language     VARCHAR(50),
+      KEY idx_stg_va_character (character_id)
+    ) ENGINE=InnoDB;
+    """.strip())
+
+    sql_stage = """
+    INSERT INTO stg_voice_actor_raw (character_id, person_id, language)
+    VALUES (%s, %s, %s);
+    """.strip()
+
+    if STREAM:
+        seen = BoundedKeySet(DEDUPE_MAX_KEYS)
+        frames = (seen.keep_new(_clean_voice_actor(chunk)) for chunk in iter_raw("anime_voice_actors", READ_CHUNK_ROWS))
+    else:
+        frames = [_clean_voice_actor(read_raw("anime_voice_actors"))]
+
+    staged = 0
+    for df in frames:
+        staged += write_frame(cur, df, sql_stage, "stg_voice_actor_raw", ignore = True, chunk_size = 5000)
+
+    # anime_character에 없는 character_id → 적재 불가(drop)
+    cur.execute("""
+    SELECT COUNT(*) FROM stg_voice_actor_raw s
+    WHERE NOT EXISTS (SELECT 1 FROM anime_character ac WHERE ac.character_id = s.character_id);
+    """.strip())
+    dropped = cur.fetchone()[0]
+
+    # join 결과 행 수 (character가 여러 anime에 연결되면 늘어나고, staging 중복은 DISTINCT로 합쳐짐)
+    cur.execute("""
+    SELECT COUNT(*) FROM (
+      SELECT DISTINCT ac.anime_id, s.character_id, s.person_id, s.language
+      FROM stg_voice_actor_raw s
+      JOIN anime_character ac ON ac.character_id = s.character_id
+    ) j;
+    """.strip())
+    joined = cur.fetchone()[0]
+
+    # 갱신 대상: 증분 적재면 아직 없는 (anime, character, person, language) 행이 생기는 anime만 (INSERT 전에 조회)
+    new_filter = """
+    WHERE NOT EXISTS (
+      SELECT 1 FROM anime_voice_actor v
+      WHERE v.anime_id = ac.anime_id AND v.character_id = s.character_id AND v.person_id = s.person_id
+        AND (v.language = s.language OR (v.language IS NULL AND s.language IS NULL))
+    )""" if INCREMENTAL else ""
+    cur.execute(f"""
+    SELECT DISTINCT ac.anime_id
+    FROM stg_voice_actor_raw s
+    JOIN anime_character ac ON ac.character_id = s.character_id{new_filter};
+    """.strip())
+    mark_touched([r[0] for r in cur.fetchall()])
+
+    # INSERT ... SELECT의 rowcount는 backend마다 달라(embedded는 0) 적재 전후 행 수로 계산
+    cur.execute("SELECT COUNT(*) FROM anime_voice_actor;")
+    before = cur.fetchone()[0]
+    cur.execute("""
+    INSERT IGNORE INTO anime_voice_actor (anime_id, character_id, person_id, language)
+    SELECT DISTINCT ac.anime_id, s.character_id, s.person_id, s.language
+    FROM stg_voice_actor_raw s
+    JOIN anime_character ac ON ac.character_id = s.character_id;
+    """.strip())
+    cur.execute("SELECT COUNT(*) FROM anime_voice_actor;")
+    inserted = cur.fetchone()[0] - before
+
+    cur.execute("DROP TEMPORARY TABLE IF EXISTS stg_voice_actor_raw;")
+
+    print(f"anime_voice_actor join: staged {staged}, joined {joined}, "
+          f"dropped {dropped} (no anime_character match), newly inserted {inserted}")
+    return joined
+
+
+def _clean_voice_actor(df: pd.DataFrame) -> pd.DataFrame:
     df = df.dropna(subset =["character_id", "person_id"]).drop_duplicates().copy()
     df["character_id"] = df["character_id"].astype(int)
     df["person_id"] = df["person_id"].astype(int)
@@ -242,73 +533,173 @@ def load_anime_voice_actor(cur) -> int:
         df["language"] = None
 
     df = df[["character_id", "person_id", "language"]]
-    df = df.where(pd.notnull(df), None)
+    return df.where(pd.notnull(df), None)
 
-    # character_id -> anime_id mapping from anime_character
-    cur.execute("SELECT character_id, anime_id FROM anime_character;")
-    map_df = pd.DataFrame(cur.fetchall(), columns=["character_id", "anime_id"])
+
+def fetch_character_anime_map(cur, character_ids, batch_size: int = 1000) -> pd.DataFrame:
+    ids = [int(c) for c in character_ids]
+    rows = []
+    for i in range(0, len(ids), batch_size):
+        batch = ids[i : i + batch_size]
+        placeholders = ", ".join(["%s"] * len(batch))
+        cur.execute(f"SELECT character_id, anime_id FROM anime_character WHERE character_id IN ({placeholders});", batch)
+        rows.extend(cur.fetchall())
+    return pd.DataFrame(rows, columns = ["character_id", "anime_id"])
+
+
+def _write_voice_actor(cur, df: pd.DataFrame, map_df: pd.DataFrame) -> int:
     if map_df.empty:
         return 0
 
     merged = df.merge(map_df, on = "character_id", how = "inner")
     merged = merged[["anime_id", "character_id", "person_id", "language"]].drop_duplicates().copy()
     merged["anime_id"] = merged["anime_id"].astype(int)
+    if INCREMENTAL:
+        merged = new_relation_rows(cur, merged, "anime_voice_actor", ["anime_id", "character_id", "person_id", "language"])
 
     sql = """
     INSERT IGNORE INTO anime_voice_actor (anime_id, character_id, person_id, language)
     VALUES (%s, %s, %s, %s);
     """.strip()
 
-    rows = df_to_tuples(merged)
-    return executemany_in_chunks(cur, sql, rows, chunk_size = 5000)
+    cnt = write_frame(cur, merged, sql, "anime_voice_actor", ignore = True, chunk_size = 5000)
+    mark_touched(merged["anime_id"])
+    return cnt
+
+
+def load_prior_features(cur) -> int:
+    # studio / 성우 prior 집계는 전체를 다시 계산 (정렬 + 누적합이라 작품 수에 거의 선형)
+    # 이전 작품이 바뀌면 이후 작품의 값도 바뀌므로, 저장된 값과 달라진 anime_id만 upsert + feature_anime 갱신 대상으로 표시
+    df = compute_prior_features(*fetch_prior_inputs(cur))
+
+    cur.execute(f"SELECT anime_id, {', '.join(PRIOR_COLUMNS)} FROM anime_prior_features;")
+    old = pd.DataFrame(cur.fetchall(), columns = ["anime_id"] + PRIOR_COLUMNS).set_index("anime_id")
+    old = old.apply(pd.to_numeric, errors = "coerce").reindex(df["anime_id"])
+
+    new = df.set_index("anime_id")
+    same = np.isclose(new.to_numpy(dtype = float), old.to_numpy(dtype = float), rtol = 0, atol = 1e-6, equal_nan = True)
+    df = df[~same.all(axis = 1)]
+
+    cols = ["anime_id"] + PRIOR_COLUMNS
+    updates = ",\n      ".join(f"{c} = VALUES({c})" for c in PRIOR_COLUMNS)
+    sql = f"""
+    INSERT INTO anime_prior_features ({', '.join(cols)})
+    VALUES ({', '.join(['%s'] * len(cols))})
+    ON DUPLICATE KEY UPDATE
+      {updates};
+    """.strip()
+
+    cnt = write_frame(cur, df[cols], sql, "anime_prior_features", update_cols = PRIOR_COLUMNS, chunk_size = 5000)
+    mark_touched(df["anime_id"])
+    print(f"anime_prior_features: {cnt} changed of {len(new)}")
+    return cnt
+
+
+def defer_indexes() -> bool:
+    return DEFER_INDEXES == "1" or (DEFER_INDEXES == "auto" and not INCREMENTAL)
+
+
+def rebuild_indexes(cur) -> None: # 삭제했던(또는 없는) secondary index 생성
+    created = create_indexes(cur)
+    if created:
+        print(f"indexes rebuilt: {', '.join(d.name for d in created)}")
+
+
+def run_once(func):
+    # step 밖에서 connection 1개로 실행 후 commit
+    with db.connection() as conn:
+        cur = conn.cursor()
+        try:
+            result = func(cur)
+            conn.commit()
+        finally:
+            cur.close()
+    return result
+
+
+def refresh_features(cur) -> int: # feature_anime 갱신 (ETL_FEATURE_REFRESH=full 이면 전체 재생성)
+    if FEATURE_REFRESH == "full":
+        return rebuild_feature_anime(cur)
+    if not TOUCHED_ANIME_IDS:
+        return 0
+    return refresh_feature_anime(cur, TOUCHED_ANIME_IDS)
+
+
+# -----------------------------
+# DAG (step 간 의존성)
+# -----------------------------
+# anime_dim 적재 후에는 genres / companies / anime_character가 서로 독립적이며,
+# entities는 FK가 없어 처음부터 병렬 실행 가능. anime_voice_actor는 anime_character 매핑이 필요.
+ETL_STEPS = [
+    Step("anime_dim", lambda cur: {"anime_dim": load_anime_dim(cur)}),
+    Step("genres", lambda cur: dict(zip(("genre_dim", "anime_genre_map"), load_genres(cur))),
+         deps = ("anime_dim",)),
+    Step("entities", lambda cur: {"entities": load_entities(cur)}),
+    Step("companies", lambda cur: dict(zip(("company", "anime_company"), load_companies(cur))),
+         deps = ("anime_dim",)),
+    Step("anime_character", lambda cur: {"anime_character": load_anime_character(cur)},
+         deps = ("anime_dim",)),
+    Step("anime_voice_actor", lambda cur: {"anime_voice_actor": load_anime_voice_actor(cur)},
+         deps = ("anime_character",)),
+    Step("prior_features", lambda cur: {"anime_prior_features": load_prior_features(cur)},
+         deps = ("anime_dim", "companies", "anime_voice_actor")),
+    # 관계 테이블 적재가 모두 끝난 뒤 index 재생성 → feature_anime 집계는 covering index 사용
+    Step("indexes", rebuild_indexes,
+         deps = ("anime_dim", "genres", "entities", "companies", "anime_character", "anime_voice_actor")),
+    Step("feature_anime", lambda cur: {"feature_anime": refresh_features(cur)},
+         deps = ("anime_dim", "genres", "companies", "anime_voice_actor", "prior_features", "indexes")),
+    # 06_analysis_queries.sql용 summary 테이블 재집계 (sql/07_build_summary.sql)
+    Step("summary", refresh_summaries, deps = ("feature_anime",)),
+]
+
+# upsert 테이블은 loaded/updated, insert-ignore 테이블은 insert attempted로 표기
+UPSERT_TABLES = {"anime_dim", "entities", "company", "anime_prior_features", "feature_anime",
+                 "summary_anime_cube", "summary_studio_cube"}
+
+
+def print_table_counts(cur, results) -> None:
+    for r in results:
+        for table, attempted in r.rows.items():
+            cur.execute(f"SELECT COUNT(*) FROM {table};")
+            label = "loaded/updated" if table in UPSERT_TABLES else "insert attempted"
+            print(f"{table} rows: {cur.fetchone()[0]} ({label} {attempted})")
 
 
 # -----------------------------
 # Main
 # -----------------------------
 def main():
-    conn = connect_db()
-    cur = conn.cursor()
+    # step별 connection + 집계용 1개
+    db.init_pool(max(db.POOL_SIZE, PARALLELISM + 1), **connection_options())
+
+    start = time.perf_counter()
+    if defer_indexes():
+        dropped = run_once(drop_indexes)
+        if dropped:
+            print(f"indexes dropped before load: {', '.join(d.name for d in dropped)}")
 
     try:
-        a = load_anime_dim(cur)
-        conn.commit()
-        cur.execute("SELECT COUNT(*) FROM anime_dim;")
-        print(f"anime_dim rows: {cur.fetchone()[0]} (loaded/updated {a})")
-
-        g_dim, g_map = load_genres(cur)
-        conn.commit()
-        cur.execute("SELECT COUNT(*) FROM genre_dim;")
-        print(f"genre_dim rows: {cur.fetchone()[0]} (insert attempted {g_dim})")
-        cur.execute("SELECT COUNT(*) FROM anime_genre_map;")
-        print(f"anime_genre_map rows: {cur.fetchone()[0]} (insert attempted {g_map})")
-
-        e = load_entities(cur)
-        conn.commit()
-        cur.execute("SELECT COUNT(*) FROM entities;")
-        print(f"entities rows: {cur.fetchone()[0]} (loaded/updated {e})")
-
-        c_cnt, ac_cnt = load_companies(cur)
-        conn.commit()
-        cur.execute("SELECT COUNT(*) FROM company;")
-        print(f"company rows: {cur.fetchone()[0]} (loaded/updated {c_cnt})")
-        cur.execute("SELECT COUNT(*) FROM anime_company;")
-        print(f"anime_company rows: {cur.fetchone()[0]} (insert attempted {ac_cnt})")
-
-        ch = load_anime_character(cur)
-        conn.commit()
-        cur.execute("SELECT COUNT(*) FROM anime_character;")
-        print(f"anime_character rows: {cur.fetchone()[0]} (insert attempted {ch})")
-
-        va = load_anime_voice_actor(cur)
-        conn.commit()
-        cur.execute("SELECT COUNT(*) FROM anime_voice_actor;")
-        print(f"anime_voice_actor rows: {cur.fetchone()[0]} (insert attempted {va})")
+        results = run_dag(ETL_STEPS, db.get_connection, parallelism = PARALLELISM)
+    finally:
+        # 적재가 중간에 실패해도 index가 빠진 상태로 남지 않도록 (이미 있으면 no-op)
+        run_once(create_indexes)
+    wall = time.perf_counter() - start
+    clear_memo()
 
+    conn = db.get_connection()
+    cur = conn.cursor()
+    try:
+        print()
+        print_table_counts(cur, results)
+        print(f"feature_anime: {FEATURE_REFRESH} refresh, {len(TOUCHED_ANIME_IDS)} anime touched")
+        print()
+        print(format_report(results, wall))
+        print()
+        print(db.format_query_stats())
     finally:
         cur.close()
         conn.close()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
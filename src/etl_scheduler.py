@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Sequence
+
+
+# -----------------------------
+# DAG Step
+# -----------------------------
+@dataclass
+class Step:
+    name: str
+    func: Callable[..., Dict[str, int]]  # cursor → {table: 적재 시도 행 수}
+    deps: Sequence[str] = ()
+
+
+@dataclass
+class StepResult:
+    name: str
+    seconds: float
+    rows: Dict[str, int] = field(default_factory = dict)
+
+    @property
+    def total_rows(self) -> int:
+        return sum(self.rows.values())
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.total_rows / self.seconds if self.seconds > 0 else 0.0
+
+
+def validate_dag(steps: Sequence[Step]) -> None: # 미정의 의존성 / 순환 검사
+    names = {s.name for s in steps}
+    if len(names) != len(steps):
+        raise ValueError("Duplicate step names in ETL DAG")
+    for s in steps:
+        missing = [d for d in s.deps if d not in names]
+        if missing:
+            raise ValueError(f"Step '{s.name}' depends on unknown steps: {missing}")
+
+    visiting, done = set(), set()
+    by_name = {s.name: s for s in steps}
+
+    def visit(name: str) -> None:
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Cycle detected in ETL DAG at step '{name}'")
+        visiting.add(name)
+        for d in by_name[name].deps:
+            visit(d)
+        visiting.discard(name)
+        done.add(name)
+
+    for s in steps:
+        visit(s.name)
+
+
+def _run_step(step: Step, get_connection: Callable) -> StepResult:
+    # step마다 pool에서 connection을 받아 독립 트랜잭션으로 실행
+    conn = get_connection()
+    cur = conn.cursor()
+    start = time.perf_counter()
+    try:
+        rows = step.func(cur) or {}
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()  # pooled connection → pool로 반환
+    return StepResult(step.name, time.perf_counter() - start, rows)
+
+
+def run_dag(steps: Sequence[Step], get_connection: Callable, parallelism: int = 1) -> List[StepResult]:
+    # 의존성이 모두 끝난 step부터 최대 parallelism개 동시 실행
+    validate_dag(steps)
+
+    pending = {s.name: s for s in steps}
+    finished: Dict[str, StepResult] = {}
+    order: List[StepResult] = []
+
+    with ThreadPoolExecutor(max_workers = max(1, parallelism)) as ex:
+        running = {}
+        while pending or running:
+            ready = [s for s in pending.values() if all(d in finished for d in s.deps)]
+            for s in ready:
+                del pending[s.name]
+                running[ex.submit(_run_step, s, get_connection)] = s.name
+
+            done, _ = wait(running, return_when = FIRST_COMPLETED)
+            for fut in done:
+                name = running.pop(fut)
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    for f in running: # 실패 시 아직 시작하지 않은 step은 취소
+                        f.cancel()
+                    raise RuntimeError(f"ETL step '{name}' failed") from e
+                finished[name] = result
+                order.append(result)
+                print(f"[{name}] done in {result.seconds:.2f}s "
+                      f"({result.total_rows:,} rows, {result.rows_per_sec:,.0f} rows/s)")
+
+    return order
+
+
+def format_report(results: Sequence[StepResult], wall_seconds: float) -> str:
+    lines = [f"{'step':<20} {'seconds':>9} {'rows':>12} {'rows/s':>12}"]
+    for r in results:
+        lines.append(f"{r.name:<20} {r.seconds:>9.2f} {r.total_rows:>12,} {r.rows_per_sec:>12,.0f}")
+    serial = sum(r.seconds for r in results)
+    lines.append(f"wall time: {wall_seconds:.2f}s (sum of steps {serial:.2f}s)")
+    return "\n".join(lines)
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import os
+from typing import Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# -----------------------------
+# feature_anime (materialized table, sql/05_build_features.sql 와 동일한 정의)
+# -----------------------------
+FEATURE_COLUMNS = [
+    "anime_id", "title", "score", "members", "type", "episodes",
+    "start_date", "popularity",
+    "genre_count", "company_count", "studio_count", "producer_count",
+    "voice_actor_count", "japanese_va_count",
+    "studio_prior_works", "studio_prior_score", "studio_prior_log_members",
+    "va_prior_works", "va_prior_log_members",
+]
+
+# {a_filter}: anime_dim 조건 / {filter}: 각 pre-aggregate 서브쿼리 조건
+# → 부분 갱신 시 서브쿼리 안에서부터 anime_id를 제한해 필요한 행만 집계
+FEATURE_SELECT_SQL = """
+SELECT
+    a.anime_id,
+    a.title,
+    a.score,
+    a.members,
+    a.type,
+    a.episodes,
+    a.start_date,
+    a.popularity,
+    COALESCE(g.genre_count, 0) AS genre_count,
+    COALESCE(c.company_count, 0) AS company_count,
+    COALESCE(c.studio_count, 0) AS studio_count,
+    COALESCE(c.producer_count, 0) AS producer_count,
+    COALESCE(v.voice_actor_count, 0) AS voice_actor_count,
+    COALESCE(v.japanese_va_count, 0) AS japanese_va_count,
+    COALESCE(p.studio_prior_works, 0) AS studio_prior_works,
+    p.studio_prior_score,
+    p.studio_prior_log_members,
+    COALESCE(p.va_prior_works, 0) AS va_prior_works,
+    p.va_prior_log_members
+FROM anime_dim a
+LEFT JOIN (
+    SELECT anime_id, COUNT(DISTINCT genre_id) AS genre_count
+    FROM anime_genre_map
+    {filter}
+    GROUP BY anime_id
+) g ON a.anime_id = g.anime_id
+LEFT JOIN (
+    SELECT
+        anime_id,
+        COUNT(DISTINCT company_id) AS company_count,
+        COUNT(DISTINCT CASE WHEN role = 'Studio' THEN company_id END) AS studio_count,
+        COUNT(DISTINCT CASE WHEN role = 'Producer' THEN company_id END) AS producer_count
+    FROM anime_company
+    {filter}
+    GROUP BY anime_id
+) c ON a.anime_id = c.anime_id
+LEFT JOIN (
+    SELECT
+        anime_id,
+        COUNT(DISTINCT person_id) AS voice_actor_count,
+        COUNT(DISTINCT CASE WHEN language = 'Japanese' THEN person_id END) AS japanese_va_count
+    FROM anime_voice_actor
+    {filter}
+    GROUP BY anime_id
+) v ON a.anime_id = v.anime_id
+LEFT JOIN anime_prior_features p ON a.anime_id = p.anime_id
+{a_filter}
+""".strip()
+
+REFRESH_BATCH_SIZE = 1000
+
+
+def _insert_sql(filter_sql: str = "", a_filter_sql: str = "") -> str:
+    cols = ", ".join(FEATURE_COLUMNS)
+    select = FEATURE_SELECT_SQL.format(filter = filter_sql, a_filter = a_filter_sql)
+    return f"INSERT INTO feature_anime ({cols})\n{select};"
+
+
+def rebuild_feature_anime(cur) -> int: # 전체 재생성 (fallback)
+    cur.execute("DELETE FROM feature_anime;")
+    cur.execute(_insert_sql())
+    return cur.rowcount
+
+
+def refresh_feature_anime(cur, anime_ids: Iterable[int], batch_size: int = REFRESH_BATCH_SIZE) -> int:
+    # 변경된 anime_id만 삭제 후 재집계 (anime_dim에서 사라진 작품은 삭제만 됨)
+    ids: List[int] = sorted({int(i) for i in anime_ids})
+    total = 0
+    for i in range(0, len(ids), batch_size):
+        batch = ids[i : i + batch_size]
+        placeholders = ", ".join(["%s"] * len(batch))
+        cond = f"anime_id IN ({placeholders})"
+
+        cur.execute(f"DELETE FROM feature_anime WHERE {cond};", batch)
+        # 서브쿼리 3개 + anime_dim 조건 1개 → 파라미터 4벌
+        sql = _insert_sql(filter_sql = f"WHERE {cond}", a_filter_sql = f"WHERE a.{cond}")
+        cur.execute(sql, batch * 4)
+        total += max(cur.rowcount, 0)
+    return total
+
+
+# -----------------------------
+# Prior aggregates (studio / 성우의 이전 작품 성과, anime_prior_features)
+# -----------------------------
+# 각 작품 시점(start_date)보다 먼저 공개된 작품만 사용 (같은 날 공개작 포함 X → 미래 정보 누출 방지)
+# ※ 이전 작품의 score / members는 수집 시점 값이므로 당시 값과는 다를 수 있음
+# 평균은 작품 수가 적은 studio / 성우가 튀지 않도록 같은 시점까지의 전체 평균 쪽으로 shrink
+#   (sum + k * global_mean) / (n + k),  k = FEATURE_PRIOR_SMOOTHING
+PRIOR_SMOOTHING = float(os.getenv("FEATURE_PRIOR_SMOOTHING", "5"))
+
+PRIOR_COLUMNS = [
+    "studio_prior_works",        # anime의 studio들이 이전에 만든 작품 수 (합계)
+    "studio_prior_score",        # 그 작품들의 평균 score (shrink)
+    "studio_prior_log_members",  # 그 작품들의 평균 log1p(members) (shrink)
+    "va_prior_works",            # 출연 성우 1인당 이전 출연작 수 (평균)
+    "va_prior_log_members",      # 출연 성우 이전 출연작의 평균 log1p(members) (shrink)
+]
+
+_SUMS = ["works", "score_n", "score_sum", "members_n", "members_sum"]
+
+
+def _date_totals(df: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    # keys(+ start_date) 단위 합계 / start_date 결측 작품은 순서를 알 수 없으므로 제외
+    return df.dropna(subset = ["start_date"]).groupby(keys, sort = True).agg(
+        works = ("anime_id", "size"),
+        score_n = ("score", "count"),
+        score_sum = ("score", "sum"),
+        members_n = ("log_members", "count"),
+        members_sum = ("log_members", "sum"),
+    )
+
+
+def prior_totals(edges: pd.DataFrame, key: str) -> pd.DataFrame:
+    # edges: (key, anime_id) 1행씩 + start_date / score / log_members
+    # (key, start_date)로 먼저 묶고 key별 누적합에서 자기 날짜 합을 빼면 "그 날짜 이전"의 합계
+    # → 정렬 1회 + 누적합이므로 O(E log E) (작품마다 이전 작품을 다시 훑지 않음)
+    g = _date_totals(edges, [key, "start_date"])
+    prior = g.groupby(level = 0, sort = False).cumsum() - g
+    out = edges[["anime_id", key, "start_date"]].join(prior, on = [key, "start_date"])
+    return out.groupby("anime_id")[_SUMS].sum(min_count = 1)
+
+
+def global_prior_means(anime: pd.DataFrame) -> pd.DataFrame:
+    # 날짜별 "그 날짜 이전 전체 작품"의 평균 score / log_members (shrink 대상)
+    g = _date_totals(anime, ["start_date"])
+    prior = g.cumsum() - g
+    return pd.DataFrame({
+        "score": prior["score_sum"] / prior["score_n"].replace(0, np.nan),
+        "log_members": prior["members_sum"] / prior["members_n"].replace(0, np.nan),
+    })
+
+
+def _shrunk(total: pd.Series, n: pd.Series, base: pd.Series, k: float) -> pd.Series:
+    return (total.fillna(0) + k * base) / (n.fillna(0) + k)
+
+
+def compute_prior_features(anime: pd.DataFrame, studios: pd.DataFrame, cast: pd.DataFrame,
+                           smoothing: float = PRIOR_SMOOTHING) -> pd.DataFrame:
+    # anime: anime_id, start_date, score, members / studios: anime_id, company_id / cast: anime_id, person_id
+    anime = anime[["anime_id", "start_date", "score", "members"]].drop_duplicates("anime_id").copy()
+    anime["start_date"] = pd.to_datetime(anime["start_date"], errors = "coerce")
+    anime["score"] = pd.to_numeric(anime["score"], errors = "coerce")
+    anime["log_members"] = np.log1p(pd.to_numeric(anime["members"], errors = "coerce"))
+    anime = anime.drop(columns = "members")
+
+    base = global_prior_means(anime).reindex(anime["start_date"])
+    base.index = anime["anime_id"].to_numpy()
+    out = pd.DataFrame(index = pd.Index(anime["anime_id"].to_numpy(), name = "anime_id"))
+
+    def edges(rel: pd.DataFrame, key: str) -> pd.DataFrame:
+        rel = rel[["anime_id", key]].dropna().drop_duplicates()
+        return rel.merge(anime, on = "anime_id", how = "inner")
+
+    st = prior_totals(edges(studios, "company_id"), "company_id").reindex(out.index)
+    out["studio_prior_works"] = st["works"].fillna(0).astype(int)
+    out["studio_prior_score"] = _shrunk(st["score_sum"], st["score_n"], base["score"], smoothing)
+    out["studio_prior_log_members"] = _shrunk(st["members_sum"], st["members_n"], base["log_members"], smoothing)
+
+    va_edges = edges(cast, "person_id")
+    va = prior_totals(va_edges, "person_id").reindex(out.index)
+    cast_size = va_edges.dropna(subset = ["start_date"]).groupby("anime_id").size().reindex(out.index)
+    out["va_prior_works"] = (va["works"] / cast_size).fillna(0)
+    out["va_prior_log_members"] = _shrunk(va["members_sum"], va["members_n"], base["log_members"], smoothing)
+
+    # start_date가 없는 작품은 이전/이후를 정할 수 없으므로 평균은 NULL
+    undated = anime["start_date"].isna().to_numpy()
+    out.loc[undated, ["studio_prior_score", "studio_prior_log_members", "va_prior_log_members"]] = np.nan
+    out[PRIOR_COLUMNS[1:]] = out[PRIOR_COLUMNS[1:]].round(6)
+    return out.reset_index()
+
+
+def fetch_prior_inputs(cur) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    cur.execute("SELECT anime_id, start_date, score, members FROM anime_dim;")
+    anime = pd.DataFrame(cur.fetchall(), columns = ["anime_id", "start_date", "score", "members"])
+    cur.execute("SELECT DISTINCT anime_id, company_id FROM anime_company WHERE role = 'Studio';")
+    studios = pd.DataFrame(cur.fetchall(), columns = ["anime_id", "company_id"])
+    cur.execute("SELECT DISTINCT anime_id, person_id FROM anime_voice_actor;")
+    cast = pd.DataFrame(cur.fetchall(), columns = ["anime_id", "person_id"])
+    return anime, studios, cast
+
+
+def main():
+    from db import connect_db
+
+    conn = connect_db()
+    cur = conn.cursor()
+    try:
+        n = rebuild_feature_anime(cur)
+        conn.commit()
+        print(f"feature_anime rebuilt: {n} rows")
+    finally:
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
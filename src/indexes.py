@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from itertools import groupby
+from pathlib import Path
+from typing import List, Sequence, Set, Tuple
+
+import db
+
+
+# -----------------------------
+# Secondary index 정의 (sql/ 의 CREATE INDEX 문이 기준)
+# -----------------------------
+SQL_DIR = Path(__file__).resolve().parents[1] / "sql"
+INDEX_FILES = ("01_schema_extended.sql", "03_indexes.sql")
+
+_RE_CREATE_INDEX = re.compile(r"CREATE\s+INDEX\s+(\w+)\s+ON\s+(\w+)\s*\(([^)]*)\)", re.I)
+
+
+@dataclass(frozen = True)
+class IndexDef:
+    name: str
+    table: str
+    columns: Tuple[str, ...]
+
+    @property
+    def column_list(self) -> str:
+        return ", ".join(self.columns)
+
+
+def index_definitions(files: Sequence[str] = INDEX_FILES) -> List[IndexDef]:
+    defs = []
+    for name in files:
+        text = re.sub(r"--[^\n]*", "", (SQL_DIR / name).read_text(encoding = "utf-8"))
+        for idx, table, cols in _RE_CREATE_INDEX.findall(text):
+            defs.append(IndexDef(idx, table, tuple(c.strip() for c in cols.split(","))))
+    return defs
+
+
+SECONDARY_INDEXES = index_definitions()
+
+
+# -----------------------------
+# Drop / Rebuild
+# -----------------------------
+def existing_indexes(cur) -> Set[Tuple[str, str]]: # (table, index) 소문자
+    if db.BACKEND == "sqlite":
+        cur.execute("SELECT tbl_name, name FROM sqlite_master WHERE type = 'index';")
+    else:
+        cur.execute("SELECT DISTINCT table_name, index_name FROM information_schema.statistics "
+                    "WHERE table_schema = DATABASE();")
+    return {(t.lower(), i.lower()) for t, i in cur.fetchall()}
+
+
+def drop_indexes(cur, defs: Sequence[IndexDef] = SECONDARY_INDEXES) -> List[IndexDef]:
+    # 대량 적재 전: 행마다 secondary index를 갱신하지 않도록 삭제 (PK / FK용 index는 유지)
+    if db.BACKEND == "duckdb":  # DuckDB backend는 secondary index를 만들지 않음 (embedded_db.translate)
+        return []
+    existing = existing_indexes(cur)
+    dropped = [d for d in defs if (d.table.lower(), d.name.lower()) in existing]
+    for d in dropped:
+        cur.execute(f"DROP INDEX {d.name} ON {d.table};")
+    return dropped
+
+
+def create_indexes(cur, defs: Sequence[IndexDef] = SECONDARY_INDEXES) -> List[IndexDef]:
+    # 없는 index만 생성 (이미 있으면 아무것도 하지 않으므로 적재 실패 후 재실행에도 안전)
+    if db.BACKEND == "duckdb":
+        return []
+    existing = existing_indexes(cur)
+    missing = [d for d in defs if (d.table.lower(), d.name.lower()) not in existing]
+    if db.BACKEND == "mysql":
+        # 같은 테이블의 index는 ALTER TABLE 한 번으로 생성 (clustered index를 한 번 읽어 정렬 후 bulk build)
+        for table, group in groupby(sorted(missing, key = lambda d: d.table), key = lambda d: d.table):
+            adds = ", ".join(f"ADD INDEX {d.name} ({d.column_list})" for d in group)
+            cur.execute(f"ALTER TABLE {table} {adds};")
+    else:
+        for d in missing:
+            cur.execute(f"CREATE INDEX {d.name} ON {d.table} ({d.column_list});")
+    return missing
+
+
+def main():
+    conn = db.connect_db()
+    cur = conn.cursor()
+    try:
+        created = create_indexes(cur)
+        conn.commit()
+        print(f"created {len(created)} index(es): {', '.join(d.name for d in created) or '-'}")
+    finally:
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
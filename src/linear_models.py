@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy import linalg, stats
+
+
+# -------------------------
+# Gram-matrix linear models (OLS / Ridge)
+# -------------------------
+# 절편 포함 설계행렬 Z = [1, X] 에 대해 G = ZᵀZ, b = Zᵀy 만으로 계수와 표준오차를 계산
+# Ridge는 절편을 규제하지 않음 (sklearn Ridge와 같은 해)
+@dataclass
+class LinearFit:
+    params: pd.Series       # const + feature 계수
+    bse: pd.Series          # 표준오차
+    sigma2: float           # 잔차 분산 추정치
+    df_resid: int
+    r2_train: float
+    alpha: float = 0.0
+
+    @property
+    def tvalues(self) -> pd.Series:
+        return self.params / self.bse
+
+    @property
+    def pvalues(self) -> pd.Series:
+        return pd.Series(2 * stats.t.sf(np.abs(self.tvalues), self.df_resid), index = self.params.index)
+
+    def predict(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype = np.float64)
+        coef = self.params.to_numpy()
+        return X @ coef[1:] + coef[0]
+
+    def coef_table(self) -> pd.DataFrame:
+        return pd.DataFrame({"coef": self.params, "std_err": self.bse,
+                             "t": self.tvalues, "p_value": self.pvalues})
+
+
+def gram(X, y) -> tuple[np.ndarray, np.ndarray]:
+    # 절편 열을 직접 붙이지 않고 블록으로 계산 (X 복사 없음)
+    X = np.asarray(X, dtype = np.float64)
+    y = np.asarray(y, dtype = np.float64)
+    n, p = X.shape
+    G = np.empty((p + 1, p + 1))
+    G[0, 0] = n
+    G[0, 1:] = G[1:, 0] = X.sum(axis = 0)
+    G[1:, 1:] = X.T @ X
+    b = np.concatenate(([y.sum()], X.T @ y))
+    return G, b
+
+
+def penalty(p: int, alpha: float) -> np.ndarray: # 절편(0번)은 규제 제외
+    d = np.full(p + 1, float(alpha))
+    d[0] = 0.0
+    return np.diag(d)
+
+
+def solve_gram(G: np.ndarray, b: np.ndarray, alpha: float = 0.0) -> tuple[np.ndarray, np.ndarray]:
+    # (G + αP)θ = b 를 Cholesky로 풀고 A⁻¹도 반환 / 특이행렬이면 pseudo-inverse
+    A = G + penalty(G.shape[0] - 1, alpha) if alpha else G
+    try:
+        c = linalg.cho_factor(A, check_finite = False)
+        theta = linalg.cho_solve(c, b, check_finite = False)
+        A_inv = linalg.cho_solve(c, np.eye(A.shape[0]), check_finite = False)
+    except linalg.LinAlgError:
+        A_inv = np.linalg.pinv(A)
+        theta = A_inv @ b
+    return theta, A_inv
+
+
+def fit_linear(X, y, alpha: float = 0.0) -> LinearFit:
+    # alpha = 0: OLS (statsmodels OLS와 같은 계수 / 표준오차)
+    # alpha > 0: Ridge, 표준오차는 σ² A⁻¹ G A⁻¹ (sandwich)
+    cols = ["const"] + [str(c) for c in getattr(X, "columns", range(np.shape(X)[1]))]
+    Xa = np.asarray(X, dtype = np.float64)
+    ya = np.asarray(y, dtype = np.float64)
+    n, p = Xa.shape
+
+    G, b = gram(Xa, ya)
+    theta, A_inv = solve_gram(G, b, alpha)
+
+    resid = ya - (Xa @ theta[1:] + theta[0])
+    rss = float(resid @ resid)
+    tss = float(((ya - ya.mean()) ** 2).sum())
+    df_resid = n - (p + 1)
+    sigma2 = rss / df_resid
+
+    cov = sigma2 * (A_inv if not alpha else A_inv @ G @ A_inv)
+    bse = np.sqrt(np.clip(np.diag(cov), 0, None))
+
+    return LinearFit(
+        params = pd.Series(theta, index = cols),
+        bse = pd.Series(bse, index = cols),
+        sigma2 = sigma2,
+        df_resid = df_resid,
+        r2_train = 1 - rss / tss if tss > 0 else 0.0,
+        alpha = float(alpha),
+    )
@@ -4,27 +4,14 @@ import warnings
 warnings.filterwarnings('ignore')
 
 from pathlib import Path
+import json
 import os
 
 import numpy as np
 import pandas as pd
-import mysql.connector
-from sklearn.model_selection import train_test_split
-from dotenv import load_dotenv
+from sklearn.model_selection import GroupKFold, train_test_split
 
-
-# -------------------------
-# Environment
-# -------------------------
-load_dotenv()
-
-DB = {
-    "host": os.getenv("DB_HOST"),
-    "user": os.getenv("DB_USER"),
-    "password": os.getenv("DB_PASSWORD"),
-    "database": os.getenv("DB_NAME"),
-    "port": int(os.getenv("DB_PORT", "3306")),
-}
+import db
 
 
 # -------------------------
@@ -34,21 +21,132 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 PROCESSED_DIR = PROJECT_ROOT / "data" / "processed"
 PROCESSED_DIR.mkdir(parents = True, exist_ok = True)
 
+# 학습용 split은 .npy + schema.json으로 저장 / DATASET_EXPORT_CSV=1이면 CSV도 함께 저장
+EXPORT_CSV = os.getenv("DATASET_EXPORT_CSV", "0") == "1"
+SPLIT_FORMAT_VERSION = 2  # 2: X.npy / y.npy 1벌 + folds/*.npy index 배열 (1: X_train.npy 등 split별 복사본)
+
+# train/test 분할 방식
+#   random: 무작위 20% (기존) / year: 최근 연도 holdout
+#   rolling: year holdout + 학습 구간 안의 expanding-window fold / studio: 대표 studio 단위 group 분할 + group fold
+SPLIT_MODE = os.getenv("DATASET_SPLIT", "random").lower()
+TEST_FROM_YEAR = int(os.environ["DATASET_TEST_FROM_YEAR"]) if os.getenv("DATASET_TEST_FROM_YEAR") else None
+N_FOLDS = int(os.getenv("DATASET_FOLDS", "5"))
+FOLD_YEARS = int(os.getenv("DATASET_FOLD_YEARS", "1"))  # rolling fold 1개의 검증 연도 수
+
+# studio / 성우 prior 집계 feature 사용 여부 (0이면 기존 6개 feature + type 더미)
+PRIOR_FEATURES = os.getenv("DATASET_PRIOR_FEATURES", "1") == "1"
+PRIOR_FEATURE_COLUMNS = [
+    "studio_prior_works", "studio_prior_score", "studio_prior_log_members",
+    "va_prior_works", "va_prior_log_members",
+]
+
+# feature_anime → 모델 행렬 변환 방식
+#   arrays(기본): 모델 컬럼만 SELECT → fetchmany 배치를 미리 할당한 float64 배열에 바로 채움
+#   pandas: SELECT * → DataFrame → build_model_frame (기존 방식)
+LOADER = os.getenv("DATASET_LOADER", "arrays").lower()
+FETCH_BATCH = int(os.getenv("DATASET_FETCH_BATCH", "50000"))
+
+BASE_FEATURES = ["score", "genre_count", "producer_count", "studio_count", "voice_actor_count", "year"]
+REQUIRED_INPUTS = ["score", "year", "type"]  # build_model_frame이 결측이면 제거하는 입력 → 예측 때도 필수 (score / year는 숫자)
+DROP_TYPE_DUMMIES = ["type_TV Special"] # ipynb 최종 모델과 동일
+
 
 # -------------------------
 # Load from DB
 # -------------------------
 def load_feature_anime() -> pd.DataFrame:
-    conn = mysql.connector.connect(**DB)
-    df = pd.read_sql("SELECT * FROM feature_anime;", conn)
-    conn.close()
+    with db.connection() as conn: # pool connection 재사용 (반복 호출 시 연결 비용 없음)
+        df = pd.read_sql("SELECT * FROM feature_anime;", conn)
     return df
 
 
+def _model_filter() -> str: # build_model_frame의 결측 제거와 같은 조건
+    return "WHERE members IS NOT NULL AND score IS NOT NULL AND start_date IS NOT NULL AND type IS NOT NULL"
+
+
+def type_dummy_columns(types: list[str]) -> list[str]:
+    # pd.get_dummies(drop_first = True)와 같은 컬럼: 정렬 후 첫 범주 제외
+    cols = [f"type_{t}" for t in sorted(types)[1:]]
+    return [c for c in cols if c not in DROP_TYPE_DUMMIES]
+
+
+def load_model_arrays(prior_features: bool = PRIOR_FEATURES,
+                      batch_size: int = FETCH_BATCH) -> tuple[pd.DataFrame, pd.Series]:
+    # build_model_frame(load_feature_anime())과 같은 X, y (행 순서는 anime_id 순)
+    # 행 수 / type 범주를 먼저 집계해 X를 한 번만 할당하고 배치마다 해당 구간에 바로 기록
+    numeric = BASE_FEATURES + (list(PRIOR_FEATURE_COLUMNS) if prior_features else [])
+    select = [c for c in numeric if c != "year"]
+
+    with db.connection() as conn:
+        cur = conn.cursor()
+        try:
+            # 같은 transaction 안에서 실행 → 두 SELECT가 같은 snapshot (MySQL REPEATABLE READ)
+            cur.execute(f"SELECT type, COUNT(*) FROM feature_anime {_model_filter()} GROUP BY type;")
+            counts = {t: int(n) for t, n in cur.fetchall()}
+            n = sum(counts.values())
+
+            dummies = type_dummy_columns(list(counts))
+            features = numeric + dummies
+            X = np.zeros((n, len(features)), dtype = np.float64)
+            y = np.empty(n, dtype = np.float64)
+            ids = np.empty(n, dtype = np.int64)
+
+            # type → X의 더미 컬럼 위치 (기준 범주 / 제외 범주는 -1)
+            type_col = {t: (features.index(f"type_{t}") if f"type_{t}" in dummies else -1) for t in counts}
+            year_col = numeric.index("year")
+            select_cols = [numeric.index(c) for c in select]
+
+            cur.execute(f"SELECT members, type, YEAR(start_date) AS year, anime_id, {', '.join(select)} "
+                        f"FROM feature_anime {_model_filter()} ORDER BY anime_id;")
+            pos = 0
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                end = pos + len(rows)
+                if end > n:
+                    raise RuntimeError("feature_anime changed while loading (more rows than counted)")
+
+                cols = list(zip(*rows))
+                y[pos:end] = np.asarray(cols[0], dtype = np.float64)  # None → nan
+                X[pos:end, year_col] = np.asarray(cols[2], dtype = np.float64)
+                ids[pos:end] = np.asarray(cols[3], dtype = np.int64)
+                for k, j in enumerate(select_cols):
+                    X[pos:end, j] = np.asarray(cols[4 + k], dtype = np.float64)
+
+                codes = np.fromiter((type_col[t] for t in cols[1]), dtype = np.int64, count = len(rows))
+                hit = codes >= 0
+                X[np.arange(pos, end)[hit], codes[hit]] = 1.0
+                pos = end
+        finally:
+            cur.close()
+
+    if pos != n:
+        raise RuntimeError(f"feature_anime changed while loading ({pos} rows read, {n} counted)")
+
+    np.log1p(y, out = y)
+
+    # 결측: prior feature는 NaN 유지(split 후 학습 행 중앙값으로 채움), 나머지는 0 (build_model_frame과 동일)
+    other = [j for j, c in enumerate(features) if c not in PRIOR_FEATURE_COLUMNS]
+    X[:, other] = np.nan_to_num(X[:, other], nan = 0.0)
+
+    index = pd.Index(ids, name = "anime_id")
+    return (pd.DataFrame(X, columns = features, index = index, copy = False),
+            pd.Series(y, index = index, name = "log_members", copy = False))
+
+
+def load_model_frame(loader: str = LOADER, prior_features: bool = PRIOR_FEATURES) -> tuple[pd.DataFrame, pd.Series]:
+    if loader == "pandas":
+        return build_model_frame(load_feature_anime(), prior_features = prior_features)
+    if loader != "arrays":
+        raise ValueError(f"Unknown DATASET_LOADER: {loader} (arrays / pandas)")
+    return load_model_arrays(prior_features = prior_features)
+
+
 # -------------------------
 # Preprocess
 # -------------------------
-def build_model_frame(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.Series]:
+def build_model_frame(df: pd.DataFrame, prior_features: bool = PRIOR_FEATURES) -> tuple[pd.DataFrame, pd.Series]:
     df = df.copy()
 
     # 1) start_date → year
@@ -65,56 +163,260 @@ def build_model_frame(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.Series]:
     df = pd.get_dummies(df, columns = ["type"], drop_first = True, dtype = int)
 
     # 5) ipynb 최종 모델과 동일하게 type_TV Special 제거
-    if "type_TV Special" in df.columns:
-        df = df.drop(columns = ["type_TV Special"])
+    df = df.drop(columns = [c for c in DROP_TYPE_DUMMIES if c in df.columns])
 
     # 6) Features
-    base_features = [
-        "score",
-        "genre_count",
-        "producer_count",
-        "studio_count",
-        "voice_actor_count",
-        "year",
-    ]
+    base_features = list(BASE_FEATURES)
+    if prior_features:
+        # prior 평균이 NULL(가장 이른 작품 / prior 미집계)이면 NaN으로 두고 split 후 학습 행의 중앙값으로 채움
+        # (전체 중앙값을 쓰면 test 기간 작품이 학습 행의 값을 정하게 됨 → fill_from_train)
+        base_features += list(PRIOR_FEATURE_COLUMNS)
     type_features = [c for c in df.columns if c.startswith("type_")]
 
     features = base_features + type_features
 
     X = df[features].copy()
     y = df["log_members"].copy()
+    if "anime_id" in df.columns: # studio group 분할용
+        X.index = y.index = pd.Index(df["anime_id"].astype("int64"), name = "anime_id")
 
     # 7) statsmodels OLS 안전장치: object 타입 강제 제거 (ValueError 방지)
-    X = X.apply(pd.to_numeric, errors = "coerce").fillna(0).astype(float)
+    X = X.apply(pd.to_numeric, errors = "coerce").astype(float)
+    other = [c for c in features if c not in PRIOR_FEATURE_COLUMNS]
+    X[other] = X[other].fillna(0)
     y = pd.to_numeric(y, errors = "coerce").astype(float)
 
     return X, y
 
 
+def build_features(df: pd.DataFrame, feature_columns: list[str],
+                   fill_values: dict[str, float] | None = None) -> pd.DataFrame:
+    # 예측용: build_model_frame과 같은 feature 구성 (target / 결측 제거 없음)
+    # type 더미는 학습 컬럼 기준으로 맞춤 → 기준 범주 / type_TV Special / 처음 보는 type은 모두 0
+    # fill_values: 학습 때 결측을 채운 값 (manifest.json, prior feature의 학습 행 중앙값) / 그 외 결측은 0
+    df = df.copy()
+
+    if "year" not in df.columns and "start_date" in df.columns:
+        df["year"] = pd.to_datetime(df["start_date"], errors = "coerce").dt.year
+
+    if "type" in df.columns:
+        df = pd.get_dummies(df, columns = ["type"], dtype = int)
+
+    X = df.reindex(columns = feature_columns).apply(pd.to_numeric, errors = "coerce")
+    if fill_values:
+        X = X.fillna({c: v for c, v in fill_values.items() if c in X.columns})
+    return X.fillna(0).astype(float)
+
+
+def input_errors(df: pd.DataFrame) -> pd.Series:
+    # 예측 입력 검사: 행별 사유 문자열 (정상이면 "")
+    # 필수 입력이 없거나 숫자가 아닌 행을 0으로 채워 예측하면 엉뚱한 값이 나옴 (예: year 결측 → 0년)
+    reasons = pd.Series("", index = df.index, dtype = object)
+    for col in REQUIRED_INPUTS:
+        if col == "year" and "year" not in df.columns and "start_date" in df.columns:
+            value = pd.to_datetime(df["start_date"], errors = "coerce").dt.year  # build_features와 같은 파생
+        elif col in df.columns:
+            value = df[col]
+        else:
+            value = pd.Series(np.nan, index = df.index)
+
+        missing = value.isna() | value.astype(str).str.strip().eq("")
+        reasons[missing] += f"{col}: missing; "
+        if col != "type":
+            bad = ~missing & ~np.isfinite(pd.to_numeric(value, errors = "coerce").astype(float))
+            reasons[bad] += f"{col}: not numeric ({', '.join(map(repr, value[bad].head(3)))}); "
+
+    return reasons.str.rstrip("; ")
+
+
+def fill_from_train(X_train: np.ndarray, X_test: np.ndarray, cols: list[int]) -> dict[int, float]:
+    # 반환: {컬럼 위치: 채운 값} → 학습 결과(manifest.json)에 저장해 예측 때 같은 값으로 채움
+    # cols의 결측을 X_train 중앙값으로 채움 (제자리) / 학습 행이 모두 결측이면 0
+    fill = {}
+    for j in cols:
+        train_col = X_train[:, j]
+        observed = train_col[~np.isnan(train_col)]
+        fill[j] = float(np.median(observed)) if len(observed) else 0.0
+        for arr in (X_train, X_test):
+            arr[np.isnan(arr[:, j]), j] = fill[j]
+    return fill
+
+
 # -------------------------
-# Save processed
+# Split strategies (X 행 번호 index 배열)
 # -------------------------
-def save_splits(X: pd.DataFrame, y: pd.Series, test_size: float = 0.2, random_state: int = 42, ) -> None:
+def year_cutoff(year: np.ndarray, test_size: float) -> int:
+    # 이전 연도까지의 누적 비율이 1 - test_size 이상이 되는 첫 연도부터 test
+    years, counts = np.unique(year, return_counts = True)
+    before = np.concatenate([[0], np.cumsum(counts)[:-1]]) / len(year)
+    i = int(np.searchsorted(before, 1 - test_size))
+    return int(years[min(i, len(years) - 1)])
+
+
+def year_holdout(year: np.ndarray, test_size: float, test_from_year: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+    cutoff = test_from_year if test_from_year is not None else year_cutoff(year, test_size)
+    test = year >= cutoff
+    return np.flatnonzero(~test), np.flatnonzero(test)
+
+
+def rolling_origin_folds(year: np.ndarray, n_folds: int, fold_years: int = 1):
+    # expanding window: 마지막 n_folds × fold_years개 연도를 순서대로 검증, 그 이전 연도 전체로 학습
+    years = np.unique(year)
+    for start in years[-n_folds * fold_years::fold_years]:
+        window = years[years >= start][:fold_years]
+        train = np.flatnonzero(year < start)
+        test = np.flatnonzero((year >= window[0]) & (year <= window[-1]))
+        if len(train) and len(test):
+            yield train, test
+
+
+def studio_groups(anime_ids: np.ndarray) -> np.ndarray:
+    # 대표 studio(가장 작은 company_id) / studio가 없는 작품은 각자 별도 group (-anime_id)
+    with db.connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT anime_id, MIN(company_id) FROM anime_company WHERE role = 'Studio' GROUP BY anime_id;")
+            studio = dict(cur.fetchall())
+        finally:
+            cur.close()
+    return np.fromiter((studio.get(a, -a) for a in anime_ids.tolist()), dtype = np.int64, count = len(anime_ids))
+
+
+def group_holdout(groups: np.ndarray, test_size: float, random_state: int) -> tuple[np.ndarray, np.ndarray]:
+    # group을 섞은 순서대로, 넣어도 test 행 수가 test_size × 행 수를 넘지 않는 group만 test로 선택
+    # (group 수 기준 분할은 작품이 많은 studio 하나로 test 비율이 크게 달라짐)
+    uniques, inverse, counts = np.unique(groups, return_inverse = True, return_counts = True)
+    target = test_size * len(groups)
+    is_test = np.zeros(len(uniques), dtype = bool)
+    total = 0
+    for g in np.random.default_rng(random_state).permutation(len(uniques)):
+        if total + counts[g] <= target:
+            is_test[g] = True
+            total += counts[g]
+            if total >= target - 0.5:
+                break
+    if not is_test.any(): # 모든 group이 target보다 큼 → 가장 가까운 group 1개
+        is_test[np.argmin(np.abs(counts - target))] = True
+    test = is_test[inverse]
+    return np.flatnonzero(~test), np.flatnonzero(test)
+
+
+def group_folds(groups: np.ndarray, n_folds: int):
+    n_folds = min(n_folds, len(np.unique(groups)))
+    if n_folds >= 2:
+        yield from GroupKFold(n_splits = n_folds).split(groups, groups = groups)
+
+
+def split_folds(X: pd.DataFrame, mode: str = SPLIT_MODE, test_size: float = 0.2, random_state: int = 42,
+                n_folds: int = N_FOLDS, fold_years: int = FOLD_YEARS, test_from_year: int | None = TEST_FROM_YEAR):
+    # (name, train_idx, test_idx)를 하나씩 생성: "holdout" 다음 holdout 학습 구간 안의 fold_0, fold_1, ...
+    n = len(X)
+    if mode == "random":
+        train, test = train_test_split(np.arange(n), test_size = test_size, random_state = random_state)
+        yield "holdout", train, test
+        return
+
+    if mode in ("year", "rolling"):
+        year = X["year"].to_numpy()
+        train, test = year_holdout(year, test_size, test_from_year)
+        yield "holdout", train, test
+        if mode == "rolling":
+            for k, (tr, te) in enumerate(rolling_origin_folds(year[train], n_folds, fold_years)):
+                yield f"fold_{k}", train[tr], train[te]
+        return
+
+    if mode == "studio":
+        if X.index.name != "anime_id":
+            raise ValueError("studio split needs anime_id as the index of X")
+        groups = studio_groups(X.index.to_numpy())
+        train, test = group_holdout(groups, test_size, random_state)
+        yield "holdout", train, test
+        for k, (tr, te) in enumerate(group_folds(groups[train], n_folds)):
+            yield f"fold_{k}", train[tr], train[te]
+        return
+
+    raise ValueError(f"Unknown DATASET_SPLIT: {mode} (random / year / rolling / studio)")
 
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size = test_size, random_state = random_state, )
 
-    X_train.to_csv(PROCESSED_DIR / "X_train.csv", index = False)
-    X_test.to_csv(PROCESSED_DIR / "X_test.csv", index = False)
-    y_train.to_csv(PROCESSED_DIR / "y_train.csv", index = False)
-    y_test.to_csv(PROCESSED_DIR / "y_test.csv", index = False)
+# -------------------------
+# Save processed
+# -------------------------
+def save_arrays(X: pd.DataFrame, y: pd.Series, folds, split: dict) -> dict[str, dict]:
+    # X.npy / y.npy (float64, C-order) 1벌 + fold마다 행 번호 배열만 저장
+    # → np.load(mmap_mode="r")로 파싱/형변환 없이 로드 / fold가 늘어도 index 배열만큼만 추가
+    np.save(PROCESSED_DIR / "X.npy", np.ascontiguousarray(X.to_numpy(dtype = np.float64)))
+    np.save(PROCESSED_DIR / "y.npy", np.ascontiguousarray(y.to_numpy(dtype = np.float64)))
+    for name in ("X_train", "X_test", "y_train", "y_test"): # format 1 split별 복사본
+        (PROCESSED_DIR / f"{name}.npy").unlink(missing_ok = True)
+
+    fold_dir = PROCESSED_DIR / "folds"
+    fold_dir.mkdir(exist_ok = True)
+    for old in fold_dir.glob("*.npy"):
+        old.unlink()
+
+    index_dtype = np.int32 if len(X) < 2**31 else np.int64
+    sizes = {}
+    for name, train, test in folds: # generator: fold를 하나씩 만들어 바로 저장
+        np.save(fold_dir / f"{name}_train.npy", train.astype(index_dtype))
+        np.save(fold_dir / f"{name}_test.npy", test.astype(index_dtype))
+        sizes[name] = {"train": len(train), "test": len(test),
+                       "test_fraction": round(len(test) / (len(train) + len(test)), 4)}
+
+    schema = {
+        "format_version": SPLIT_FORMAT_VERSION,
+        "dtype": "float64",
+        "columns": X.columns.tolist(),
+        "target": str(y.name),
+        "shape": list(X.shape),
+        "fill_from_train": [c for c in X.columns if c in PRIOR_FEATURE_COLUMNS],  # fold별 학습 행 중앙값으로 채울 컬럼
+        "split": split,
+        "folds": sizes,
+    }
+    (PROCESSED_DIR / "schema.json").write_text(json.dumps(schema, indent = 2), encoding = "utf-8")
+    return sizes
+
+
+def save_splits(X: pd.DataFrame, y: pd.Series, test_size: float = 0.2, random_state: int = 42,
+                export_csv: bool = EXPORT_CSV, mode: str = SPLIT_MODE) -> dict[str, dict]:
+
+    split = {"mode": mode, "test_size": test_size, "random_state": random_state}
+    if mode in ("rolling", "studio"):
+        split["n_folds"] = N_FOLDS
+    if mode in ("year", "rolling"):
+        split["test_from_year"] = (TEST_FROM_YEAR if TEST_FROM_YEAR is not None
+                                   else year_cutoff(X["year"].to_numpy(), test_size))
+    if mode == "rolling":
+        split["fold_years"] = FOLD_YEARS
+
+    folds = split_folds(X, mode = mode, test_size = test_size, random_state = random_state,
+                        test_from_year = split.get("test_from_year"))
+    sizes = save_arrays(X, y, folds, split)
+
+    if export_csv: # 기존 CSV 포맷 (opt-in / holdout만)
+        fold_dir = PROCESSED_DIR / "folds"
+        train, test = np.load(fold_dir / "holdout_train.npy"), np.load(fold_dir / "holdout_test.npy")
+        X_train, X_test = X.iloc[train].to_numpy(dtype = np.float64), X.iloc[test].to_numpy(dtype = np.float64)
+        fill_from_train(X_train, X_test, [X.columns.get_loc(c) for c in X.columns if c in PRIOR_FEATURE_COLUMNS])
+        splits = {"X_train": pd.DataFrame(X_train, columns = X.columns), "X_test": pd.DataFrame(X_test, columns = X.columns),
+                  "y_train": y.iloc[train], "y_test": y.iloc[test]}
+        for name, obj in splits.items():
+            obj.to_csv(PROCESSED_DIR / f"{name}.csv", index = False)
 
     # 컬럼 목록 저장
     (PROCESSED_DIR / "feature_columns.txt").write_text("\n".join(X.columns.tolist()),encoding = "utf-8", )
+    return sizes
 
 
 def main():
-    df = load_feature_anime()
-    X, y = build_model_frame(df)
-    save_splits(X, y)
+    X, y = load_model_frame()
+    sizes = save_splits(X, y)
 
     print("Dataset saved to data/processed/")
     print("X shape:", X.shape)
     print("y shape:", y.shape)
+    print(f"Split ({SPLIT_MODE}):")
+    for name, size in sizes.items():
+        print(f"  {name:<8} train {size['train']:>8,}  test {size['test']:>8,} ({size['test_fraction']:.1%})")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import warnings
+warnings.filterwarnings('ignore')
+
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# -------------------------
+# Config
+# -------------------------
+N_REPEATS = int(os.getenv("PERM_N_REPEATS", "5"))
+PERM_JOBS = int(os.getenv("PERM_JOBS", "0"))  # 프로세스 수 (0: 전체 코어)
+SEED = 42
+
+
+# -------------------------
+# Worker (X_test는 memmap으로 공유 / 모델은 worker당 1회 전달)
+# -------------------------
+_W: dict = {}
+
+
+def _init_worker(x_path: str, y: np.ndarray, models: dict, n_repeats: int, seed: int, model_jobs: int):
+    X = np.load(x_path, mmap_mode = "r")  # 읽기 전용, 프로세스 간 page cache 공유
+    for model in models.values():
+        # 병렬화는 프로세스 단위 → 모델 내부 병렬(RF n_jobs=-1)은 코어 / 프로세스 수로 제한 (worker N개 × thread N개 과다 방지)
+        if hasattr(model, "get_params") and "n_jobs" in model.get_params():
+            model.set_params(n_jobs = model_jobs)
+    _W.update(X = X, x_path = x_path, y = y, models = models, n_repeats = n_repeats, seed = seed,
+              tss = float(((y - y.mean()) ** 2).sum()))
+
+
+def _r2(y: np.ndarray, pred: np.ndarray, tss: float) -> float:
+    return 1 - float(((y - pred) ** 2).sum()) / tss
+
+
+def _permute_feature(name: str, j: int, baseline: float) -> tuple[str, int, np.ndarray, float]:
+    # feature j를 n_repeats번 섞어 R2 감소량 계산
+    # 작업 행렬은 task마다 copy-on-write memmap → 열 우선(F-order) 저장이라 열 j의 page만 private 복사, task 후 해제
+    start = time.process_time()  # worker 프로세스의 CPU 시간 (BLAS thread 포함)
+    X, y = _W["X"], _W["y"]
+    model = _W["models"][name]
+    work = np.load(_W["x_path"], mmap_mode = "c")
+    col = np.array(X[:, j])
+
+    # seed는 feature 기준 → 모든 모델이 같은 순열로 비교됨
+    rng = np.random.default_rng([_W["seed"], j])
+    drops = np.empty(_W["n_repeats"])
+    for r in range(_W["n_repeats"]):
+        work[:, j] = col[rng.permutation(len(col))]
+        drops[r] = baseline - _r2(y, model.predict(work), _W["tss"])
+    del work
+
+    return name, j, drops, time.process_time() - start
+
+
+# -------------------------
+# Permutation importance
+# -------------------------
+def permutation_importance(models: dict, X_test: pd.DataFrame, y_test, n_repeats: int = N_REPEATS,
+                           n_jobs: int | None = None, seed: int = SEED) -> pd.DataFrame:
+    # task = (모델, feature) / Test R2 감소량의 평균·표준편차
+    cols = list(X_test.columns)
+    X = np.ascontiguousarray(X_test, dtype = np.float64)
+    y = np.asarray(y_test, dtype = np.float64)
+    tss = float(((y - y.mean()) ** 2).sum())
+    baselines = {name: _r2(y, m.predict(X), tss) for name, m in models.items()}
+
+    tasks = [(name, j) for j in range(len(cols)) for name in models]  # 모델을 섞어 배치 → 진행률/ETA가 고르게
+    n_jobs = n_jobs or os.cpu_count() or 1
+    print(f"Permutation importance: {len(models)} models × {len(cols)} features × {n_repeats} repeats "
+          f"= {len(tasks) * n_repeats} predictions on {len(X):,} rows ({n_jobs} processes)")
+
+    tmpdir = Path(tempfile.mkdtemp(prefix = "perm_"))
+    x_path = tmpdir / "X_test.npy"
+    np.save(x_path, np.asfortranarray(X))  # 열 단위 연속 저장 (worker의 copy-on-write 범위를 열 하나로 제한)
+
+    rows, cost = [], {name: 0.0 for name in models}
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers = n_jobs, initializer = _init_worker,
+                                 initargs = (str(x_path), y, models, n_repeats, seed,
+                                             max(1, (os.cpu_count() or 1) // n_jobs))) as ex:
+            futures = [ex.submit(_permute_feature, name, j, baselines[name]) for name, j in tasks]
+            step = max(1, len(futures) // 10)
+            for done, fut in enumerate(as_completed(futures), 1):
+                name, j, drops, seconds = fut.result()
+                cost[name] += seconds
+                rows.append({"model": name, "feature": cols[j], "baseline_r2": baselines[name],
+                             "importance_mean": drops.mean(), "importance_std": drops.std(ddof = 1) if n_repeats > 1 else 0.0})
+                if done % step == 0 or done == len(futures):
+                    elapsed = time.perf_counter() - start
+                    eta = elapsed / done * (len(futures) - done)
+                    print(f"  {done}/{len(futures)} tasks | {elapsed:.1f}s elapsed | ETA {eta:.1f}s")
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors = True)
+
+    wall = time.perf_counter() - start
+    print("  cost (worker CPU-seconds): " + ", ".join(f"{k} {v:.1f}s" for k, v in cost.items())
+          + f" | wall {wall:.1f}s")
+
+    result = pd.DataFrame(rows)
+    order = {name: i for i, name in enumerate(models)}
+    return (result.sort_values(["model", "importance_mean"], ascending = [True, False],
+                               key = lambda s: s.map(order) if s.name == "model" else s)
+                  .reset_index(drop = True))
+
+
+def main():
+    # 저장된 모델(models/LATEST)로 test split에 대해 계산
+    import train_models
+    from predict import load_artifacts
+
+    X_train, X_test, y_train, y_test = train_models.load_data()
+    artifacts = load_artifacts()
+    cols = artifacts["manifest"]["feature_columns"]
+
+    result = permutation_importance(artifacts["models"], X_test[cols], y_test,
+                                    n_jobs = PERM_JOBS or None)
+    result.to_csv(train_models.REPORTS_DIR / "permutation_importance.csv", index = False)
+
+    for name, g in result.groupby("model", sort = False):
+        print(f"\n=== {name} (Test R2 {g['baseline_r2'].iloc[0]:.4f}) ===")
+        print(g[["feature", "importance_mean", "importance_std"]].head(10).to_string(index = False))
+
+    print("\nSaved:")
+    print("- reports/permutation_importance.csv")
+
+
+if __name__ == "__main__":
+    main()
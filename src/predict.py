@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import warnings
+warnings.filterwarnings('ignore')
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from make_dataset import build_features, input_errors
+
+
+# -------------------------
+# Paths
+# -------------------------
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+MODELS_DIR = PROJECT_ROOT / "models"
+
+MODEL_NAMES = ["ols", "ridge", "rf"]
+BATCH_SIZE = 50_000
+
+
+# -------------------------
+# Load artifacts
+# -------------------------
+def resolve_version(version: str | None = None) -> Path:
+    if version is None:
+        latest = MODELS_DIR / "LATEST"
+        if not latest.exists():
+            raise FileNotFoundError("No trained models found. Run src/train_models.py first.")
+        version = latest.read_text(encoding = "utf-8").strip()
+    path = MODELS_DIR / version
+    if not (path / "manifest.json").exists():
+        raise FileNotFoundError(f"Model version not found: {path}")
+    return path
+
+
+class LinearPredictor: # OLS 계수(const 포함)로 예측 / statsmodels 결과 객체 불필요
+    def __init__(self, params: dict, feature_columns: list[str]):
+        self.intercept = float(params.get("const", 0.0))
+        self.coef = np.array([params[c] for c in feature_columns], dtype = np.float64)
+
+    def predict(self, X) -> np.ndarray:
+        return np.asarray(X, dtype = np.float64) @ self.coef + self.intercept
+
+
+def load_artifacts(version: str | None = None, models: list[str] | None = None) -> dict:
+    # manifest + 모델을 한 번만 로드해 재사용
+    path = resolve_version(version)
+    manifest = json.loads((path / "manifest.json").read_text(encoding = "utf-8"))
+    cols = manifest["feature_columns"]
+
+    loaded = {}
+    for name in models or MODEL_NAMES:
+        file = path / manifest["models"][name]
+        if name == "ols":
+            loaded[name] = LinearPredictor(json.loads(file.read_text(encoding = "utf-8")), cols)
+        else:
+            loaded[name] = joblib.load(file)
+
+    return {"path": path, "manifest": manifest, "models": loaded}
+
+
+# -------------------------
+# Scoring
+# -------------------------
+def read_input(path: Path) -> pd.DataFrame:
+    if path.suffix.lower() in (".parquet", ".pq"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def score_frame(artifacts: dict, df: pd.DataFrame, batch_size: int = BATCH_SIZE) -> pd.DataFrame:
+    # feature 행렬을 한 번 만들고 batch 단위로 모델별 예측 (log_members 및 members 스케일)
+    # 필수 입력(score / year / type)이 없거나 숫자가 아닌 행은 예측하지 않음 → 예측값 NaN + input_error에 사유
+    cols = artifacts["manifest"]["feature_columns"]
+    errors = input_errors(df)
+    valid = errors.eq("").to_numpy()
+    X = build_features(df[valid], cols, artifacts["manifest"].get("fill_values")).to_numpy(dtype = np.float64)
+
+    out = pd.DataFrame(index = df.index)
+    if "anime_id" in df.columns:
+        out["anime_id"] = df["anime_id"]
+
+    for name, model in artifacts["models"].items():
+        pred = np.full(len(df), np.nan)
+        part = np.empty(len(X), dtype = np.float64)
+        for i in range(0, len(X), batch_size):
+            part[i : i + batch_size] = model.predict(X[i : i + batch_size])
+        pred[valid] = part
+        out[f"pred_log_members_{name}"] = pred
+        out[f"pred_members_{name}"] = np.expm1(pred)
+
+    out["input_error"] = errors.where(~valid)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Score new anime with saved models (no retraining).")
+    parser.add_argument("input", type = Path, help = "CSV or Parquet with feature_anime-like columns")
+    parser.add_argument("-o", "--output", type = Path, default = None, help = "output path (.csv / .parquet)")
+    parser.add_argument("--version", default = None, help = "models/<version> (default: models/LATEST)")
+    parser.add_argument("--models", default = ",".join(MODEL_NAMES), help = "comma separated: ols,ridge,rf")
+    parser.add_argument("--batch-size", type = int, default = BATCH_SIZE)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    artifacts = load_artifacts(args.version, [m.strip() for m in args.models.split(",") if m.strip()])
+    t1 = time.perf_counter()
+    df = read_input(args.input)
+    t2 = time.perf_counter()
+    result = score_frame(artifacts, df, batch_size = args.batch_size)
+    t3 = time.perf_counter()
+
+    output = args.output or args.input.with_name(f"{args.input.stem}_predictions.csv")
+    if output.suffix.lower() in (".parquet", ".pq"):
+        result.to_parquet(output, index = False)
+    else:
+        result.to_csv(output, index = False)
+
+    print(f"Model version: {artifacts['manifest']['version']}")
+    print(f"Scored {len(result):,} rows → {output}")
+    n_invalid = int(result["input_error"].notna().sum())
+    if n_invalid:
+        print(f"Skipped {n_invalid:,} rows (missing / non-numeric required inputs, see input_error)")
+    print(f"load models {1000 * (t1 - t0):.1f} ms | read input {1000 * (t2 - t1):.1f} ms | "
+          f"score {1000 * (t3 - t2):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# -----------------------------
+# Paths
+# -----------------------------
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+RAW_DIR = PROJECT_ROOT / "data" / "raw"
+CACHE_DIR = PROJECT_ROOT / "data" / "cache" / "raw"
+
+# RAW_CACHE=0 이면 Parquet 캐시를 쓰지 않고 항상 CSV를 파싱
+USE_CACHE = os.getenv("RAW_CACHE", "1") != "0"
+
+# 스키마(dtype/usecols)를 바꾸면 올려서 기존 캐시를 무효화
+SCHEMA_VERSION = 1
+
+
+# -----------------------------
+# Raw file schemas
+# -----------------------------
+# dtype: id 컬럼은 결측 허용 정수(Int64), 반복값이 많은 문자열은 category
+# usecols: ETL이 실제로 쓰는 컬럼만 파싱 (파일에 없는 컬럼은 무시)
+RAW_SCHEMAS: Dict[str, Dict] = {
+    "anime": {
+        "file": "anime.csv",
+        "dtype": {
+            "anime_id": "Int64",
+            "title": "object",
+            "score": "float64",
+            "rank": "Int64",
+            "popularity": "Int64",
+            "members": "Int64",
+            "synopsis": "object",
+            "start_date": "object",
+            "end_date": "object",
+            "type": "category",
+            "episodes": "object",
+            "image_url": "object",
+        },
+    },
+    "anime_genres": {
+        "file": "anime_genres.csv",
+        "dtype": {"anime_id": "Int64", "genre": "object"},
+    },
+    "anime_companies": {
+        "file": "anime_companies.csv",
+        "dtype": {"anime_id": "Int64", "company_id": "Int64", "role": "category"},
+    },
+    "anime_characters": {
+        "file": "anime_characters.csv",
+        "dtype": {"anime_id": "Int64", "character_id": "Int64", "role": "category"},
+    },
+    "anime_voice_actors": {
+        "file": "anime_voice_actors.csv",
+        "dtype": {"character_id": "Int64", "person_id": "Int64", "language": "category"},
+    },
+    "entities": {
+        "file": "entities.csv",
+        "dtype": {"entity_id": "Int64", "entity_type": "category", "name": "object", "image_url": "object"},
+    },
+}
+
+# 같은 실행 안에서 같은 파일을 다시 요청하면 메모리 사본을 재사용 (entities.csv 등)
+_MEMO: Dict[Tuple[str, bool], pd.DataFrame] = {}
+_LOCKS: Dict[Tuple[str, bool], threading.Lock] = {}
+_LOCKS_GUARD = threading.Lock()
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def raw_path(name: str) -> Path:
+    return RAW_DIR / RAW_SCHEMAS[name]["file"]
+
+
+def raw_exists(name: str) -> bool:
+    return raw_path(name).exists()
+
+
+def _source_stamp(path: Path) -> Dict: # 캐시 키: 원본 파일 크기 + mtime + 스키마 버전
+    st = path.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "schema_version": SCHEMA_VERSION}
+
+
+def _cache_paths(name: str, all_columns: bool) -> Tuple[Path, Path]:
+    tag = "all" if all_columns else "etl"
+    return CACHE_DIR / f"{name}.{tag}.parquet", CACHE_DIR / f"{name}.{tag}.meta.json"
+
+
+def normalize_nulls(df: pd.DataFrame) -> pd.DataFrame:
+    # 문자열(object) 컬럼의 결측을 NaN으로 통일 (CSV 파싱은 NaN, Parquet 캐시는 None으로 읽힘)
+    obj = [c for c in df.columns if df[c].dtype == object]
+    if obj:
+        df[obj] = df[obj].where(df[obj].notna(), np.nan)
+    return df
+
+
+def read_csv_typed(name: str, all_columns: bool = False, **kwargs) -> pd.DataFrame:
+    # 명시적 dtype으로 파싱 (dtype 추론 생략) / all_columns=False면 스키마 컬럼만 읽음
+    schema = RAW_SCHEMAS[name]
+    dtype = schema["dtype"]
+    usecols = None if all_columns else (lambda c: c in dtype)
+    return pd.read_csv(raw_path(name), dtype = dtype, usecols = usecols, **kwargs)
+
+
+def _load_uncached(name: str, all_columns: bool) -> pd.DataFrame:
+    path = raw_path(name)
+    if not USE_CACHE:
+        return read_csv_typed(name, all_columns = all_columns)
+
+    cache_file, meta_file = _cache_paths(name, all_columns)
+    stamp = _source_stamp(path)
+
+    if cache_file.exists() and meta_file.exists():
+        try:
+            if json.loads(meta_file.read_text(encoding = "utf-8")) == stamp:
+                return normalize_nulls(pd.read_parquet(cache_file))
+        except (ValueError, OSError):
+            pass  # 손상된 캐시 → CSV 재파싱
+
+    df = read_csv_typed(name, all_columns = all_columns)
+
+    CACHE_DIR.mkdir(parents = True, exist_ok = True)
+    tmp = cache_file.with_suffix(".parquet.tmp")
+    df.to_parquet(tmp, index = False)
+    tmp.replace(cache_file)
+    meta_file.write_text(json.dumps(stamp), encoding = "utf-8")
+    return df
+
+
+def read_raw(name: str, all_columns: bool = False) -> pd.DataFrame:
+    # CSV는 (크기, mtime)이 바뀐 경우에만 파싱하고, 그 외에는 Parquet 캐시에서 바로 로드
+    key = (name, all_columns)
+    with _LOCKS_GUARD:
+        lock = _LOCKS.setdefault(key, threading.Lock())
+
+    with lock: # 병렬 step이 같은 파일을 동시에 요청해도 파싱은 1회
+        if key not in _MEMO:
+            _MEMO[key] = _load_uncached(name, all_columns)
+        df = _MEMO[key]
+
+    return df.copy()  # 호출 측에서 자유롭게 수정 가능하도록 사본 반환
+
+
+def iter_raw(name: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    # chunk 단위 스트리밍 (파일 크기와 무관하게 chunk 하나만 메모리에 유지)
+    # 유효한 Parquet 캐시가 있으면 row batch 단위로, 없으면 CSV를 chunksize로 파싱
+    cache_file, meta_file = _cache_paths(name, all_columns = False)
+    if USE_CACHE and cache_file.exists() and meta_file.exists():
+        try:
+            fresh = json.loads(meta_file.read_text(encoding = "utf-8")) == _source_stamp(raw_path(name))
+        except (ValueError, OSError):
+            fresh = False
+        if fresh:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            pf = pq.ParquetFile(cache_file)
+            for batch in pf.iter_batches(batch_size = chunksize):
+                # schema의 pandas metadata로 Int64 / category dtype 복원
+                yield normalize_nulls(pa.Table.from_batches([batch], schema = pf.schema_arrow).to_pandas())
+            return
+
+    yield from read_csv_typed(name, chunksize = chunksize)
+
+
+def clear_memo() -> None:
+    _MEMO.clear()
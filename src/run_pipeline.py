@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+
+# -------------------------
+# Paths
+# -------------------------
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = PROJECT_ROOT / "src"
+SQL_DIR = PROJECT_ROOT / "sql"
+RAW_DIR = PROJECT_ROOT / "data" / "raw"
+PROCESSED_DIR = PROJECT_ROOT / "data" / "processed"
+REPORTS_DIR = PROJECT_ROOT / "reports"
+MODELS_DIR = PROJECT_ROOT / "models"
+
+CACHE_DIR = PROJECT_ROOT / ".cache" / "pipeline"
+OBJECTS_DIR = CACHE_DIR / "objects"   # sha256 → 파일 내용 (content-addressed)
+STATE_PATH = CACHE_DIR / "state.json"
+
+DB_PARAMS = ("DB_BACKEND", "DB_PATH", "DB_HOST", "DB_PORT", "DB_NAME")  # 다른 DB를 가리키면 DB stage 재실행
+
+
+# -------------------------
+# Stage 정의
+# -------------------------
+@dataclass
+class Stage:
+    name: str
+    run: Callable[[], None]
+    inputs: Callable[[], List[Path]]          # 내용 hash 대상 (raw CSV / SQL / 코드)
+    params: Tuple[str, ...] = ()              # 환경변수 이름 또는 접두사("ETL_")
+    deps: Tuple[str, ...] = ()
+    outputs: Callable[[], List[Path]] = field(default = lambda: [])  # 캐시에 보관할 결과 파일
+
+
+def src(*names: str) -> Callable[[], List[Path]]:
+    return lambda: [SRC_DIR / n for n in names]
+
+
+def run_sql_files(*names: str) -> Callable[[], None]:
+    def run():
+        import db
+        conn = db.connect_db()
+        cur = conn.cursor()
+        try:
+            for name in names:
+                for stmt in split_sql((SQL_DIR / name).read_text(encoding = "utf-8")):
+                    cur.execute(stmt)
+                print(f"  applied sql/{name}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+            conn.close()
+            db.close_pool()  # 이후 stage는 subprocess에서 같은 DB 파일을 염
+    return run
+
+
+def run_script(name: str) -> Callable[[], None]:
+    def run():
+        subprocess.run([sys.executable, str(SRC_DIR / name)], cwd = PROJECT_ROOT, check = True)
+    return run
+
+
+def split_sql(text: str) -> List[str]:
+    # 주석 제거 후 ';' 단위 분리 / DB는 .env 설정을 따르므로 USE 문은 건너뜀
+    text = re.sub(r"--[^\n]*", "", text)
+    stmts = [s.strip() for s in text.split(";")]
+    return [s for s in stmts if s and not re.match(r"(?i)^USE\s", s)]
+
+
+def raw_csvs() -> List[Path]:
+    return sorted(RAW_DIR.glob("*.csv"))
+
+
+def processed_files() -> List[Path]:
+    return sorted(p for p in PROCESSED_DIR.rglob("*") if p.is_file())  # folds/ 포함
+
+
+def train_outputs() -> List[Path]:
+    files = [REPORTS_DIR / n for n in ("ols_coefficients.csv", "ols_summary.txt", "rf_feature_importance.csv",
+                                       "permutation_importance.csv", "tuning.json", "cv_scores.csv")]
+    latest = MODELS_DIR / "LATEST"
+    if latest.exists():
+        files.append(latest)
+        files += sorted((MODELS_DIR / latest.read_text(encoding = "utf-8").strip()).glob("*"))
+    return [p for p in files if p.is_file()]
+
+
+ETL_CODE = ("etl_pipeline.py", "etl_scheduler.py", "raw_data.py", "cdc.py", "features.py", "indexes.py", "summary.py", "db.py")
+
+SCHEMA_SQL = ("01_schema_extended.sql", "02_1_create_raw_entities.sql", "03_indexes.sql",
+              "05_build_features.sql", "07_build_summary.sql")
+
+# README 7장의 실행 순서 / feature_anime 테이블은 schema 단계에서 만들고 ETL이 적재한 anime_id만 갱신
+STAGES = [
+    Stage("schema", run_sql_files(*SCHEMA_SQL),
+          inputs = lambda: [SQL_DIR / n for n in SCHEMA_SQL],
+          params = DB_PARAMS),
+    Stage("etl", run_script("etl_pipeline.py"),
+          inputs = lambda: raw_csvs() + src(*ETL_CODE)(),
+          params = DB_PARAMS + ("ETL_", "FEATURE_"), deps = ("schema",)),
+    Stage("entities_master", run_sql_files("02_2_load_entities_master.sql"),
+          inputs = lambda: [SQL_DIR / "02_2_load_entities_master.sql"],
+          params = DB_PARAMS, deps = ("etl",)),
+    Stage("make_dataset", run_script("make_dataset.py"),
+          inputs = src("make_dataset.py", "db.py"),
+          params = DB_PARAMS + ("DATASET_",), deps = ("etl", "entities_master"),
+          outputs = processed_files),
+    Stage("diagnostics", run_script("diagnostics.py"),
+          inputs = src("diagnostics.py", "linear_models.py", "train_models.py"),
+          deps = ("make_dataset",),
+          outputs = lambda: [REPORTS_DIR / n for n in ("vif.csv", "diagnostics.txt", "diagnostics.json",
+                                                       "influence_top.csv")]),
+    Stage("train", run_script("train_models.py"),
+          inputs = src("train_models.py", "linear_models.py", "permutation_importance.py", "predict.py"),
+          params = ("TRAIN_", "PERM_"), deps = ("make_dataset",),
+          outputs = train_outputs),
+]
+
+
+# -------------------------
+# Hashing (파일 hash는 size/mtime이 같으면 재사용)
+# -------------------------
+def load_state() -> dict:
+    if STATE_PATH.exists():
+        return json.loads(STATE_PATH.read_text(encoding = "utf-8"))
+    return {"files": {}, "stages": {}}
+
+
+def save_state(state: dict) -> None:
+    CACHE_DIR.mkdir(parents = True, exist_ok = True)
+    tmp = STATE_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent = 2, ensure_ascii = False), encoding = "utf-8")
+    tmp.replace(STATE_PATH)
+
+
+def sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def file_hash(state: dict, path: Path) -> str:
+    st = path.stat()
+    rel = rel_path(path)
+    cached = state["files"].get(rel)
+    if cached and cached["size"] == st.st_size and cached["mtime_ns"] == st.st_mtime_ns:
+        return cached["sha256"]
+    digest = sha256_file(path)
+    state["files"][rel] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+    return digest
+
+
+def rel_path(path: Path) -> str:
+    return path.resolve().relative_to(PROJECT_ROOT).as_posix()
+
+
+def stage_params(stage: Stage) -> Dict[str, str]:
+    out = {}
+    for key in stage.params:
+        if key.endswith("_"):
+            out.update({k: v for k, v in os.environ.items() if k.startswith(key)})
+        elif key in os.environ:
+            out[key] = os.environ[key]
+    return dict(sorted(out.items()))
+
+
+def stage_key(state: dict, stage: Stage, dep_keys: Dict[str, str]) -> str:
+    files = {}
+    for path in stage.inputs():
+        files[rel_path(path)] = file_hash(state, path) if path.exists() else None
+    payload = {"stage": stage.name, "files": files, "params": stage_params(stage),
+               "deps": {d: dep_keys[d] for d in stage.deps}}
+    return hashlib.sha256(json.dumps(payload, sort_keys = True).encode("utf-8")).hexdigest()
+
+
+# -------------------------
+# Content-addressed outputs
+# -------------------------
+def store_outputs(state: dict, stage: Stage) -> Dict[str, str]:
+    stored = {}
+    for path in stage.outputs():
+        digest = file_hash(state, path)
+        obj = OBJECTS_DIR / digest[:2] / digest
+        if not obj.exists():
+            obj.parent.mkdir(parents = True, exist_ok = True)
+            shutil.copy2(path, obj)
+        stored[rel_path(path)] = digest
+    return stored
+
+
+def restore_outputs(state: dict, outputs: Dict[str, str]) -> Tuple[int, bool]:
+    # 반환: (복원한 파일 수, 전부 사용 가능 여부)
+    restored = 0
+    for rel, digest in outputs.items():
+        path = PROJECT_ROOT / rel
+        if path.exists() and file_hash(state, path) == digest:
+            continue
+        obj = OBJECTS_DIR / digest[:2] / digest
+        if not obj.exists():
+            return restored, False
+        path.parent.mkdir(parents = True, exist_ok = True)
+        shutil.copy2(obj, path)
+        restored += 1
+    return restored, True
+
+
+# -------------------------
+# Runner
+# -------------------------
+def validate_names(names: List[str]) -> None:
+    known = [s.name for s in STAGES] + ["all"]
+    for n in names:
+        if n not in known:
+            raise SystemExit(f"Unknown stage: {n} (choose from {', '.join(known)})")
+
+
+def run_pipeline(force: List[str], only: List[str] | None, dry_run: bool) -> int:
+    validate_names(force + (only or []))
+    state = load_state()
+    dep_keys: Dict[str, str] = {}
+    forced = set(force)
+    timings = []
+    total_start = time.perf_counter()
+
+    for stage in STAGES:
+        t0 = time.perf_counter()
+        key = stage_key(state, stage, dep_keys)
+        dep_keys[stage.name] = key
+        hash_sec = time.perf_counter() - t0
+
+        if only and stage.name not in only:
+            continue
+
+        prev = state["stages"].get(stage.name, {})
+        status = "run"
+        if prev.get("key") == key and stage.name not in forced and "all" not in forced:
+            restored, ok = restore_outputs(state, prev.get("outputs", {}))
+            if ok:
+                status = f"cached ({restored} restored)" if restored else "cached"
+
+        if status == "run" and not dry_run:
+            print(f"\n▶ {stage.name}")
+            start = time.perf_counter()
+            try:
+                stage.run()
+            except Exception as e:
+                save_state(state)
+                print(f"✗ {stage.name} failed after {time.perf_counter() - start:.1f}s: {e}")
+                return 1
+            seconds = time.perf_counter() - start
+            state["stages"][stage.name] = {
+                "key": key,
+                "outputs": store_outputs(state, stage),
+                "seconds": round(seconds, 3),
+                "finished_at": datetime.now().isoformat(timespec = "seconds"),
+            }
+            save_state(state)
+        else:
+            seconds = 0.0
+            if dry_run and status == "run":
+                status = "would run"
+
+        timings.append((stage.name, status, hash_sec, seconds))
+        print(f"{stage.name:<16} {status:<20} hash {hash_sec:6.2f}s | run {seconds:8.2f}s")
+
+    save_state(state)
+    print("\n=== Pipeline summary ===")
+    for name, status, hash_sec, seconds in timings:
+        print(f"{name:<16} {status:<20} {hash_sec + seconds:8.2f}s")
+    print(f"{'total':<37} {time.perf_counter() - total_start:8.2f}s")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Run schema → ETL → dataset → train, skipping unchanged stages.")
+    parser.add_argument("--force", nargs = "+", default = [], metavar = "STAGE",
+                        help = "re-run these stages even if inputs are unchanged ('all' for every stage)")
+    parser.add_argument("--only", nargs = "+", default = None, metavar = "STAGE", help = "run only these stages")
+    parser.add_argument("--dry-run", action = "store_true", help = "show which stages would run")
+    parser.add_argument("--list", action = "store_true", help = "list stages and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for s in STAGES:
+            print(f"{s.name:<16} deps: {', '.join(s.deps) or '-'}")
+        return
+
+    sys.exit(run_pipeline(args.force, args.only, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import warnings
+warnings.filterwarnings('ignore')
+
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from make_dataset import input_errors
+from predict import load_artifacts, score_frame
+
+
+# -------------------------
+# Config
+# -------------------------
+MAX_BATCH = 256        # micro-batch 최대 행 수
+MAX_WAIT_MS = 5.0      # 첫 요청 도착 후 batch를 모으는 최대 대기 시간
+LATENCY_WINDOW = 10_000
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+
+# -------------------------
+# Micro-batching
+# -------------------------
+class MicroBatcher:
+    # 동시에 들어온 요청을 모아 score_frame 1회로 예측 (모델은 메모리에 상주)
+    def __init__(self, artifacts: dict, max_batch: int = MAX_BATCH, max_wait_ms: float = MAX_WAIT_MS):
+        self.artifacts = artifacts
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.queue: asyncio.Queue[Tuple[List[dict], asyncio.Future]] = asyncio.Queue()
+        self.latencies = deque(maxlen = LATENCY_WINDOW)  # 요청별 ms
+        self.batch_sizes = deque(maxlen = LATENCY_WINDOW)
+        self.requests = 0
+
+    async def predict(self, records: List[dict]) -> List[dict]:
+        fut = asyncio.get_running_loop().create_future()
+        start = time.perf_counter()
+        await self.queue.put((records, fut))
+        try:
+            return await fut
+        finally:
+            self.latencies.append(1000 * (time.perf_counter() - start))
+            self.requests += 1
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self.queue.get()]
+            n_rows = len(items[0][0])
+            deadline = loop.time() + self.max_wait
+
+            while n_rows < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                items.append(item)
+                n_rows += len(item[0])
+
+            records = [r for recs, _ in items for r in recs]
+            self.batch_sizes.append(len(records))
+            try:
+                # 예측은 thread에서 실행해 event loop가 다음 요청을 계속 받도록 함
+                result = await loop.run_in_executor(None, self._score, records)
+            except Exception as e:
+                for _, fut in items:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+
+            pos = 0
+            for recs, fut in items:
+                if not fut.done():
+                    fut.set_result(result[pos : pos + len(recs)])
+                pos += len(recs)
+
+    def _score(self, records: List[dict]) -> List[dict]:
+        out = score_frame(self.artifacts, pd.DataFrame.from_records(records))
+        out = out.drop(columns = "input_error")  # 필수 입력은 handle에서 이미 검사
+        return json.loads(out.to_json(orient = "records"))
+
+    def stats(self) -> dict:
+        lat = np.fromiter(self.latencies, dtype = float)
+        sizes = np.fromiter(self.batch_sizes, dtype = float)
+        pct = (lambda q: round(float(np.percentile(lat, q)), 3)) if len(lat) else (lambda q: None)
+        return {
+            "model_version": self.artifacts["manifest"]["version"],
+            "requests": self.requests,
+            "latency_ms": {"p50": pct(50), "p90": pct(90), "p99": pct(99),
+                           "max": round(float(lat.max()), 3) if len(lat) else None},
+            "batches": len(sizes),
+            "mean_batch_rows": round(float(sizes.mean()), 2) if len(sizes) else None,
+            "queue_depth": self.queue.qsize(),
+        }
+
+
+# -------------------------
+# Minimal HTTP (stdlib only)
+# -------------------------
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+async def write_json(writer: asyncio.StreamWriter, status: int, payload) -> None:
+    body = json.dumps(payload, ensure_ascii = False).encode("utf-8")
+    head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n")
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+
+async def handle(batcher: MicroBatcher, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    # POST /predict : {"type": ..., "score": ...} 또는 그 리스트
+    # GET  /stats   : latency percentile / batch 크기
+    # GET  /health
+    try:
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        if not request_line:
+            return
+        method, path, _ = request_line.split(" ", 2)
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            k, _, v = line.partition(":")
+            headers[k.strip().lower()] = v.strip()
+
+        length = int(headers.get("content-length", "0") or 0)
+        if length > MAX_BODY_BYTES:
+            await write_json(writer, 413, {"error": "request body too large"})
+            return
+        body = await reader.readexactly(length) if length else b""
+
+        if method == "GET" and path == "/health":
+            await write_json(writer, 200, {"status": "ok"})
+        elif method == "GET" and path == "/stats":
+            await write_json(writer, 200, batcher.stats())
+        elif method == "POST" and path == "/predict":
+            try:
+                payload = json.loads(body or b"null")
+            except ValueError:
+                await write_json(writer, 400, {"error": "invalid JSON"})
+                return
+            records = payload if isinstance(payload, list) else [payload]
+            if not records or not all(isinstance(r, dict) for r in records):
+                await write_json(writer, 400, {"error": "expected a JSON object or a list of objects"})
+                return
+            # 필수 입력(score / year / type) 검사는 batch에 넣기 전에 → 잘못된 요청이 같은 batch의 다른 요청을 실패시키지 않음
+            errors = input_errors(pd.DataFrame.from_records(records))
+            bad = [(i, e) for i, e in enumerate(errors) if e]
+            if bad:
+                message = "; ".join(f"record {i}: {e}" for i, e in bad) if isinstance(payload, list) else bad[0][1]
+                await write_json(writer, 400, {"error": f"invalid input: {message}"})
+                return
+            preds = await batcher.predict(records)
+            await write_json(writer, 200, preds if isinstance(payload, list) else preds[0])
+        else:
+            await write_json(writer, 404, {"error": f"{method} {path} not found"})
+    except (ValueError, asyncio.IncompleteReadError) as e:
+        await write_json(writer, 400, {"error": str(e)})
+    except Exception as e:
+        await write_json(writer, 500, {"error": str(e)})
+    finally:
+        writer.close()
+
+
+async def serve(host: str, port: int, version: str | None, max_batch: int, max_wait_ms: float) -> None:
+    artifacts = load_artifacts(version)
+    batcher = MicroBatcher(artifacts, max_batch = max_batch, max_wait_ms = max_wait_ms)
+    batcher._score([{"type": "TV", "score": 7.0, "year": 2020}])  # warm-up (첫 요청 지연 방지)
+
+    worker = asyncio.create_task(batcher.run())
+    server = await asyncio.start_server(lambda r, w: handle(batcher, r, w), host, port)
+    print(f"Scoring service (models {artifacts['manifest']['version']}) on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        worker.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Local scoring service with warm models and micro-batching.")
+    parser.add_argument("--host", default = "127.0.0.1")
+    parser.add_argument("--port", type = int, default = 8000)
+    parser.add_argument("--version", default = None, help = "models/<version> (default: models/LATEST)")
+    parser.add_argument("--max-batch", type = int, default = MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type = float, default = MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.version, args.max_batch, args.max_wait_ms))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+from typing import Dict, Sequence
+
+import pandas as pd
+
+import db
+
+
+# -----------------------------
+# Summary (OLAP) 테이블 정의 (sql/07_build_summary.sql)
+# -----------------------------
+# 06_analysis_queries.sql (5) 와 같은 구간
+VA_BUCKET_SQL = """
+CASE
+    WHEN f.voice_actor_count < 5 THEN '<5'
+    WHEN f.voice_actor_count BETWEEN 5 AND 9 THEN '5-9'
+    WHEN f.voice_actor_count BETWEEN 10 AND 19 THEN '10-19'
+    ELSE '20+'
+END
+""".strip()
+
+# 합산 가능한 측정값 / scored_*: score가 있는 작품만
+MEASURES = ["anime_cnt", "members_cnt", "members_sum", "scored_cnt", "score_sum",
+            "scored_members_cnt", "scored_members_sum"]
+
+MEASURES_SQL = """
+    COUNT(*) AS anime_cnt,
+    COUNT(f.members) AS members_cnt,
+    COALESCE(SUM(f.members), 0) AS members_sum,
+    COUNT(f.score) AS scored_cnt,
+    COALESCE(SUM(f.score), 0) AS score_sum,
+    COUNT(CASE WHEN f.score IS NOT NULL THEN f.members END) AS scored_members_cnt,
+    COALESCE(SUM(CASE WHEN f.score IS NOT NULL THEN f.members END), 0) AS scored_members_sum
+""".strip()
+
+CUBES = {
+    "summary_anime_cube": {
+        "dimensions": ["type", "start_year", "genre_count", "va_bucket"],
+        "select": f"""
+SELECT
+    f.type,
+    YEAR(f.start_date) AS start_year,
+    f.genre_count,
+    {VA_BUCKET_SQL} AS va_bucket,
+    {MEASURES_SQL}
+FROM feature_anime f
+GROUP BY f.type, start_year, f.genre_count, va_bucket
+""".strip(),
+    },
+    "summary_studio_cube": {
+        "dimensions": ["company_id", "studio_name", "type", "start_year"],
+        "select": f"""
+SELECT
+    ac.company_id,
+    c.name AS studio_name,
+    f.type,
+    YEAR(f.start_date) AS start_year,
+    {MEASURES_SQL}
+FROM anime_company ac
+JOIN company c ON ac.company_id = c.company_id
+JOIN feature_anime f ON ac.anime_id = f.anime_id
+WHERE ac.role = 'Studio'
+GROUP BY ac.company_id, c.name, f.type, start_year
+""".strip(),
+    },
+}
+
+
+def refresh_summaries(cur) -> Dict[str, int]:
+    # feature_anime / anime_company 1회 scan으로 전체 재집계 (summary는 작품 수보다 훨씬 작음)
+    rows = {}
+    for table, cube in CUBES.items():
+        cols = ", ".join(cube["dimensions"] + MEASURES)
+        cur.execute(f"DELETE FROM {table};")
+        cur.execute(f"INSERT INTO {table} ({cols})\n{cube['select']};")
+        rows[table] = max(cur.rowcount, 0)
+    return rows
+
+
+# -----------------------------
+# Query API (dashboard용)
+# -----------------------------
+def rollup(table: str, dimensions: Sequence[str], scored: bool = False,
+           year_from: int | None = None, year_to: int | None = None,
+           types: Sequence[str] | None = None, conn = None) -> pd.DataFrame:
+    # summary 테이블을 dimensions로 다시 묶음 → cnt / avg_score / avg_members
+    # scored=True: score가 있는 작품만 (cnt, avg_members도 그 작품 기준)
+    allowed = CUBES[table]["dimensions"]
+    bad = [d for d in dimensions if d not in allowed]
+    if bad:
+        raise ValueError(f"Unknown dimensions for {table}: {bad} (choose from {allowed})")
+
+    where, params = [], []
+    if year_from is not None:
+        where.append("start_year >= %s")
+        params.append(int(year_from))
+    if year_to is not None:
+        where.append("start_year <= %s")
+        params.append(int(year_to))
+    if types:
+        where.append(f"type IN ({', '.join(['%s'] * len(types))})")
+        params += list(types)
+
+    dims = ", ".join(dimensions)
+    sums = ", ".join(f"SUM({m}) AS {m}" for m in MEASURES)
+    sql = (f"SELECT {dims + ', ' if dims else ''}{sums} FROM {table}"
+           f"{' WHERE ' + ' AND '.join(where) if where else ''}"
+           f"{' GROUP BY ' + dims if dims else ''};")
+
+    if conn is None:
+        with db.connection() as conn:
+            df = _fetch(conn, sql, params, list(dimensions))
+    else:
+        df = _fetch(conn, sql, params, list(dimensions))
+
+    m = df[MEASURES].apply(pd.to_numeric, errors = "coerce").fillna(0).astype(float)
+    cnt = m["scored_cnt"] if scored else m["anime_cnt"]
+    members_n = m["scored_members_cnt"] if scored else m["members_cnt"]
+    members_sum = m["scored_members_sum"] if scored else m["members_sum"]
+
+    out = df[list(dimensions)].copy()
+    out["cnt"] = cnt.astype(int)
+    out["avg_score"] = m["score_sum"] / m["scored_cnt"].where(m["scored_cnt"] > 0)
+    out["avg_members"] = members_sum / members_n.where(members_n > 0)
+    return out[out["cnt"] > 0].reset_index(drop = True)
+
+
+def _fetch(conn, sql: str, params: list, dimensions: list) -> pd.DataFrame:
+    cur = conn.cursor()
+    try:
+        cur.execute(sql, params or None)
+        return pd.DataFrame(cur.fetchall(), columns = dimensions + MEASURES)
+    finally:
+        cur.close()
+
+
+# 06_analysis_queries.sql의 5개 리포트 (같은 컬럼 / 정렬)
+def type_summary(**filters) -> pd.DataFrame: # (1) 타입별 평균 평점/인기
+    df = rollup("summary_anime_cube", ["type"], **filters)
+    return df.sort_values("cnt", ascending = False, ignore_index = True)
+
+
+def genre_count_summary(**filters) -> pd.DataFrame: # (2) 장르 수 대비 평점
+    df = rollup("summary_anime_cube", ["genre_count"], scored = True, **filters)
+    return df.sort_values("genre_count", ignore_index = True)
+
+
+def studio_top(n: int = 10, **filters) -> pd.DataFrame: # (3) Studio 작품 수 TOP n
+    df = rollup("summary_studio_cube", ["studio_name"], **filters)
+    df = df.rename(columns = {"studio_name": "name"})[["name", "cnt"]]
+    return df.sort_values("cnt", ascending = False, ignore_index = True).head(n)
+
+
+def studio_score_top(n: int = 15, min_count: int = 10, **filters) -> pd.DataFrame: # (4) Studio 평균 평점 TOP n
+    df = rollup("summary_studio_cube", ["studio_name"], scored = True, **filters)
+    df = df.rename(columns = {"studio_name": "name"})[["name", "cnt", "avg_score"]]
+    df = df[df["cnt"] >= min_count]
+    return df.sort_values("avg_score", ascending = False, ignore_index = True).head(n)
+
+
+def va_bucket_summary(**filters) -> pd.DataFrame: # (5) 성우 수 구간별 평점/인기
+    df = rollup("summary_anime_cube", ["va_bucket"], scored = True, **filters)
+    return df.sort_values("cnt", ascending = False, ignore_index = True)
+
+
+REPORTS = {
+    "type": type_summary,
+    "genre_count": genre_count_summary,
+    "studio_top": studio_top,
+    "studio_score_top": studio_score_top,
+    "va_bucket": va_bucket_summary,
+}
+
+
+def main():
+    conn = db.connect_db()
+    cur = conn.cursor()
+    try:
+        rows = refresh_summaries(cur)
+        conn.commit()
+        print("summary refreshed: " + ", ".join(f"{t} {n} rows" for t, n in rows.items()))
+    finally:
+        cur.close()
+        conn.close()
+
+    for name, report in REPORTS.items():
+        print(f"\n=== {name} ===")
+        print(report().to_string(index = False))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,15 +3,33 @@ from __future__ import annotations
 import warnings
 warnings.filterwarnings('ignore')
 
+from datetime import datetime
 from pathlib import Path
+import hashlib
+import json
+import os
+import platform
+import time
+
+import joblib
+import scipy
+import sklearn
+import statsmodels
 
 import numpy as np
 import pandas as pd
 import statsmodels.api as sm
 
-from sklearn.linear_model import Ridge
+from sklearn.linear_model import Ridge, RidgeCV
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import r2_score, mean_squared_error
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import HalvingGridSearchCV
+
+from linear_models import fit_linear
+from make_dataset import fill_from_train
+from permutation_importance import PERM_JOBS, permutation_importance
+from predict import LinearPredictor
 
 
 # -------------------------
@@ -21,12 +39,96 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = PROJECT_ROOT / "data" / "processed"
 REPORTS_DIR = PROJECT_ROOT / "reports"
 REPORTS_DIR.mkdir(parents = True, exist_ok = True)
+MODELS_DIR = PROJECT_ROOT / "models"
+
+# 학습된 모델을 models/<version>/ 에 저장 (predict.py에서 재학습 없이 사용)
+SAVE_MODELS = os.getenv("TRAIN_SAVE_MODELS", "1") == "1"
+ARTIFACT_FORMAT_VERSION = 1
+
+
+# -------------------------
+# Tuning config
+# -------------------------
+# 기본은 ipynb 값(alpha = 10, n_estimators = 200) / TRAIN_TUNE=1 이면 교차검증 탐색 결과 사용
+TUNE = os.getenv("TRAIN_TUNE", "0") == "1"
+TUNE_FORCE = os.getenv("TRAIN_TUNE_FORCE", "0") == "1"  # 데이터가 같아도 다시 탐색
+TUNE_JOBS = int(os.getenv("TRAIN_TUNE_JOBS", "-1"))  # CV 탐색 프로세스 수 (-1: 전체 코어)
+
+# TRAIN_OLS_SUMMARY=1 이면 statsmodels로 적합하고 reports/ols_summary.txt 저장 (느림)
+OLS_SUMMARY = os.getenv("TRAIN_OLS_SUMMARY", "0") == "1"
+
+# Test split 기준 permutation importance (impurity 기반 RF 중요도 보완)
+PERMUTATION = os.getenv("TRAIN_PERMUTATION", "1") == "1"
+
+DEFAULT_RIDGE_ALPHA = 10.0
+DEFAULT_RF_PARAMS = {"n_estimators": 200}
+
+RIDGE_ALPHAS = np.logspace(-3, 3, 25)
+RF_PARAM_GRID = {
+    "max_depth": [None, 12, 20],
+    "min_samples_leaf": [1, 3, 5],
+    "max_features": [1.0, 0.5, "sqrt"],
+}
 
 
 # -------------------------
 # Load data
 # -------------------------
+def load_schema() -> dict:
+    return json.loads((DATA_DIR / "schema.json").read_text(encoding = "utf-8"))
+
+
+def load_fold(name: str, schema: dict | None = None):
+    # X.npy / y.npy(memory-map)에서 fold의 행만 꺼냄 → 해당 fold의 train/test만 메모리에 올라감
+    schema = schema or load_schema()
+    cols, target = schema["columns"], schema["target"]
+    X = np.load(DATA_DIR / "X.npy", mmap_mode = "r")
+    y = np.load(DATA_DIR / "y.npy", mmap_mode = "r")
+    train = np.load(DATA_DIR / "folds" / f"{name}_train.npy")
+    test = np.load(DATA_DIR / "folds" / f"{name}_test.npy")
+
+    # prior feature 결측은 이 fold의 학습 행 중앙값으로 채움 (test 행의 값이 학습에 섞이지 않도록)
+    X_train, X_test = X[train], X[test]
+    fill = fill_from_train(X_train, X_test, [cols.index(c) for c in schema.get("fill_from_train", [])])
+
+    X_train = pd.DataFrame(X_train, columns = cols, copy = False)
+    X_train.attrs["fill_values"] = {cols[j]: v for j, v in fill.items()}  # save_artifacts → manifest.json
+    return (X_train, pd.DataFrame(X_test, columns = cols, copy = False),
+            pd.Series(y[train], name = target, copy = False), pd.Series(y[test], name = target, copy = False))
+
+
+def iter_folds(include_holdout: bool = False):
+    # (name, X_train, X_test, y_train, y_test)를 fold 하나씩 로드 (holdout 제외 / format 1은 fold 없음)
+    schema = load_schema()
+    for name in schema.get("folds", {}):
+        if include_holdout or name != "holdout":
+            yield (name, *load_fold(name, schema))
+
+
+def load_arrays():
+    # make_dataset이 저장한 .npy를 memory-map으로 로드 (CSV 파싱 / to_numeric 변환 없음)
+    schema = load_schema()
+    if schema.get("format_version", 1) >= 2:
+        return load_fold("holdout", schema)
+
+    cols = schema["columns"]
+
+    def arr(name):
+        return np.load(DATA_DIR / f"{name}.npy", mmap_mode = "r")
+
+    X_train = pd.DataFrame(arr("X_train"), columns = cols, copy = False)
+    X_test = pd.DataFrame(arr("X_test"), columns = cols, copy = False)
+    y_train = pd.Series(arr("y_train"), name = schema["target"], copy = False)
+    y_test = pd.Series(arr("y_test"), name = schema["target"], copy = False)
+
+    return X_train, X_test, y_train, y_test
+
+
 def load_data():
+    if (DATA_DIR / "schema.json").exists():
+        return load_arrays()
+
+    # 이전 버전에서 저장한 CSV split
     X_train = pd.read_csv(DATA_DIR / "X_train.csv")
     X_test = pd.read_csv(DATA_DIR / "X_test.csv")
     y_train = pd.read_csv(DATA_DIR / "y_train.csv").squeeze()
@@ -48,9 +150,113 @@ def evaluate(y_true, y_pred) -> tuple[float, float]:
 
 
 # -------------------------
-# OLS (statsmodels, ipynb 방식)
+# Hyperparameter tuning
 # -------------------------
-def run_ols(X_train, X_test, y_train, y_test):
+def data_fingerprint(X: pd.DataFrame, y: pd.Series) -> str: # 학습 데이터 내용 hash (컬럼 순서 포함)
+    h = hashlib.sha256()
+    h.update("\x1f".join(map(str, X.columns)).encode("utf-8"))
+    h.update(np.ascontiguousarray(X.to_numpy(dtype = np.float64)).tobytes())
+    h.update(np.ascontiguousarray(np.asarray(y, dtype = np.float64)).tobytes())
+    return h.hexdigest()
+
+
+def tune_ridge(X_train, y_train) -> dict:
+    # RidgeCV(cv=None): alpha별 leave-one-out 오차를 closed form(GCV)으로 계산 → fold별 재학습 없음
+    start = time.perf_counter()
+    model = RidgeCV(alphas = RIDGE_ALPHAS, store_cv_values = True)
+    model.fit(X_train, y_train)
+    loo_mse = model.cv_values_.mean(axis = 0)
+    return {
+        "alpha": float(model.alpha_),
+        "loo_mse": float(loo_mse.min()),
+        "alphas": RIDGE_ALPHAS.tolist(),
+        "loo_mse_by_alpha": loo_mse.tolist(),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def tune_rf(X_train, y_train, n_jobs: int = TUNE_JOBS) -> dict:
+    # successive halving: 모든 조합을 적은 트리 수로 평가하고 상위 1/3만 트리 수를 늘려 재평가
+    # CV fold × 조합은 joblib process pool(n_jobs)로 병렬 실행
+    start = time.perf_counter()
+    search = HalvingGridSearchCV(
+        RandomForestRegressor(random_state = 42, n_jobs = 1),
+        RF_PARAM_GRID,
+        resource = "n_estimators",
+        min_resources = 50,
+        max_resources = 450,
+        factor = 3,
+        cv = 5,
+        scoring = "r2",
+        random_state = 42,
+        n_jobs = n_jobs,
+    )
+    search.fit(X_train, y_train)
+
+    params = dict(search.best_params_)
+    return {
+        "params": params,
+        "cv_r2": float(search.best_score_),
+        "n_candidates": [int(n) for n in search.n_candidates_],
+        "n_resources": [int(n) for n in search.n_resources_],
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def load_or_tune(X_train, y_train, force: bool = TUNE_FORCE) -> dict:
+    # reports/tuning.json의 fingerprint가 현재 데이터와 같으면 탐색 생략
+    path = REPORTS_DIR / "tuning.json"
+    fingerprint = data_fingerprint(X_train, y_train)
+
+    if path.exists() and not force:
+        cached = json.loads(path.read_text(encoding = "utf-8"))
+        if cached.get("fingerprint") == fingerprint:
+            print("\nTuning: data unchanged → reuse reports/tuning.json")
+            return cached
+
+    print("\nTuning: running CV search ...")
+    result = {"fingerprint": fingerprint, "ridge": tune_ridge(X_train, y_train), "rf": tune_rf(X_train, y_train)}
+    path.write_text(json.dumps(result, indent = 2), encoding = "utf-8")
+
+    print(f"Ridge best alpha: {result['ridge']['alpha']:.4g} ({result['ridge']['seconds']}s)")
+    print(f"RF best params: {result['rf']['params']} (CV R2 {result['rf']['cv_r2']:.4f}, {result['rf']['seconds']}s)")
+    return result
+
+
+# -------------------------
+# Fold 교차검증 (DATASET_SPLIT=rolling / studio)
+# -------------------------
+def cross_validate(ridge_alpha: float = DEFAULT_RIDGE_ALPHA) -> pd.DataFrame | None:
+    # fold마다 OLS / Ridge를 다시 학습해 검증 R2·RMSE (RF는 비용이 커서 제외)
+    rows = []
+    for name, X_tr, X_te, y_tr, y_te in iter_folds():
+        preds = {
+            "ols": fit_linear(X_tr, y_tr).predict(X_te),
+            "ridge": Ridge(alpha = ridge_alpha).fit(X_tr, y_tr).predict(X_te),
+        }
+        for model, pred in preds.items():
+            r2, rmse = evaluate(y_te, pred)
+            rows.append({"fold": name, "model": model, "n_train": len(X_tr), "n_test": len(X_te),
+                         "r2": r2, "rmse": rmse})
+    if not rows: # fold 없는 split → 이전 split의 결과가 남지 않도록 삭제
+        (REPORTS_DIR / "cv_scores.csv").unlink(missing_ok = True)
+        return None
+
+    cv = pd.DataFrame(rows)
+    cv.to_csv(REPORTS_DIR / "cv_scores.csv", index = False)
+
+    print("\n=== Fold CV ===")
+    print(cv.groupby("model")[["r2", "rmse"]].agg(["mean", "std"]).round(4).to_string())
+    return cv
+
+
+# -------------------------
+# OLS (fast: Gram 행렬 closed form / full: statsmodels, ipynb 방식)
+# -------------------------
+def run_ols(X_train, X_test, y_train, y_test, summary: bool = OLS_SUMMARY):
+    if not summary:
+        return run_ols_fast(X_train, X_test, y_train, y_test)
+
     X_train_const = sm.add_constant(X_train, has_constant = "add")
     X_test_const = sm.add_constant(X_test, has_constant = "add")
 
@@ -69,18 +275,35 @@ def run_ols(X_train, X_test, y_train, y_test):
     return model, pred, r2, rmse
 
 
+def run_ols_fast(X_train, X_test, y_train, y_test):
+    # 계수 / 표준오차 / Test R2·RMSE만 계산 (statsmodels summary 생성 생략)
+    model = fit_linear(X_train, y_train)
+    pred = model.predict(X_test)
+
+    r2, rmse = evaluate(y_test, pred)
+
+    print("\n=== OLS (closed form) ===")
+    print(f"OLS Train R2: {model.r2_train:.4f}")
+    print(f"OLS Test R2: {r2:.4f}")
+    print(f"OLS Test RMSE: {rmse:.4f}")
+
+    model.coef_table().to_csv(REPORTS_DIR / "ols_coefficients.csv", index_label = "feature")
+
+    return model, pred, r2, rmse
+
+
 # -------------------------
-# Ridge (ipynb에서 best alpha = 10 기준)
+# Ridge (기본값: ipynb에서 best alpha = 10 / 튜닝 시 GCV 결과)
 # -------------------------
-def run_ridge(X_train, X_test, y_train, y_test):
-    model = Ridge(alpha = 10.0)
+def run_ridge(X_train, X_test, y_train, y_test, alpha: float = DEFAULT_RIDGE_ALPHA):
+    model = Ridge(alpha = alpha)
     model.fit(X_train, y_train)
     pred = model.predict(X_test)
 
     r2, rmse = evaluate(y_test, pred)
 
     print("\n=== Ridge ===")
-    print("Best alpha:", 10.0)
+    print("Best alpha:", alpha)
     print(f"Ridge Test R2: {r2:.4f}")
     print(f"Ridge Test RMSE: {rmse:.4f}")
 
@@ -88,10 +311,11 @@ def run_ridge(X_train, X_test, y_train, y_test):
 
 
 # -------------------------
-# Random Forest (ipynb 유사 설정)
+# Random Forest (기본값: ipynb 유사 설정 / 튜닝 시 halving search 결과)
 # -------------------------
-def run_rf(X_train, X_test, y_train, y_test):
-    model = RandomForestRegressor(n_estimators = 200, random_state = 42, n_jobs = -1, )
+def run_rf(X_train, X_test, y_train, y_test, params: dict | None = None):
+    params = {**DEFAULT_RF_PARAMS, **(params or {})}
+    model = RandomForestRegressor(**params, random_state = 42, n_jobs = -1, )
     model.fit(X_train, y_train)
     pred = model.predict(X_test)
 
@@ -113,19 +337,95 @@ def run_rf(X_train, X_test, y_train, y_test):
     return model, pred, r2, rmse
 
 
+# -------------------------
+# Model artifacts
+# -------------------------
+def library_versions() -> dict:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "scipy": scipy.__version__,
+        "scikit-learn": sklearn.__version__,
+        "statsmodels": statsmodels.__version__,
+    }
+
+
+def save_artifacts(ols, ridge, rf, X_train, y_train, metrics: dict, params: dict) -> Path:
+    # models/<YYYYmmdd-HHMMSS>-<fingerprint 앞 8자리>/ + models/LATEST
+    # OLS는 statsmodels 결과 객체 대신 계수만 저장 (학습 데이터가 pickle에 포함되지 않도록)
+    fingerprint = data_fingerprint(X_train, y_train)
+    version = f"{datetime.now():%Y%m%d-%H%M%S}-{fingerprint[:8]}"
+    out = MODELS_DIR / version
+    out.mkdir(parents = True, exist_ok = True)
+
+    joblib.dump(ridge, out / "ridge.joblib")
+    joblib.dump(rf, out / "rf.joblib")
+    (out / "ols_params.json").write_text(json.dumps(ols.params.to_dict(), indent = 2), encoding = "utf-8")
+
+    manifest = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "version": version,
+        "created_at": datetime.now().isoformat(timespec = "seconds"),
+        "feature_columns": list(X_train.columns),
+        "fill_values": X_train.attrs.get("fill_values", {}),  # 예측 시 결측 feature를 학습과 같은 값으로 채움
+        "target": str(y_train.name),
+        "data_fingerprint": fingerprint,
+        "n_train": int(len(X_train)),
+        "libraries": library_versions(),
+        "params": params,
+        "metrics": metrics,
+        "models": {"ols": "ols_params.json", "ridge": "ridge.joblib", "rf": "rf.joblib"},
+    }
+    (out / "manifest.json").write_text(json.dumps(manifest, indent = 2), encoding = "utf-8")
+    (MODELS_DIR / "LATEST").write_text(version, encoding = "utf-8")
+    return out
+
+
 # -------------------------
 # Main
 # -------------------------
 def main():
     X_train, X_test, y_train, y_test = load_data()
 
-    run_ols(X_train, X_test, y_train, y_test)
-    run_ridge(X_train, X_test, y_train, y_test)
-    run_rf(X_train, X_test, y_train, y_test)
+    ridge_alpha, rf_params = DEFAULT_RIDGE_ALPHA, DEFAULT_RF_PARAMS
+    if TUNE:
+        tuning = load_or_tune(X_train, y_train)
+        ridge_alpha, rf_params = tuning["ridge"]["alpha"], tuning["rf"]["params"]
+
+    ols, _, ols_r2, ols_rmse = run_ols(X_train, X_test, y_train, y_test)
+    ridge, _, ridge_r2, ridge_rmse = run_ridge(X_train, X_test, y_train, y_test, alpha = ridge_alpha)
+    rf, _, rf_r2, rf_rmse = run_rf(X_train, X_test, y_train, y_test, params = rf_params)
+    cv = cross_validate(ridge_alpha)
+
+    if PERMUTATION:
+        # OLS는 statsmodels / closed form 어느 쪽이든 계수만으로 예측
+        ols_predictor = LinearPredictor(ols.params.to_dict(), list(X_test.columns))
+        perm = permutation_importance({"ols": ols_predictor, "ridge": ridge, "rf": rf}, X_test, y_test,
+                                      n_jobs = PERM_JOBS or None)
+        perm.to_csv(REPORTS_DIR / "permutation_importance.csv", index = False)
+
+    artifact_dir = None
+    if SAVE_MODELS:
+        metrics = {
+            "ols": {"test_r2": ols_r2, "test_rmse": ols_rmse},
+            "ridge": {"test_r2": ridge_r2, "test_rmse": ridge_rmse},
+            "rf": {"test_r2": rf_r2, "test_rmse": rf_rmse},
+        }
+        params = {"ridge": {"alpha": ridge_alpha}, "rf": {**DEFAULT_RF_PARAMS, **rf_params}}
+        artifact_dir = save_artifacts(ols, ridge, rf, X_train, y_train, metrics, params)
 
     print("\nSaved:")
-    print("- reports/ols_summary.txt")
+    print("- reports/ols_summary.txt" if OLS_SUMMARY else "- reports/ols_coefficients.csv")
     print("- reports/rf_feature_importance.csv")
+    if PERMUTATION:
+        print("- reports/permutation_importance.csv")
+    if cv is not None:
+        print("- reports/cv_scores.csv")
+    if TUNE:
+        print("- reports/tuning.json")
+    if artifact_dir is not None:
+        print(f"- models/{artifact_dir.name}/")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import cdc
+import raw_data
+
+
+ENTITIES_CSV = """entity_id,entity_type,name,image_url
+1,studio,Studio A,
+2,producer,,https://example.com/2.jpg
+3,voice_actor,Actor C,https://example.com/3.jpg
+"""
+
+
+def _use_raw_dir(monkeypatch, tmp_path):
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    (raw_dir / "entities.csv").write_text(ENTITIES_CSV, encoding = "utf-8")
+    monkeypatch.setattr(raw_data, "RAW_DIR", raw_dir)
+    monkeypatch.setattr(raw_data, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(raw_data, "USE_CACHE", True)
+    raw_data.clear_memo()
+
+
+def test_csv_and_cache_give_identical_hashes(monkeypatch, tmp_path):
+    _use_raw_dir(monkeypatch, tmp_path)
+
+    from_csv = raw_data.read_raw("entities")  # 캐시 없음 → CSV 파싱 + 캐시 저장
+    raw_data.clear_memo()
+    from_cache = raw_data.read_raw("entities")  # Parquet 캐시
+    streamed = pd.concat(list(raw_data.iter_raw("entities", chunksize = 2)), ignore_index = True)
+
+    assert (tmp_path / "cache" / "entities.etl.parquet").exists()
+    pd.testing.assert_frame_equal(from_csv, from_cache)
+    expected = cdc.row_hashes(from_csv).to_numpy()
+    np.testing.assert_array_equal(cdc.row_hashes(from_cache).to_numpy(), expected)
+    np.testing.assert_array_equal(cdc.row_hashes(streamed).to_numpy(), expected)
+
+
+def test_row_hashes_ignore_null_representation():
+    base = pd.DataFrame({"id": [1, 2], "name": ["a", np.nan]})
+    variants = [
+        pd.DataFrame({"id": [1, 2], "name": ["a", None]}),
+        pd.DataFrame({"id": [1, 2], "name": pd.Series(["a", pd.NA], dtype = "string")}),
+    ]
+    for other in variants:
+        np.testing.assert_array_equal(cdc.row_hashes(other).to_numpy(), cdc.row_hashes(base).to_numpy())
+
+    changed = pd.DataFrame({"id": [1, 2], "name": ["a", "b"]})
+    assert cdc.row_hashes(changed)[1] != cdc.row_hashes(base)[1]
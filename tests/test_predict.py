@@ -0,0 +1,50 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import predict
+from make_dataset import build_features
+
+
+FEATURES = ["score", "year", "studio_prior_score", "type_TV"]
+FILL_VALUES = {"studio_prior_score": 6.8}
+
+
+def _artifacts() -> dict:
+    params = {"const": 1.0, "score": 0.5, "year": 0.0, "studio_prior_score": 1.0, "type_TV": 0.2}
+    manifest = {"feature_columns": FEATURES, "fill_values": FILL_VALUES}
+    return {"path": None, "manifest": manifest, "models": {"ols": predict.LinearPredictor(params, FEATURES)}}
+
+
+def test_build_features_uses_training_fill_values():
+    X = build_features(pd.DataFrame([{"type": "TV", "score": 7.0, "year": 2020}]), FEATURES, FILL_VALUES)
+    assert X.loc[0, "studio_prior_score"] == 6.8
+    assert X.loc[0, "type_TV"] == 1.0
+
+    # 입력에 값이 있으면 그대로 사용
+    X = build_features(pd.DataFrame([{"type": "TV", "score": 7.0, "year": 2020, "studio_prior_score": 5.0}]),
+                       FEATURES, FILL_VALUES)
+    assert X.loc[0, "studio_prior_score"] == 5.0
+
+
+def test_score_frame_fills_priors_like_training():
+    out = predict.score_frame(_artifacts(), pd.DataFrame([{"type": "TV", "score": 7.0, "year": 2020}]))
+    np.testing.assert_allclose(out["pred_log_members_ols"], [1.0 + 3.5 + 6.8 + 0.2])
+
+
+def test_score_frame_flags_rows_missing_required_inputs():
+    df = pd.DataFrame([
+        {"anime_id": 1, "type": "TV", "score": 7.0, "year": 2020},
+        {"anime_id": 2, "type": "TV", "score": 7.0},
+        {"anime_id": 3, "type": "TV", "score": "n/a", "year": 2020},
+    ])
+    out = predict.score_frame(_artifacts(), df, batch_size = 1)
+
+    assert out["pred_log_members_ols"].notna().tolist() == [True, False, False]
+    assert pd.isna(out.loc[0, "input_error"])
+    assert out.loc[1, "input_error"] == "year: missing"
+    assert out.loc[2, "input_error"].startswith("score: not numeric")
@@ -0,0 +1,65 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import predict
+import scoring_service
+
+
+FEATURES = ["score", "year", "type_TV"]
+
+
+class _Writer:
+    def __init__(self):
+        self.data = b""
+
+    def write(self, data: bytes) -> None:
+        self.data += data
+
+    async def drain(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def _post(payload) -> tuple[int, dict]:
+    params = {"const": 1.0, "score": 0.5, "year": 0.001, "type_TV": 0.2}
+    artifacts = {"path": None, "manifest": {"version": "test", "feature_columns": FEATURES},
+                 "models": {"ols": predict.LinearPredictor(params, FEATURES)}}
+
+    async def run():
+        batcher = scoring_service.MicroBatcher(artifacts, max_wait_ms = 1)
+        worker = asyncio.create_task(batcher.run())
+        body = json.dumps(payload).encode("utf-8")
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"POST /predict HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+        reader.feed_eof()
+        writer = _Writer()
+        await scoring_service.handle(batcher, reader, writer)
+        worker.cancel()
+        return writer.data
+
+    head, _, body = asyncio.run(run()).partition(b"\r\n\r\n")
+    return int(head.split(b" ")[1]), json.loads(body)
+
+
+def test_predict_ok():
+    status, body = _post({"type": "TV", "score": 7.0, "year": 2020})
+    assert status == 200
+    assert abs(body["pred_log_members_ols"] - (1.0 + 3.5 + 2.02 + 0.2)) < 1e-9
+
+
+def test_missing_year_is_rejected():
+    status, body = _post({"type": "TV", "score": 7.0})
+    assert status == 400
+    assert "year" in body["error"]
+
+
+def test_non_numeric_score_is_rejected():
+    status, body = _post([{"type": "TV", "score": 7.0, "year": 2020}, {"type": "TV", "score": "abc", "year": 2020}])
+    assert status == 400
+    assert "record 1: score" in body["error"]